@@ -1,38 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import logging
 
 from app.models.schemas import (
     AnomalyDetectionRequest,
     AnomalyDetectionResponse,
     AnomalyResult,
-    AnomalyType
+    AnomalyType,
+    StreamEntityType,
+    StreamingPointRequest
 )
 from app.models.models import AnomalyDetection
-from app.core.database import get_db
-from app.services.anomaly_detector import AnomalyDetector
+from app.core.database import SessionLocal, get_db
 from app.services.model_cache import get_model_cache
-from app.services.model_loaders import AnomalyDetectorModelLoader
-from app.services.model_management import ModelManager
+from app.services.streaming_detector import get_streaming_detector
+from app.services.inference_batcher import get_inference_batchers
+from app.services.model_loaders import get_anomaly_model_loader
+from app.services.model_pipeline import ModelPipeline
 from app.services.data_loader import get_data_loader
 from app.models.bcom_models import DetectedAnomaly, Link, Device
+from app.core.config import settings
 from app.core.rate_limiter import limiter
-import os
+
+if TYPE_CHECKING:
+    from app.services.anomaly_detector import AnomalyDetector
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Use a single detector instance with caching enabled
-anomaly_detector = AnomalyDetector(cache_enabled=True)
-# Initialize ModelManager with models directory (create if doesn't exist)
-models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "models_cache")
-model_manager = ModelManager(models_dir)
-model_loader = AnomalyDetectorModelLoader(model_manager)
-data_loader = get_data_loader("data")
+# Single detector instance with caching enabled, created on first use so
+# importing the API does not pull in sklearn/pandas/polars
+_anomaly_detector: Optional['AnomalyDetector'] = None
+# Shared loader over the production model registry (see MODELS_DIR)
+model_loader = get_anomaly_model_loader(settings.MODELS_DIR)
+
+# Fallback feature order for device models whose metadata lists none
+DEVICE_FEATURE_COLUMNS = ['max_value', 'min_value', 'avg_value', 'std_deviation']
+
+# Bounds on the correlation endpoints' work per request
+MAX_CORRELATION_LOOKBACK_HOURS = 24 * 30
+MAX_MINHASH_PERMUTATIONS = 1024
+
+
+def get_anomaly_detector() -> 'AnomalyDetector':
+    """Get the shared anomaly detector, importing it on first call."""
+    global _anomaly_detector
+    if _anomaly_detector is None:
+        from app.services.anomaly_detector import AnomalyDetector
+        _anomaly_detector = AnomalyDetector(cache_enabled=True)
+    return _anomaly_detector
 
 
 @router.post("/detect", response_model=AnomalyDetectionResponse)
@@ -44,20 +65,38 @@ async def detect_anomalies(
     request=None
 ):
     try:
+        # Training runs off the event loop, so concurrent requests with the
+        # same payload wait on one fit in the model cache
+        detector = get_anomaly_detector()
+        detection_mode = detector.resolve_detection_mode(
+            len(request_data.data),
+            request_data.mode.value,
+            request_data.latency_budget_ms
+        )
+
         if request_data.anomaly_type == AnomalyType.NETWORK:
-            anomalies = anomaly_detector.detect_network_anomalies(
+            anomalies = await asyncio.to_thread(
+                detector.detect_network_anomalies,
                 request_data.data,
-                request_data.sensitivity
+                request_data.sensitivity,
+                mode=detection_mode,
+                latency_budget_ms=request_data.latency_budget_ms
             )
         elif request_data.anomaly_type == AnomalyType.SITE:
-            anomalies = anomaly_detector.detect_site_anomalies(
+            anomalies = await asyncio.to_thread(
+                detector.detect_site_anomalies,
                 request_data.data,
-                request_data.sensitivity
+                request_data.sensitivity,
+                mode=detection_mode,
+                latency_budget_ms=request_data.latency_budget_ms
             )
         elif request_data.anomaly_type == AnomalyType.LINK:
-            anomalies = anomaly_detector.detect_link_anomalies(
+            anomalies = await asyncio.to_thread(
+                detector.detect_link_anomalies,
                 request_data.data,
-                request_data.sensitivity
+                request_data.sensitivity,
+                mode=detection_mode,
+                latency_budget_ms=request_data.latency_budget_ms
             )
         else:
             raise HTTPException(
@@ -94,7 +133,8 @@ async def detect_anomalies(
             anomaly_type=request_data.anomaly_type,
             results=results,
             overall_status=overall_status,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.utcnow(),
+            detection_mode=detection_mode
         )
 
     except Exception as e:
@@ -215,7 +255,7 @@ async def detect_device_anomalies(
     try:
         # Get device KPI data
         try:
-            kpi_data = data_loader.get_device_kpis(device_id)
+            kpi_data = get_data_loader(settings.DATA_DIR).get_device_kpis(device_id)
         except Exception as e:
             logger.warning(f"DataLoader failed for device {device_id}, attempting database query")
             device = db.query(Device).filter_by(device_id=device_id).first()
@@ -243,29 +283,30 @@ async def detect_device_anomalies(
         if not features:
             raise HTTPException(status_code=400, detail="Insufficient KPI data for analysis")
 
-        # Load pre-trained model
+        # Load pre-trained pipeline (scaler + model, training feature order)
         try:
-            model = model_loader.load_device_detector()
+            model = await model_loader.load_async("isolation_forest_device")
             if model is None:
                 logger.warning("ML model not found, using statistical detection")
-                model = anomaly_detector
+                model = get_anomaly_detector()
         except Exception as e:
             logger.warning(f"Failed to load ML model: {str(e)}, using statistical detection")
-            model = anomaly_detector
-
-        # Extract feature columns
-        feature_columns = ['max_value', 'min_value', 'avg_value', 'std_deviation']
-        feature_values = [[f[col] for col in feature_columns] for f in features]
+            model = get_anomaly_detector()
 
         # Predict anomalies
         import numpy as np
-        X = np.array(feature_values)
-        
-        if hasattr(model, 'predict'):
-            predictions = model.predict(X)
+
+        if isinstance(model, ModelPipeline):
+            X = model.feature_matrix(features, DEVICE_FEATURE_COLUMNS)
+            # Concurrent requests against the same model are stacked, then
+            # scaled and scored in one vectorized call
+            batcher = get_inference_batchers().get('device_detector', model.predict)
+            predictions = await batcher.submit(X)
             anomaly_indices = np.where(predictions == -1)[0]
+            model_version = model.version
         else:
             anomaly_indices = []
+            model_version = None
 
         # Build response
         anomalies = []
@@ -283,12 +324,12 @@ async def detect_device_anomalies(
         for anomaly in anomalies:
             detected = DetectedAnomaly(
                 device_id=device_id,
-                timestamp=datetime.now(datetime.timezone.utc),
+                timestamp=datetime.now(timezone.utc),
                 anomaly_type='kpi_outlier',
                 severity=anomaly['severity'],
                 confidence=anomaly['confidence'],
                 description=anomaly['description'],
-                model_version='1.0.0'
+                model_version=model_version
             )
             db.add(detected)
 
@@ -298,7 +339,7 @@ async def detect_device_anomalies(
             'device_id': device_id,
             'anomalies_detected': len(anomalies),
             'anomalies': anomalies,
-            'timestamp': datetime.now(datetime.timezone.utc).isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
 
     except Exception as e:
@@ -337,7 +378,7 @@ async def detect_link_anomalies(
         # Get link grade history
         try:
             start_date = (datetime.now() - timedelta(days=days_lookback)).date()
-            grades = data_loader.get_link_grades(link_id, start_date, datetime.now().date())
+            grades = get_data_loader(settings.DATA_DIR).get_link_grades(link_id, start_date, datetime.now().date())
         except Exception as e:
             logger.warning(f"DataLoader failed for link {link_id}, attempting database query")
             grades = []
@@ -376,7 +417,7 @@ async def detect_link_anomalies(
             for device in devices:
                 detected = DetectedAnomaly(
                     device_id=device.id,
-                    timestamp=datetime.now(datetime.timezone.utc),
+                    timestamp=datetime.now(timezone.utc),
                     anomaly_type='grade_degradation',
                     severity=anomaly['severity'],
                     confidence=anomaly['confidence'],
@@ -391,7 +432,7 @@ async def detect_link_anomalies(
             'link_id': link_id,
             'anomalies_detected': len(anomalies),
             'anomalies': anomalies,
-            'timestamp': datetime.now(datetime.timezone.utc).isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
 
     except Exception as e:
@@ -400,6 +441,76 @@ async def detect_link_anomalies(
         raise HTTPException(status_code=500, detail=f"Detection failed: {str(e)}")
 
 
+@router.post("/bcom/stream/{entity_type}/{entity_id}/score")
+@limiter.limit("600/minute")
+async def score_stream_point(
+    entity_type: StreamEntityType,
+    entity_id: str,
+    point: StreamingPointRequest,
+    request=None
+):
+    """
+    Score a single KPI or grade point as it arrives.
+    
+    Uses per-entity incremental statistics (EWMA, Welford, rolling median/MAD)
+    so each point is scored in O(log w) for a window of w points, without
+    refitting a batch model.
+    
+    Args:
+        entity_type: 'device', 'link' or 'network'
+        entity_id: Entity identifier
+        point: Metric values, optional timestamp and sensitivity
+    
+    Returns:
+        Streaming anomaly score for the point
+    """
+    try:
+        result = get_streaming_detector().score_point(
+            entity_type=entity_type.value,
+            entity_id=entity_id,
+            metrics=point.metrics,
+            timestamp=point.timestamp,
+            sensitivity=point.sensitivity
+        )
+        result['timestamp'] = result['timestamp'].isoformat()
+        return result
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Streaming scoring failed for {entity_type.value} {entity_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Streaming scoring failed: {str(e)}"
+        )
+
+
+@router.get("/bcom/stream/{entity_type}/{entity_id}/stats")
+@limiter.limit("100/minute")
+async def get_stream_stats(
+    entity_type: StreamEntityType,
+    entity_id: str,
+    request=None
+):
+    """
+    Get the running statistics kept for a streamed entity.
+    
+    Args:
+        entity_type: 'device', 'link' or 'network'
+        entity_id: Entity identifier
+    
+    Returns:
+        Per-metric running statistics
+    """
+    stats = get_streaming_detector().get_entity_stats(entity_type.value, entity_id)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No streaming state for {entity_type.value} {entity_id}"
+        )
+    return stats
+
+
 @router.get("/bcom/customer/{customer_id}/summary")
 @limiter.limit("60/minute")
 async def get_customer_anomaly_summary(
@@ -423,7 +534,7 @@ async def get_customer_anomaly_summary(
     """
     try:
         # Get anomalies from database
-        cutoff_date = datetime.now(datetime.timezone.utc) - timedelta(days=days_lookback)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_lookback)
         anomalies = db.query(DetectedAnomaly).filter(
             DetectedAnomaly.timestamp >= cutoff_date
         ).all()
@@ -474,7 +585,58 @@ async def get_customer_anomaly_summary(
 
 # ==================== CORRELATION ANALYSIS ENDPOINTS ====================
 
-from app.services.correlation_engine import CorrelationEngine
+from app.services.correlation_cache import get_correlation_cache
+from app.services.correlation_engine import get_correlation_engine
+from app.services.link_correlation import CORRELATION_METHODS, GRID_METRICS, LinkCorrelationEngine
+from app.services.co_degradation import CoDegradationClusterer
+from app.services.topology_index import get_topology_index
+from app.services.correlation_sweep import execute_sweep_job, get_sweep_registry
+from app.services.correlation_window import get_correlation_window
+from app.services.root_cause import get_root_cause_analyzer, plan_scopes
+from app.models.bcom_models import DegradationPatternRecord
+
+# scope -> (CorrelationWindow method, CorrelationEngine method)
+_CORRELATION_ANALYSES = {
+    'network': ('analyze_network', 'analyze_network_degradation'),
+    'hub_antenna': ('analyze_hub_antenna', 'analyze_hub_antenna_degradation'),
+    'satellite': ('analyze_satellite', 'analyze_satellite_degradation'),
+    'link': ('analyze_link_bidirectional', 'analyze_link_bidirectional_degradation'),
+}
+
+
+def _sync_correlation_state(db: Session, hours_lookback: int) -> None:
+    """Fold new grades into the result cache and, if it serves this lookback, the rolling window."""
+    get_correlation_cache().sync(db)
+    window = get_correlation_window()
+    if window.covers(hours_lookback):
+        window.sync(db)
+
+
+def _analyze_correlation(db: Session, scope: str, scope_id, hours_lookback: int, sync: bool = True):
+    """
+    Serve a scope's analysis from the result cache, the rolling window or raw grades.
+    
+    Args:
+        sync: Fold new grades into the cache and window first; callers running
+            several analyses concurrently sync once up front instead, so the
+            analyses do not queue on the window lock behind redundant syncs
+    
+    Returns:
+        (CorrelationAnalysis or None, cache metadata)
+    """
+    if sync:
+        get_correlation_cache().sync(db)
+    
+    def compute():
+        window_method, engine_method = _CORRELATION_ANALYSES[scope]
+        window = get_correlation_window()
+        if window.covers(hours_lookback):
+            if sync:
+                window.sync(db)
+            return getattr(window, window_method)(scope_id)
+        return getattr(get_correlation_engine(), engine_method)(db, scope_id, hours_lookback=hours_lookback)
+    
+    return get_correlation_cache().get_or_compute(scope, scope_id, hours_lookback, compute)
 
 
 @router.post("/bcom/correlations/network/{network_id}/analyze")
@@ -502,11 +664,8 @@ async def analyze_network_correlation(
     try:
         logger.info(f"Analyzing network correlation for network {network_id}")
         
-        correlation_engine = CorrelationEngine()
-        analysis = correlation_engine.analyze_network_degradation(
-            db=db,
-            network_id=network_id,
-            hours_lookback=hours_lookback
+        analysis, cache_info = await asyncio.to_thread(
+            _analyze_correlation, db, 'network', network_id, hours_lookback
         )
         
         if not analysis:
@@ -519,9 +678,12 @@ async def analyze_network_correlation(
             'status': 'success',
             'analysis': analysis.to_dict(),
             'timestamp': datetime.utcnow().isoformat(),
-            'analyzed_by': 'correlation_engine_v1.0.0'
+            'analyzed_by': 'correlation_engine_v1.0.0',
+            'cache': cache_info
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing network correlation: {e}")
         raise HTTPException(
@@ -555,11 +717,8 @@ async def analyze_hub_antenna_correlation(
     try:
         logger.info(f"Analyzing hub antenna correlation for site {site_id}")
         
-        correlation_engine = CorrelationEngine()
-        analysis = correlation_engine.analyze_hub_antenna_degradation(
-            db=db,
-            site_id=site_id,
-            hours_lookback=hours_lookback
+        analysis, cache_info = await asyncio.to_thread(
+            _analyze_correlation, db, 'hub_antenna', site_id, hours_lookback
         )
         
         if not analysis:
@@ -572,9 +731,12 @@ async def analyze_hub_antenna_correlation(
             'status': 'success',
             'analysis': analysis.to_dict(),
             'timestamp': datetime.utcnow().isoformat(),
-            'analyzed_by': 'correlation_engine_v1.0.0'
+            'analyzed_by': 'correlation_engine_v1.0.0',
+            'cache': cache_info
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing hub antenna correlation: {e}")
         raise HTTPException(
@@ -608,11 +770,8 @@ async def analyze_satellite_correlation(
     try:
         logger.info(f"Analyzing satellite correlation for satellite {satellite_name}")
         
-        correlation_engine = CorrelationEngine()
-        analysis = correlation_engine.analyze_satellite_degradation(
-            db=db,
-            satellite_name=satellite_name,
-            hours_lookback=hours_lookback
+        analysis, cache_info = await asyncio.to_thread(
+            _analyze_correlation, db, 'satellite', satellite_name, hours_lookback
         )
         
         if not analysis:
@@ -625,9 +784,12 @@ async def analyze_satellite_correlation(
             'status': 'success',
             'analysis': analysis.to_dict(),
             'timestamp': datetime.utcnow().isoformat(),
-            'analyzed_by': 'correlation_engine_v1.0.0'
+            'analyzed_by': 'correlation_engine_v1.0.0',
+            'cache': cache_info
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing satellite correlation: {e}")
         raise HTTPException(
@@ -661,11 +823,8 @@ async def analyze_link_bidirectional_degradation(
     try:
         logger.info(f"Analyzing bidirectional degradation for link {link_id}")
         
-        correlation_engine = CorrelationEngine()
-        analysis = correlation_engine.analyze_link_bidirectional_degradation(
-            db=db,
-            link_id=link_id,
-            hours_lookback=hours_lookback
+        analysis, cache_info = await asyncio.to_thread(
+            _analyze_correlation, db, 'link', link_id, hours_lookback
         )
         
         if not analysis:
@@ -678,9 +837,12 @@ async def analyze_link_bidirectional_degradation(
             'status': 'success',
             'analysis': analysis.to_dict(),
             'timestamp': datetime.utcnow().isoformat(),
-            'analyzed_by': 'correlation_engine_v1.0.0'
+            'analyzed_by': 'correlation_engine_v1.0.0',
+            'cache': cache_info
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing bidirectional degradation: {e}")
         raise HTTPException(
@@ -688,3 +850,518 @@ async def analyze_link_bidirectional_degradation(
             detail=f"Failed to analyze bidirectional degradation: {str(e)}"
         )
 
+
+@router.post("/bcom/correlations/region/analyze")
+@limiter.limit("30/minute")
+async def analyze_regional_correlation(
+    site_id: Optional[int] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius_km: float = 50.0,
+    hours_lookback: int = Query(24, ge=1, le=MAX_CORRELATION_LOOKBACK_HOURS),
+    
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Analyze simultaneous degradation of nearby sites to identify weather / rain fade.
+    
+    Pattern: Sites within radius_km of each other degrading in the same hours
+    Root Cause: Regional weather, rain fade or sea state
+    
+    Args:
+        site_id: Center the region on this site
+        latitude: Center latitude (with longitude, instead of site_id)
+        longitude: Center longitude
+        radius_km: Region radius and largest gap between neighbouring sites (default: 50)
+        hours_lookback: Hours of historical data to analyze (default: 24)
+        
+    Without a center the whole fleet is analyzed.
+    
+    Returns:
+        Correlation analysis with one pattern per degraded region
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude and longitude must be given together"
+        )
+    if radius_km <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="radius_km must be positive"
+        )
+    
+    try:
+        logger.info(f"Analyzing regional correlation (site={site_id}, radius={radius_km} km)")
+        
+        def run():
+            engine = get_correlation_engine()
+            analysis = engine.analyze_regional_degradation(
+                db,
+                site_id=site_id,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius_km,
+                hours_lookback=hours_lookback
+            )
+            located = site_id is None or engine.geo_index.get(db).location(site_id) is not None
+            return analysis, located
+        
+        analysis, located = await asyncio.to_thread(run)
+        
+        if not analysis:
+            if not located:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Site {site_id} not found or has no location"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to analyze regional correlation"
+            )
+        
+        return {
+            'status': 'success',
+            'analysis': analysis.to_dict(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'analyzed_by': 'correlation_engine_v1.0.0'
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing regional correlation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze regional correlation: {str(e)}"
+        )
+
+
+@router.post("/bcom/correlations/root-cause")
+@limiter.limit("30/minute")
+async def analyze_incident_root_cause(
+    link_id: Optional[int] = None,
+    network_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    satellite_name: Optional[str] = None,
+    hours_lookback: int = Query(24, ge=1, le=MAX_CORRELATION_LOOKBACK_HOURS),
+    
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Run every applicable correlation analysis for an incident at once.
+    
+    A link brings in its network, its hub antenna (if its site is a hub), its
+    satellite and its own bidirectional analysis; explicit scopes are added.
+    The analyses run concurrently, each on its own database session, and
+    their patterns are ranked into root-cause candidates by confidence.
+    
+    Args:
+        link_id: Link the incident was reported on
+        network_id: Network to analyze
+        site_id: Hub antenna site to analyze
+        satellite_name: Satellite to analyze
+        hours_lookback: Hours of historical data to analyze (default: 24)
+        
+    Returns:
+        Ranked root-cause candidates and the analysis of every scope
+    """
+    if link_id is None and network_id is None and site_id is None and not satellite_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide link_id, network_id, site_id or satellite_name"
+        )
+    
+    try:
+        scopes = plan_scopes(get_topology_index().get(db), link_id, network_id, site_id, satellite_name)
+        logger.info(f"Analyzing root cause over {len(scopes)} scopes (link={link_id}, network={network_id})")
+        
+        incident = {
+            'link_id': link_id,
+            'network_id': network_id,
+            'site_id': site_id,
+            'satellite_name': satellite_name,
+            'hours_lookback': hours_lookback,
+        }
+        
+        def run():
+            # Sync the cache and window once; the analyses below run concurrently
+            _sync_correlation_state(db, hours_lookback)
+            return get_root_cause_analyzer().run(
+                scopes,
+                SessionLocal,
+                lambda scope_db, scope, scope_id: _analyze_correlation(
+                    scope_db, scope, scope_id, hours_lookback, sync=False
+                ),
+                incident
+            )
+        
+        report = await asyncio.to_thread(run)
+        
+        return {
+            'status': 'success',
+            **report.to_dict(),
+            'analyzed_by': 'correlation_engine_v1.0.0'
+        }
+    
+    except Exception as e:
+        logger.error(f"Error analyzing incident root cause: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze root cause: {str(e)}"
+        )
+
+
+@router.post("/bcom/correlations/links/matrix")
+@limiter.limit("20/minute")
+async def analyze_link_correlation_matrix(
+    network_id: Optional[int] = None,
+    link_ids: Optional[List[int]] = Query(None),
+    hours_lookback: int = Query(168, ge=1, le=MAX_CORRELATION_LOOKBACK_HOURS),
+    metric: str = 'grade',
+    method: str = 'pearson',
+    threshold: float = 0.8,
+    min_overlap: int = 12,
+    include_matrix: Optional[bool] = None,
+    
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Correlate link time series pairwise and cluster strongly co-moving links.
+    
+    Each link's metric is averaged per hour; every pair is correlated over the
+    hours both links reported. Links correlating at or above the threshold
+    are grouped into clusters, which often share a root cause that does not
+    follow network, hub or satellite boundaries.
+    
+    Args:
+        network_id: Restrict to one network (default: whole fleet)
+        link_ids: Restrict to these links
+        hours_lookback: Hours of history to correlate (default: 168)
+        metric: 'grade' or an IB/OB metric such as 'ib_degradation'
+        method: 'pearson' or 'spearman'
+        threshold: Minimum correlation for two links to be clustered (default: 0.8)
+        min_overlap: Minimum shared hours for a pair to be correlated (default: 12)
+        include_matrix: Return the full matrix (default: only for up to 200 links;
+            at most 1000 links when requested)
+        
+    Returns:
+        Link IDs, clusters and optionally the correlation matrix
+    """
+    if method not in CORRELATION_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"method must be one of {', '.join(CORRELATION_METHODS)}"
+        )
+    if metric not in GRID_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"metric must be one of {', '.join(GRID_METRICS)}"
+        )
+    
+    try:
+        logger.info(f"Correlating link series (network={network_id}, metric={metric}, method={method})")
+        
+        def run():
+            link_engine = LinkCorrelationEngine()
+            grid = link_engine.load_grid(
+                db=db,
+                hours_lookback=hours_lookback,
+                metric=metric,
+                network_id=network_id,
+                link_ids=link_ids
+            )
+            return link_engine.analyze(
+                grid,
+                method=method,
+                threshold=threshold,
+                min_overlap=min_overlap,
+                include_matrix=include_matrix,
+                scope='network' if network_id is not None else ('links' if link_ids else 'fleet'),
+                scope_id=network_id
+            ).to_dict()
+        
+        # Grid query and matrix products run off the event loop
+        analysis = await asyncio.to_thread(run)
+        
+        return {
+            'status': 'success',
+            'analysis': analysis,
+            'timestamp': datetime.utcnow().isoformat(),
+            'analyzed_by': 'link_correlation_v1.0.0'
+        }
+    
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error correlating link series: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to correlate link series: {str(e)}"
+        )
+
+
+@router.post("/bcom/correlations/links/co-degradation")
+@limiter.limit("20/minute")
+async def analyze_link_co_degradation(
+    network_id: Optional[int] = None,
+    hours_lookback: int = Query(168, ge=1, le=MAX_CORRELATION_LOOKBACK_HOURS),
+    threshold: float = 0.5,
+    min_hours: int = 3,
+    num_perm: int = Query(128, ge=16, le=MAX_MINHASH_PERMUTATIONS),
+    bands: int = Query(32, ge=1, le=MAX_MINHASH_PERMUTATIONS),
+    
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Cluster links that degrade in the same hours, across scope boundaries.
+    
+    Every link's set of degraded hours is summarized by a MinHash signature;
+    LSH buckets on the signatures select the candidate pairs, so the fleet is
+    clustered without comparing every pair of links. Clusters are labelled
+    with the hub antenna, satellite or network they fall into; unlabelled
+    clusters point at root causes the scope-based analyses do not cover.
+    
+    Args:
+        network_id: Restrict to one network (default: whole fleet)
+        hours_lookback: Hours of history to cluster (default: 168)
+        threshold: Minimum Jaccard similarity of degraded hours (default: 0.5)
+        min_hours: Ignore links degraded in fewer hours than this (default: 3)
+        num_perm: MinHash signature length (default: 128)
+        bands: LSH bands; must divide num_perm (default: 32)
+        
+    Returns:
+        Clusters with their similarity, shared hours and matching scope
+    """
+    try:
+        clusterer = CoDegradationClusterer(num_perm=num_perm, bands=bands)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        logger.info(f"Clustering co-degrading links (network={network_id}, {hours_lookback}h)")
+        
+        def run():
+            topology = get_topology_index().get(db)
+            link_ids = topology.links_under('network', network_id).tolist() if network_id is not None else None
+            degraded = clusterer.load_hours(
+                db=db,
+                hours_lookback=hours_lookback,
+                grade_threshold=get_correlation_engine().WARNING_GRADE_THRESHOLD,
+                min_hours=min_hours,
+                link_ids=link_ids
+            )
+            return clusterer.analyze(
+                degraded,
+                threshold=threshold,
+                topology=topology,
+                scope='network' if network_id is not None else 'fleet',
+                scope_id=network_id
+            ).to_dict()
+        
+        # Grade query, MinHash and LSH run off the event loop
+        analysis = await asyncio.to_thread(run)
+        
+        return {
+            'status': 'success',
+            'analysis': analysis,
+            'timestamp': datetime.utcnow().isoformat(),
+            'analyzed_by': 'co_degradation_v1.0.0'
+        }
+    
+    except Exception as e:
+        logger.error(f"Error clustering co-degrading links: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to cluster co-degrading links: {str(e)}"
+        )
+
+
+@router.get("/bcom/correlations/window")
+@limiter.limit("60/minute")
+async def get_correlation_window_stats(
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Sync the rolling correlation window and report its state.
+    
+    Analyses whose hours_lookback equals the window length are read from
+    this state instead of the raw grades.
+    
+    Returns:
+        Window length, buffered hours, grade counts and sync position
+    """
+    window = get_correlation_window()
+    if window.window_hours <= 0:
+        return {'enabled': False, **window.get_stats()}
+    
+    try:
+        added = window.sync(db)
+    except Exception as e:
+        logger.error(f"Error syncing correlation window: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sync correlation window: {str(e)}"
+        )
+    return {'enabled': True, 'grades_added': added, **window.get_stats()}
+
+
+# ==================== FLEET CORRELATION SWEEPS ====================
+
+@router.post("/bcom/correlations/sweeps", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+async def start_correlation_sweep(
+    background_tasks: BackgroundTasks,
+    hours_lookback: int = Query(24, ge=1, le=MAX_CORRELATION_LOOKBACK_HOURS),
+    scopes: Optional[List[str]] = Query(None),
+    request=None
+):
+    """
+    Start a fleet-wide correlation sweep.
+    
+    Loads the lookback window once and runs the network, hub antenna,
+    satellite and bidirectional detectors for every scope in the fleet,
+    storing the patterns in degradation_patterns. Poll the returned job.
+    
+    Args:
+        hours_lookback: Hours of historical data to sweep (default: 24)
+        scopes: Detectors to run: network, hub_antenna, satellite, link (default: all)
+        
+    Returns:
+        The pending sweep job
+    """
+    try:
+        job = get_sweep_registry().create(hours_lookback, scopes)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    logger.info(f"Starting correlation sweep {job.job_id} ({hours_lookback}h, scopes={job.scopes})")
+    background_tasks.add_task(execute_sweep_job, job, SessionLocal)
+    
+    return {
+        'status': 'accepted',
+        'job': job.to_dict(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/bcom/correlations/sweeps")
+@limiter.limit("60/minute")
+async def list_correlation_sweeps(request=None):
+    """
+    List recent sweep jobs of this worker, newest first.
+    
+    Returns:
+        Sweep jobs with progress and summaries
+    """
+    return {
+        'status': 'success',
+        'jobs': [job.to_dict() for job in get_sweep_registry().list()],
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/bcom/correlations/sweeps/{job_id}")
+@limiter.limit("120/minute")
+async def get_correlation_sweep(job_id: str, request=None):
+    """
+    Get the progress and result summary of a sweep job.
+    
+    Args:
+        job_id: Sweep job ID
+        
+    Returns:
+        Sweep job with progress, pattern counts and top patterns
+    """
+    job = get_sweep_registry().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sweep job {job_id} not found"
+        )
+    
+    return {
+        'status': 'success',
+        'job': job.to_dict(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/bcom/correlations/sweeps/{job_id}/patterns")
+@limiter.limit("60/minute")
+async def get_correlation_sweep_patterns(
+    job_id: str,
+    scope: Optional[str] = None,
+    pattern_type: Optional[str] = None,
+    min_severity: float = 0.0,
+    limit: int = 100,
+    offset: int = 0,
+    
+    db: Session = Depends(get_db),
+    request=None
+):
+    """
+    Get the stored patterns of a sweep, most severe first.
+    
+    Args:
+        job_id: Sweep job ID
+        scope: Filter by scope (network, hub_antenna, satellite, link)
+        pattern_type: Filter by pattern type
+        min_severity: Minimum severity (default: 0)
+        limit: Maximum patterns to return (default: 100)
+        offset: Patterns to skip (default: 0)
+        
+    Returns:
+        Stored degradation patterns
+    """
+    try:
+        query = db.query(DegradationPatternRecord).filter(
+            DegradationPatternRecord.sweep_id == job_id,
+            DegradationPatternRecord.severity >= min_severity
+        )
+        if scope:
+            query = query.filter(DegradationPatternRecord.scope == scope)
+        if pattern_type:
+            query = query.filter(DegradationPatternRecord.pattern_type == pattern_type)
+        
+        total = query.count()
+        records = query.order_by(
+            DegradationPatternRecord.severity.desc(),
+            DegradationPatternRecord.id
+        ).offset(offset).limit(limit).all()
+        
+        return {
+            'status': 'success',
+            'job_id': job_id,
+            'total': total,
+            'patterns': [
+                {
+                    'scope': r.scope,
+                    'scope_key': r.scope_key,
+                    'pattern_id': r.pattern_id,
+                    'pattern_type': r.pattern_type,
+                    'severity': r.severity,
+                    'confidence': r.confidence,
+                    'affected_items': r.affected_items,
+                    'root_cause': r.root_cause,
+                    'supporting_metrics': r.supporting_metrics,
+                    'timestamp': r.timestamp.isoformat(),
+                    'hours_duration': r.hours_duration,
+                    'links_affected_count': r.links_affected_count,
+                }
+                for r in records
+            ],
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    except Exception as e:
+        logger.error(f"Error retrieving sweep patterns: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve sweep patterns: {str(e)}"
+        )
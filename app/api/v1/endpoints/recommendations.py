@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import uuid
 from datetime import datetime, timedelta
 import logging
@@ -12,23 +12,31 @@ from app.models.schemas import (
 )
 from app.models.models import RecommendationRequest as RecommendationRequestModel
 from app.core.database import get_db
-from app.services.recommendation_engine import RecommendationEngine
-from app.services.model_loaders import RecommendationModelLoader
-from app.services.model_management import ModelManager
+from app.services.model_loaders import get_recommendation_model_loader
 from app.services.data_loader import get_data_loader
 from app.models.bcom_models import Link, DetectedAnomaly, Recommendation as RecommendationModel
+from app.core.config import settings
 from app.core.rate_limiter import limiter
-import os
+
+if TYPE_CHECKING:
+    from app.services.recommendation_engine import RecommendationEngine
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-recommendation_engine = RecommendationEngine()
-# Initialize ModelManager with models directory
-models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "models_cache")
-model_manager = ModelManager(models_dir)
-model_loader = RecommendationModelLoader(model_manager)
-data_loader = get_data_loader("data")
+# Created on first use so importing the API does not pull in sklearn/pandas/polars
+_recommendation_engine: Optional['RecommendationEngine'] = None
+# Shared loader over the production model registry (see MODELS_DIR)
+model_loader = get_recommendation_model_loader(settings.MODELS_DIR)
+
+
+def get_recommendation_engine() -> 'RecommendationEngine':
+    """Get the shared recommendation engine, importing it on first call."""
+    global _recommendation_engine
+    if _recommendation_engine is None:
+        from app.services.recommendation_engine import RecommendationEngine
+        _recommendation_engine = RecommendationEngine()
+    return _recommendation_engine
 
 
 @router.post("/generate", response_model=RecommendationResponse)
@@ -40,7 +48,7 @@ async def generate_recommendations(
     request=None
 ):
     try:
-        recommendations_data = recommendation_engine.generate_recommendations(
+        recommendations_data = get_recommendation_engine().generate_recommendations(
             context=request_data.context,
             entity_id=request_data.entity_id,
             historical_data=request_data.historical_data,
@@ -84,7 +92,7 @@ async def get_recommendations_by_priority(
     request=None
 ):
     try:
-        recommendations_data = recommendation_engine.get_recommendations_by_priority(priority)
+        recommendations_data = get_recommendation_engine().get_recommendations_by_priority(priority)
         recommendations = [Recommendation(**rec) for rec in recommendations_data]
 
         return {
@@ -108,7 +116,7 @@ async def get_recommendations_by_tags(
     request=None
 ):
     try:
-        recommendations_data = recommendation_engine.get_recommendations_by_tags(tags)
+        recommendations_data = get_recommendation_engine().get_recommendations_by_tags(tags)
         recommendations = [Recommendation(**rec) for rec in recommendations_data]
 
         return {
@@ -210,7 +218,7 @@ async def generate_link_recommendations(
     try:
         # Get link context
         try:
-            link_context = data_loader.get_link_full_context(link_id)
+            link_context = get_data_loader(settings.DATA_DIR).get_link_full_context(link_id)
         except Exception as e:
             logger.warning(f"DataLoader failed for link {link_id}, attempting database")
             link = db.query(Link).filter_by(link_id=link_id).first()
@@ -221,7 +229,7 @@ async def generate_link_recommendations(
         # Get recent grades
         start_date = (datetime.now() - timedelta(days=days_lookback)).date()
         try:
-            grades = data_loader.get_link_grades(link_id, start_date, datetime.now().date())
+            grades = get_data_loader(settings.DATA_DIR).get_link_grades(link_id, start_date, datetime.now().date())
         except Exception:
             grades = []
 
@@ -383,7 +391,7 @@ async def generate_network_health_report(
     try:
         # Get network summary
         try:
-            summary = data_loader.get_network_performance_summary(network_id)
+            summary = get_data_loader(settings.DATA_DIR).get_network_performance_summary(network_id)
         except Exception as e:
             logger.warning(f"DataLoader failed for network {network_id}")
             summary = {}
@@ -500,7 +508,7 @@ async def get_customer_improvement_plan(
     try:
         # Get customer summary
         try:
-            summary = data_loader.get_customer_summary(customer_id)
+            summary = get_data_loader(settings.DATA_DIR).get_customer_summary(customer_id)
         except Exception:
             summary = {}
 
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
-from typing import List, Union
+from typing import List, Optional, Union
 
 
 class Settings(BaseSettings):
@@ -25,6 +25,58 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Production model registry (ml_models/<category>/<name>_v<version>/)
+    MODELS_DIR: str = "ml_models"
+
+    # Reference data (Entities.csv, site_grades.csv, kpis/)
+    DATA_DIR: str = "data"
+
+    # Preload models and data indexes at startup; /ready reports 503 until done
+    WARMUP_ON_STARTUP: bool = True
+
+    # Checksum algorithm for newly saved models (md5, sha256, blake2b) and
+    # whether to verify checksums before loading (digests are cached; models
+    # without a recorded checksum still load, with a warning)
+    MODEL_CHECKSUM_ALGORITHM: str = "md5"
+    MODEL_VERIFY_ON_LOAD: bool = False
+
+    # Poll the model manifests and hot-swap new latest versions (0 disables)
+    MODEL_WATCH_INTERVAL_SECONDS: int = 30
+
+    # Directory for the on-disk model cache tier (reused by other workers on a
+    # host and after restarts)
+    MODEL_CACHE_DIR: Optional[str] = None
+
+    # Background model cache maintenance: sweep interval, and refresh entries
+    # with at least REFRESH_MIN_HITS hits this many minutes before they expire
+    MODEL_CACHE_SWEEP_INTERVAL_SECONDS: int = 60
+    MODEL_CACHE_REFRESH_AHEAD_MINUTES: int = 5
+    MODEL_CACHE_REFRESH_MIN_HITS: int = 3
+
+    # Inference micro-batching: how long the first queued request waits for
+    # others, and the row count that triggers an immediate flush
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 5.0
+    INFERENCE_BATCH_MAX_ROWS: int = 4096
+
+    # Streaming scoring: re-check each entity's recent window with the
+    # pre-trained detector every N points (0 disables; flagged points are
+    # always confirmed when a model is published)
+    STREAMING_CONFIRM_INTERVAL: int = 64
+
+    # Rolling correlation window: analyses with exactly this lookback are read
+    # from incrementally maintained state instead of raw grades (0 disables)
+    CORRELATION_WINDOW_HOURS: int = 24
+
+    # Correlation result cache: identical analyses within one time bucket are
+    # served from memory (0 disables), bounded by entry count
+    CORRELATION_CACHE_BUCKET_SECONDS: int = 60
+    CORRELATION_CACHE_MAX_ENTRIES: int = 1000
+
+    # Combined root-cause analysis: concurrent analyses (each holds one pooled
+    # session) and how long one incident may take
+    ROOT_CAUSE_MAX_WORKERS: int = 4
+    ROOT_CAUSE_TIMEOUT_SECONDS: float = 30.0
+
     # CORS Configuration - comma-separated string or list
     ALLOWED_ORIGINS: Union[List[str], str] = "*"
 
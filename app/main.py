@@ -3,12 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from fastapi.responses import FileResponse
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1 import api_router
 from app.core.rate_limiter import limiter
+from app.services.correlation_cache import get_correlation_cache
+from app.services.correlation_window import get_correlation_window
+from app.services.root_cause import get_root_cause_analyzer
+from app.services.site_geo_index import get_site_geo_index
+from app.services.streaming_detector import get_streaming_detector
+from app.services.inference_batcher import get_inference_batchers
+from app.services.model_cache import get_model_cache, run_cache_maintenance
+from app.services.model_loaders import get_anomaly_model_loader, get_recommendation_model_loader
+from app.services.model_management import get_model_manager
+from app.services.model_watcher import ModelWatcher
+from app.services.warmup import get_warmup_state, warm_up
 from slowapi.errors import RateLimitExceeded
 
 logging.basicConfig(level=logging.INFO)
@@ -36,8 +48,59 @@ async def lifespan(app: FastAPI):
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
+    if settings.MODEL_CACHE_DIR:
+        get_model_cache().enable_disk_tier(settings.MODEL_CACHE_DIR)
+    get_inference_batchers().configure(
+        settings.INFERENCE_BATCH_MAX_WAIT_MS,
+        settings.INFERENCE_BATCH_MAX_ROWS
+    )
+    get_correlation_window().configure(settings.CORRELATION_WINDOW_HOURS)
+    get_site_geo_index().configure(settings.DATA_DIR)
+    get_correlation_cache().configure(
+        settings.CORRELATION_CACHE_BUCKET_SECONDS,
+        settings.CORRELATION_CACHE_MAX_ENTRIES
+    )
+    get_root_cause_analyzer().configure(
+        settings.ROOT_CAUSE_MAX_WORKERS,
+        settings.ROOT_CAUSE_TIMEOUT_SECONDS
+    )
+    cache_maintenance = asyncio.create_task(run_cache_maintenance(
+        get_model_cache(),
+        interval_seconds=settings.MODEL_CACHE_SWEEP_INTERVAL_SECONDS,
+        refresh_ahead_minutes=settings.MODEL_CACHE_REFRESH_AHEAD_MINUTES,
+        refresh_min_hits=settings.MODEL_CACHE_REFRESH_MIN_HITS
+    ))
+    get_model_manager(settings.MODELS_DIR).configure(
+        settings.MODEL_CHECKSUM_ALGORITHM,
+        settings.MODEL_VERIFY_ON_LOAD
+    )
+    model_loaders = [
+        get_anomaly_model_loader(settings.MODELS_DIR),
+        get_recommendation_model_loader(settings.MODELS_DIR),
+    ]
+    get_streaming_detector().configure(settings.STREAMING_CONFIRM_INTERVAL)
+    get_streaming_detector().register_model_confirmers(model_loaders[0])
+    background_tasks = [cache_maintenance]
+    if settings.WARMUP_ON_STARTUP:
+        background_tasks.append(asyncio.create_task(warm_up(
+            get_warmup_state(),
+            model_loaders,
+            data_dir=settings.DATA_DIR
+        )))
+    else:
+        get_warmup_state().mark_ready()
+    if settings.MODEL_WATCH_INTERVAL_SECONDS > 0:
+        for loader in model_loaders:
+            background_tasks.append(asyncio.create_task(
+                ModelWatcher(loader).run(settings.MODEL_WATCH_INTERVAL_SECONDS)
+            ))
     yield
     logger.info("Shutting down BCom AI Services API...")
+    for task in background_tasks:
+        task.cancel()
+    # Let models being written to the disk tier land
+    get_model_cache().flush(timeout=10)
+    get_root_cause_analyzer().shutdown()
 
 
 app = FastAPI(
@@ -80,3 +143,13 @@ async def health_check():
         "status": "healthy",
         "service": "BCom AI Services"
     }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup warm-up has finished."""
+    state = get_warmup_state()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if state.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=state.to_dict()
+    )
@@ -321,6 +321,41 @@ class Recommendation(Base):
         return f"<Recommendation(link_id={self.link_id}, type='{self.recommendation_type}', priority={self.priority})>"
 
 
+# ==================== CORRELATION PATTERNS ====================
+
+class DegradationPatternRecord(Base):
+    """Degradation pattern stored by a fleet-wide correlation sweep."""
+    
+    __tablename__ = "degradation_patterns"
+    
+    id = Column(BigInteger, primary_key=True, index=True)
+    sweep_id = Column(String(64), nullable=False)
+    scope = Column(String(50), nullable=False)  # network, hub_antenna, satellite, link
+    scope_key = Column(String(255), nullable=False)  # network_id, site_id, satellite name or link_id
+    pattern_id = Column(String(255), nullable=False)
+    pattern_type = Column(String(100), nullable=False)
+    severity = Column(Float)
+    confidence = Column(Float)
+    root_cause = Column(Text)
+    affected_items = Column(JSONB)  # link_ids / site_ids
+    supporting_metrics = Column(JSONB)
+    timestamp = Column(DateTime, nullable=False)
+    hours_duration = Column(Integer)
+    devices_affected_count = Column(Integer)
+    links_affected_count = Column(Integer)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("idx_degradation_patterns_sweep", "sweep_id"),
+        Index("idx_degradation_patterns_scope", "scope", "scope_key"),
+        Index("idx_degradation_patterns_type", "pattern_type"),
+        Index("idx_degradation_patterns_timestamp", "timestamp"),
+    )
+    
+    def __repr__(self):
+        return f"<DegradationPatternRecord(scope='{self.scope}:{self.scope_key}', type='{self.pattern_type}')>"
+
+
 # ==================== MODEL METRICS ====================
 
 class ModelMetrics(Base):
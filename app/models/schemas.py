@@ -10,6 +10,18 @@ class AnomalyType(str, Enum):
     LINK = "link"
 
 
+class DetectionMode(str, Enum):
+    FULL = "full"
+    FAST = "fast"
+    AUTO = "auto"
+
+
+class StreamEntityType(str, Enum):
+    DEVICE = "device"
+    LINK = "link"
+    NETWORK = "network"
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -74,6 +86,14 @@ class AnomalyDetectionRequest(BaseModel):
     data: List[Dict[str, Any]]
     sensitivity: float = Field(default=0.95, ge=0.0, le=1.0)
     lookback_window: int = Field(default=100, ge=10, le=1000)
+    mode: DetectionMode = DetectionMode.FULL
+    latency_budget_ms: Optional[int] = Field(default=None, ge=10, le=10000)
+
+
+class StreamingPointRequest(BaseModel):
+    metrics: Dict[str, float]
+    timestamp: Optional[datetime] = None
+    sensitivity: float = Field(default=0.95, ge=0.5, le=1.0)
 
 
 class AnomalyResult(BaseModel):
@@ -108,6 +128,7 @@ class AnomalyDetectionResponse(BaseModel):
     results: List[AnomalyResult]
     overall_status: str
     timestamp: datetime
+    detection_mode: Optional[DetectionMode] = None
 
 
 class RecommendationResponse(BaseModel):
@@ -4,7 +4,7 @@ import polars as pl
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.covariance import EllipticEnvelope
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 import pickle
@@ -12,6 +12,21 @@ import hashlib
 
 logger = logging.getLogger(__name__)
 
+# Detection modes: "full" fits on every row, "fast" fits on a subsample sized
+# to a latency budget and scores all rows, "auto" picks fast exactly when a
+# full fit would not fit the budget
+DETECTION_MODES = ("full", "fast", "auto")
+DEFAULT_LATENCY_BUDGET_MS = 200
+# IsolationForest(n_estimators=100) fit cost, measured on one core (5-8
+# features, 500-40000 rows): building the trees on their 256-row subsamples
+# takes a fixed ~165 ms, and scoring the training rows for the contamination
+# threshold adds ~0.01 ms per row; only the latter shrinks with a subsample
+FIT_FIXED_MS = 165
+FIT_ROWS_PER_MS = 100
+MIN_FIT_SAMPLE_SIZE = 256
+# Smallest payload fast mode subsamples under the default budget (3501 rows)
+AUTO_FAST_MODE_MIN_ROWS = int((DEFAULT_LATENCY_BUDGET_MS - FIT_FIXED_MS) * FIT_ROWS_PER_MS) + 1
+
 
 class AnomalyDetector:
     """
@@ -50,44 +65,133 @@ class AnomalyDetector:
     def _calculate_data_hash(self, data: np.ndarray) -> str:
         """
         Calculate hash of data array for cache key generation.
-        Uses shape and first few values to identify similar data patterns.
+        Hashes the shape, dtype and every value, so only identical payloads share a model.
+        """
+        digest = hashlib.md5(f"{data.shape}_{data.dtype}_".encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+        return digest.hexdigest()[:16]
+
+    def resolve_detection_mode(
+        self, row_count: int, mode: str = "full", latency_budget_ms: Optional[int] = None
+    ) -> str:
         """
-        hash_input = f"{data.shape}_{data.dtype}_{data.flat[:10].tobytes()}"
-        return hashlib.md5(hash_input.encode()).hexdigest()[:16]
+        Resolve the requested detection mode into "full" or "fast".
 
-    def _get_cached_detector(self, anomaly_type: str, feature_columns: List[str]) -> 'AnomalyDetector':
+        Args:
+            row_count: Number of rows in the payload
+            mode: "full", "fast" or "auto"
+            latency_budget_ms: Fit latency budget (default: DEFAULT_LATENCY_BUDGET_MS)
+
+        Returns:
+            Concrete mode to use; auto is fast only when fast mode would subsample
         """
-        Try to get a cached detector instance.
-        Falls back to None if caching is disabled.
+        if mode not in DETECTION_MODES:
+            raise ValueError(f"Unsupported detection mode: {mode}")
+        if mode == "auto":
+            return "fast" if self._fit_sample_size(row_count, latency_budget_ms) < row_count else "full"
+        return mode
+
+    def _fit_sample_size(self, row_count: int, latency_budget_ms: Optional[int] = None) -> int:
+        """Number of rows to fit on in fast mode for the given latency budget."""
+        budget = latency_budget_ms or DEFAULT_LATENCY_BUDGET_MS
+        rows = int((budget - FIT_FIXED_MS) * FIT_ROWS_PER_MS)
+        return min(row_count, max(MIN_FIT_SAMPLE_SIZE, rows))
+
+    def _stratified_sample(self, row_count: int, sample_size: int) -> np.ndarray:
         """
-        if not self.cache_enabled:
-            return None
+        Pick one random row from each of sample_size equal-width strata.
 
-        try:
-            from app.services.model_cache import get_model_cache
-            cache = get_model_cache()
-            cached_detector = cache.get(anomaly_type, len(feature_columns), 1)
-            return cached_detector
-        except ImportError:
-            logger.warning("Model cache not available, skipping cache lookup")
-            return None
-
-    def _cache_detector(self, anomaly_type: str, feature_columns: List[str]) -> None:
+        Rows arrive in time order, so this keeps the whole window represented
+        instead of over-sampling one period.
+        """
+        rng = np.random.default_rng(42)
+        stride = row_count / sample_size
+        offsets = np.floor(np.arange(sample_size) * stride + rng.random(sample_size) * stride)
+        return np.minimum(offsets.astype(np.int64), row_count - 1)
+
+    def _train(
+        self,
+        X: np.ndarray,
+        contamination: float,
+        mode: str = "full",
+        latency_budget_ms: Optional[int] = None,
+    ) -> 'AnomalyDetector':
+        """
+        Fit the scaler and the Isolation Forest on a payload.
+
+        In fast mode the forest is fit on a stratified subsample; the decision
+        threshold learnt from the sample is applied to the full set.
+
+        Returns:
+            self, fitted
+        """
+        X_fit = self.scaler.fit_transform(X)
+        if mode == "fast":
+            sample_size = self._fit_sample_size(len(X_fit), latency_budget_ms)
+            if sample_size < len(X_fit):
+                X_fit = X_fit[self._stratified_sample(len(X_fit), sample_size)]
+                logger.debug(f"Fast mode: fitting on {sample_size} of {len(X)} rows")
+
+        self.isolation_forest = IsolationForest(
+            contamination=contamination,
+            random_state=42,
+            n_estimators=100
+        )
+        self.isolation_forest.fit(X_fit)
+        return self
+
+    def _score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Cache the current detector instance.
+        Score every row in one vectorized pass.
+
+        Returns:
+            Tuple of (predictions, anomaly scores) for all rows
+        """
+        anomaly_scores = self.isolation_forest.score_samples(self.scaler.transform(X))
+        predictions = np.where(anomaly_scores < self.isolation_forest.offset_, -1, 1)
+        return predictions, anomaly_scores
+
+    def _fitted_detector(
+        self,
+        anomaly_type: str,
+        X: np.ndarray,
+        contamination: float,
+        mode: str = "full",
+        latency_budget_ms: Optional[int] = None,
+    ) -> 'AnomalyDetector':
+        """
+        Detector fitted on a payload, from the model cache when caching is enabled.
+
+        Identical payloads (same type, parameters and values) share one cached
+        detector and concurrent misses train it once. The fit is seeded, so the
+        key fully determines the model: the entry is cached as deterministic,
+        which makes the cache extend its expiry rather than refit it, and the
+        payload is not kept alive for refreshes. Without caching this detector
+        itself is fitted.
         """
         if not self.cache_enabled:
-            return
+            return self._train(X, contamination, mode, latency_budget_ms)
 
-        try:
-            from app.services.model_cache import get_model_cache
-            cache = get_model_cache()
-            cache.set(anomaly_type, len(feature_columns), 1, self)
-        except ImportError:
-            logger.warning("Model cache not available, skipping cache storage")
-            return
-
-    def detect_network_anomalies(self, data: List[Dict[str, Any]], sensitivity: float = 0.95) -> List[Dict[str, Any]]:
+        from app.services.model_cache import get_model_cache
+
+        # The latency budget only changes the fit in fast mode
+        variant = f"fast{latency_budget_ms or DEFAULT_LATENCY_BUDGET_MS}" if mode == "fast" else mode
+        key = f"{anomaly_type}_{variant}_{contamination:g}_{self._calculate_data_hash(X)}"
+
+        def train() -> 'AnomalyDetector':
+            return AnomalyDetector(self.contamination, cache_enabled=False)._train(
+                X, contamination, mode, latency_budget_ms
+            )
+
+        return get_model_cache().get_or_create(key, X.shape[1], len(X), train, deterministic=True)
+
+    def detect_network_anomalies(
+        self,
+        data: List[Dict[str, Any]],
+        sensitivity: float = 0.95,
+        mode: str = "full",
+        latency_budget_ms: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         feature_columns = ['bandwidth_usage', 'packet_loss', 'latency', 'error_rate', 'connection_count']
 
         try:
@@ -98,15 +202,10 @@ class AnomalyDetector:
                 return []
 
             contamination = 1 - sensitivity
-            self.isolation_forest = IsolationForest(
-                contamination=contamination,
-                random_state=42,
-                n_estimators=100
+            detector = self._fitted_detector(
+                'network', X, contamination, self.resolve_detection_mode(len(X), mode, latency_budget_ms), latency_budget_ms
             )
-
-            X_scaled = self.scaler.fit_transform(X)
-            predictions = self.isolation_forest.fit_predict(X_scaled)
-            anomaly_scores = self.isolation_forest.score_samples(X_scaled)
+            predictions, anomaly_scores = detector._score(X)
 
             anomalies = []
             for idx, (pred, score) in enumerate(zip(predictions, anomaly_scores)):
@@ -130,7 +229,13 @@ class AnomalyDetector:
             logger.error(f"Error in network anomaly detection: {str(e)}")
             raise
 
-    def detect_site_anomalies(self, data: List[Dict[str, Any]], sensitivity: float = 0.95) -> List[Dict[str, Any]]:
+    def detect_site_anomalies(
+        self,
+        data: List[Dict[str, Any]],
+        sensitivity: float = 0.95,
+        mode: str = "full",
+        latency_budget_ms: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         feature_columns = ['response_time', 'uptime_percentage', 'request_count', 'error_count', 'cpu_usage', 'memory_usage']
 
         try:
@@ -141,15 +246,10 @@ class AnomalyDetector:
                 return []
 
             contamination = 1 - sensitivity
-            self.isolation_forest = IsolationForest(
-                contamination=contamination,
-                random_state=42,
-                n_estimators=100
+            detector = self._fitted_detector(
+                'site', X, contamination, self.resolve_detection_mode(len(X), mode, latency_budget_ms), latency_budget_ms
             )
-
-            X_scaled = self.scaler.fit_transform(X)
-            predictions = self.isolation_forest.fit_predict(X_scaled)
-            anomaly_scores = self.isolation_forest.score_samples(X_scaled)
+            predictions, anomaly_scores = detector._score(X)
 
             anomalies = []
             for idx, (pred, score) in enumerate(zip(predictions, anomaly_scores)):
@@ -173,7 +273,13 @@ class AnomalyDetector:
             logger.error(f"Error in site anomaly detection: {str(e)}")
             raise
 
-    def detect_link_anomalies(self, data: List[Dict[str, Any]], sensitivity: float = 0.95) -> List[Dict[str, Any]]:
+    def detect_link_anomalies(
+        self,
+        data: List[Dict[str, Any]],
+        sensitivity: float = 0.95,
+        mode: str = "full",
+        latency_budget_ms: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         feature_columns = ['throughput', 'utilization', 'errors', 'discards']
 
         try:
@@ -184,15 +290,10 @@ class AnomalyDetector:
                 return []
 
             contamination = 1 - sensitivity
-            self.isolation_forest = IsolationForest(
-                contamination=contamination,
-                random_state=42,
-                n_estimators=100
+            detector = self._fitted_detector(
+                'link', X, contamination, self.resolve_detection_mode(len(X), mode, latency_budget_ms), latency_budget_ms
             )
-
-            X_scaled = self.scaler.fit_transform(X)
-            predictions = self.isolation_forest.fit_predict(X_scaled)
-            anomaly_scores = self.isolation_forest.score_samples(X_scaled)
+            predictions, anomaly_scores = detector._score(X)
 
             anomalies = []
             for idx, (pred, score) in enumerate(zip(predictions, anomaly_scores)):
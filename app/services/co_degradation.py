@@ -0,0 +1,437 @@
+"""
+Co-degradation clustering of links with MinHash/LSH.
+
+Each link is summarized by the set of hours in which it had at least one
+degraded grade. Links whose degraded-hour sets overlap strongly (Jaccard
+similarity) probably share a root cause, whether or not they share a
+network, hub or satellite.
+
+Comparing every pair of links is quadratic in the fleet size. Instead, every
+set is compressed into a MinHash signature; signatures are cut into bands
+and links agreeing on a whole band land in the same LSH bucket. Only links
+sharing a bucket become candidate pairs, whose exact Jaccard similarity is
+then checked against the sparse degraded-hour matrix. With b bands of r rows,
+a pair with similarity s becomes a candidate with probability
+1 - (1 - s^r)^b, so pairs well above (1/b)^(1/r) are almost always found and
+dissimilar pairs almost never compared.
+
+Clusters are the connected components of the verified pairs. Each cluster is
+annotated with the predefined scope (hub antenna, satellite, network) it
+falls into, if any; clusters that fit none point at causes the scope-based
+detectors in correlation_engine cannot see.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import GradeColumns
+from app.services.link_correlation import cluster_pairs
+from app.services.satellite_index import normalize_satellite
+from app.services.topology_index import Topology
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Mersenne prime modulus of the universal hash functions; (a * x + b) stays below 2^63
+_PRIME = (1 << 31) - 1
+
+
+# ==================== DATA CLASSES ====================
+
+@dataclass
+class DegradedHours:
+    """Sparse link x hour matrix of degraded hours."""
+
+    link_ids: np.ndarray  # (n_links,) int64, sorted
+    start: np.datetime64  # first hour of the axis, datetime64[h]
+    matrix: "scipy.sparse.csr_matrix"  # (n_links, n_hours) bool
+
+    @classmethod
+    def from_arrays(
+        cls,
+        link_ids: np.ndarray,
+        timestamps: np.ndarray,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_hours: int = 1
+    ) -> 'DegradedHours':
+        """
+        Build from the link IDs and timestamps of degraded grades.
+
+        Args:
+            link_ids: Link ID of every degraded grade
+            timestamps: Timestamp of every degraded grade
+            start: First hour of the axis, defaults to the earliest grade
+            end: Last hour of the axis, defaults to the latest grade
+            min_hours: Drop links degraded in fewer hours than this
+
+        Returns:
+            DegradedHours with one row per remaining link
+        """
+        from scipy.sparse import csr_matrix
+
+        link_ids = np.asarray(link_ids, dtype=np.int64)
+        stamps = np.asarray(timestamps, dtype='datetime64[us]').astype('datetime64[h]')
+        first = np.datetime64(start, 'h') if start is not None else (stamps.min() if len(stamps) else None)
+        last = np.datetime64(end, 'h') if end is not None else (stamps.max() if len(stamps) else None)
+        if first is None or last < first:
+            return cls(np.empty(0, np.int64), np.datetime64('1970-01-01T00', 'h'), csr_matrix((0, 0), dtype=bool))
+
+        in_range = (stamps >= first) & (stamps <= last)
+        n_hours = int((last - first).astype(np.int64)) + 1
+        links, link_index = np.unique(link_ids[in_range], return_inverse=True)
+        hour_index = (stamps[in_range] - first).astype(np.int64)
+
+        # One entry per (link, hour) cell, however many grades it had
+        cells = np.unique(link_index * n_hours + hour_index)
+        rows, cols = np.divmod(cells, n_hours)
+        matrix = csr_matrix((np.ones(len(cells), dtype=bool), (rows, cols)), shape=(len(links), n_hours))
+
+        keep = np.diff(matrix.indptr) >= max(min_hours, 1)
+        return cls(links[keep], first, matrix[keep])
+
+    @classmethod
+    def from_columns(
+        cls,
+        grades: GradeColumns,
+        grade_threshold: float = 7.0,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_hours: int = 1
+    ) -> 'DegradedHours':
+        """Build from grade columns, counting grades below grade_threshold as degraded."""
+        degraded = grades.grade < grade_threshold
+        return cls.from_arrays(grades.link_id[degraded], grades.timestamp[degraded], start, end, min_hours)
+
+    def __len__(self) -> int:
+        return len(self.link_ids)
+
+    @property
+    def hour_counts(self) -> np.ndarray:
+        """Number of degraded hours, per link."""
+        return np.diff(self.matrix.indptr)
+
+    def jaccard(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Exact Jaccard similarity of the degraded-hour sets of link pairs (by row index)."""
+        if not len(rows):
+            return np.empty(0)
+        shared = np.asarray(self.matrix[rows].multiply(self.matrix[cols]).sum(axis=1), dtype=np.float64).ravel()
+        counts = self.hour_counts
+        return shared / (counts[rows] + counts[cols] - shared)
+
+
+@dataclass
+class CoDegradationResult:
+    """Co-degradation clustering result."""
+
+    analysis_id: str
+    scope: str  # 'network', 'links', 'fleet'
+    scope_id: Optional[int]
+    timestamp: datetime
+    hours_analyzed: int
+    links_analyzed: int
+    candidate_pairs: int
+    similar_pairs: int
+    clusters: List[Dict]
+    parameters: Dict
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'analysis_id': self.analysis_id,
+            'scope': self.scope,
+            'scope_id': self.scope_id,
+            'timestamp': self.timestamp.isoformat() if isinstance(self.timestamp, datetime) else self.timestamp,
+            'hours_analyzed': self.hours_analyzed,
+            'links_analyzed': self.links_analyzed,
+            'candidate_pairs': self.candidate_pairs,
+            'similar_pairs': self.similar_pairs,
+            'clusters': self.clusters,
+            'unexplained_clusters': sum(1 for c in self.clusters if c['matches_scope'] is None),
+            'parameters': self.parameters,
+        }
+
+
+# ==================== MINHASH / LSH ====================
+
+def minhash_signatures(
+    degraded: DegradedHours,
+    num_perm: int = 128,
+    seed: int = 0,
+    memory_budget_mb: float = 64
+) -> np.ndarray:
+    """
+    MinHash signature of every link's degraded-hour set.
+
+    Hours are hashed by their absolute hour number, so signatures of the same
+    set agree across windows. Permutations are processed in chunks so that at
+    most memory_budget_mb of hashed (link, hour) cells is alive at a time.
+
+    Args:
+        degraded: Degraded-hour matrix; every link needs at least one hour
+        num_perm: Number of hash functions (signature length)
+        seed: Seed of the hash function coefficients
+        memory_budget_mb: Budget for the hashed cells of one chunk
+
+    Returns:
+        (n_links, num_perm) int64 signatures
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+
+    matrix = degraded.matrix
+    signatures = np.empty((len(degraded), num_perm), dtype=np.int64)
+    if not len(degraded):
+        return signatures
+
+    hours = (degraded.start.astype(np.int64) + np.arange(matrix.shape[1], dtype=np.int64)) % _PRIME
+    cells = matrix.indices
+    step = max(1, int(memory_budget_mb * 1024 * 1024) // max(8 * len(cells), 1))
+    for start in range(0, num_perm, step):
+        stop = min(start + step, num_perm)
+        # Hash of every hour, then the minimum over each link's hours
+        hashed = (np.outer(hours, a[start:stop]) + b[start:stop]) % _PRIME
+        signatures[:, start:stop] = np.minimum.reduceat(hashed[cells], matrix.indptr[:-1], axis=0)
+    return signatures
+
+
+def lsh_candidate_pairs(
+    signatures: np.ndarray,
+    bands: int = 32,
+    max_bucket: int = 64
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs of links sharing at least one LSH bucket.
+
+    Signatures are cut into bands of num_perm / bands rows; links with
+    identical rows in a band share that band's bucket. Buckets larger than
+    max_bucket are connected as a star around their first link instead of
+    pairwise, which keeps the candidate count linear in the bucket size and
+    still yields one connected cluster.
+
+    Args:
+        signatures: (n_links, num_perm) MinHash signatures
+        bands: Number of bands; must divide num_perm
+        max_bucket: Largest bucket expanded into all of its pairs
+
+    Returns:
+        Tuple of (row indices, column indices) of unique pairs with row < column
+    """
+    n_links, num_perm = signatures.shape
+    if bands <= 0 or num_perm % bands:
+        raise ValueError(f"bands ({bands}) must divide the signature length ({num_perm})")
+
+    rows_per_band = num_perm // bands
+    pair_keys = []
+    for band in range(bands):
+        band_rows = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        _, bucket = np.unique(band_rows, axis=0, return_inverse=True)
+        bucket = bucket.ravel()
+        sizes = np.bincount(bucket)
+        if sizes.max(initial=0) < 2:
+            continue
+        order = np.argsort(bucket, kind='stable')
+        for members in np.split(order, np.cumsum(sizes)[:-1]):
+            if len(members) < 2:
+                continue
+            if len(members) > max_bucket:
+                i, j = np.full(len(members) - 1, members[0]), members[1:]
+            else:
+                upper_i, upper_j = np.triu_indices(len(members), k=1)
+                i, j = members[upper_i], members[upper_j]
+            pair_keys.append(np.minimum(i, j) * n_links + np.maximum(i, j))
+
+    if not pair_keys:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.divmod(np.unique(np.concatenate(pair_keys)), n_links)
+
+
+# ==================== CLUSTERER ====================
+
+class CoDegradationClusterer:
+    """Groups links by the similarity of their degraded hours."""
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        max_bucket: int = 64,
+        memory_budget_mb: float = 64,
+        seed: int = 0
+    ):
+        """
+        Initialize clusterer.
+
+        Args:
+            num_perm: MinHash signature length
+            bands: LSH bands; must divide num_perm
+            max_bucket: Largest LSH bucket expanded into all of its pairs
+            memory_budget_mb: Budget for the hashed cells of one signature chunk
+            seed: Seed of the hash functions
+        """
+        if bands <= 0 or num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.logger = logging.getLogger(__name__)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_bucket = max_bucket
+        self.memory_budget_mb = memory_budget_mb
+        self.seed = seed
+
+    @property
+    def candidate_threshold(self) -> float:
+        """Similarity at which a pair becomes a candidate with probability ~0.5."""
+        return (1.0 / self.bands) ** (self.bands / self.num_perm)
+
+    def load_hours(
+        self,
+        db: Session,
+        hours_lookback: int = 168,
+        grade_threshold: float = 7.0,
+        min_hours: int = 3,
+        link_ids: Optional[Sequence[int]] = None
+    ) -> DegradedHours:
+        """
+        Fetch the degraded grades of the window in one query.
+
+        Args:
+            db: Database session
+            hours_lookback: Hours of history to cluster
+            grade_threshold: Grades below this count as degraded
+            min_hours: Drop links degraded in fewer hours than this
+            link_ids: Restrict to these links
+
+        Returns:
+            DegradedHours ending at the current hour
+        """
+        from app.models.bcom_models import SiteGrade
+
+        end = datetime.utcnow()
+        start = end - timedelta(hours=hours_lookback)
+        query = db.query(SiteGrade.link_id, SiteGrade.timestamp).filter(
+            SiteGrade.timestamp >= start,
+            SiteGrade.grade < grade_threshold
+        )
+        if link_ids is not None:
+            query = query.filter(SiteGrade.link_id.in_(list(link_ids)))
+
+        rows = query.all()
+        link_ids = np.fromiter((row.link_id for row in rows), dtype=np.int64, count=len(rows))
+        # Epoch offsets, as in GradeColumns.from_rows; timestamps are naive UTC
+        micros = np.fromiter(((row.timestamp - _EPOCH) // _MICROSECOND for row in rows), dtype=np.int64, count=len(rows))
+        return DegradedHours.from_arrays(link_ids, micros.view('datetime64[us]'), start, end, min_hours)
+
+    def analyze(
+        self,
+        degraded: DegradedHours,
+        threshold: float = 0.5,
+        topology: Optional[Topology] = None,
+        scope: str = 'fleet',
+        scope_id: Optional[int] = None
+    ) -> CoDegradationResult:
+        """
+        Cluster links whose degraded-hour sets are similar.
+
+        Args:
+            degraded: Degraded-hour matrix
+            threshold: Minimum Jaccard similarity of two linked links
+            topology: Topology snapshot used to label clusters with a matching scope
+            scope: Scope label for the result
+            scope_id: Scope ID for the result
+
+        Returns:
+            CoDegradationResult with clusters, largest first
+        """
+        import uuid
+
+        signatures = minhash_signatures(degraded, self.num_perm, self.seed, self.memory_budget_mb)
+        rows, cols = lsh_candidate_pairs(signatures, self.bands, self.max_bucket)
+        similarity = degraded.jaccard(rows, cols)
+        similar = similarity >= threshold
+        rows, cols, similarity = rows[similar], cols[similar], similarity[similar]
+
+        clusters = [
+            self._describe_cluster(degraded, members, rows, cols, similarity, topology)
+            for members in cluster_pairs(len(degraded), rows, cols)
+        ]
+
+        self.logger.info(
+            f"Co-degradation clustering of {len(degraded)} links: {len(similar)} candidate pairs, "
+            f"{len(rows)} similar pairs, {len(clusters)} clusters"
+        )
+
+        return CoDegradationResult(
+            analysis_id=f"CODEG_{uuid.uuid4().hex[:8]}",
+            scope=scope,
+            scope_id=scope_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=degraded.matrix.shape[1],
+            links_analyzed=len(degraded),
+            candidate_pairs=len(similar),
+            similar_pairs=len(rows),
+            clusters=clusters,
+            parameters={
+                'threshold': threshold,
+                'num_perm': self.num_perm,
+                'bands': self.bands,
+                'candidate_threshold': round(self.candidate_threshold, 4),
+            }
+        )
+
+    def _describe_cluster(
+        self,
+        degraded: DegradedHours,
+        members: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        similarity: np.ndarray,
+        topology: Optional[Topology]
+    ) -> Dict:
+        """Summarize one cluster: similarity, shared hours and the scope it fits."""
+        in_cluster = np.isin(rows, members) & np.isin(cols, members)
+        # Members degraded in each hour
+        per_hour = np.asarray(degraded.matrix[members].sum(axis=0)).ravel()
+        peak = int(per_hour.argmax())
+        link_ids = degraded.link_ids[members]
+
+        cluster = {
+            'link_ids': link_ids.tolist(),
+            'size': len(members),
+            'mean_jaccard': round(float(similarity[in_cluster].mean()), 4),
+            'min_jaccard': round(float(similarity[in_cluster].min()), 4),
+            'hours_all_degraded': int((per_hour == len(members)).sum()),
+            'peak_hour': str(degraded.start + peak),
+            'peak_links_degraded': int(per_hour[peak]),
+            'matches_scope': None,
+        }
+        if topology is not None:
+            cluster.update(self._scope_of(topology, link_ids))
+        return cluster
+
+    @staticmethod
+    def _scope_of(topology: Topology, link_ids: np.ndarray) -> Dict:
+        """The most specific predefined scope containing every link of a cluster."""
+        networks = np.unique(topology.network_of(link_ids))
+        sites = np.unique(topology.site_of(link_ids))
+        satellites = {normalize_satellite(row.link_type) for row in topology.links(link_ids)}
+
+        matches_scope = None
+        if len(sites) == 1 and topology.is_hub(int(sites[0])):
+            matches_scope = {'scope': 'hub_antenna', 'scope_id': int(sites[0])}
+        elif len(satellites) == 1 and '' not in satellites:
+            matches_scope = {'scope': 'satellite', 'scope_id': satellites.pop()}
+        elif len(networks) == 1 and networks[0] >= 0:
+            matches_scope = {'scope': 'network', 'scope_id': int(networks[0])}
+        return {
+            'network_ids': networks[networks >= 0].tolist(),
+            'site_ids': sites[sites >= 0].tolist(),
+            'matches_scope': matches_scope,
+        }
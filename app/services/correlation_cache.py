@@ -0,0 +1,308 @@
+"""
+Result cache for correlation analyses.
+
+Dashboards poll the same correlation endpoints over and over. Analyses are
+cached per (scope, scope ID, lookback, time bucket): identical polls within
+one bucket are served from memory, and an entry expires when its bucket
+ends. Entries are kept in an OrderedDict in least-recently-used order, with
+a second OrderedDict in expiry order, as in the model cache.
+
+Before serving, sync() reads which links received grades since the last
+sync (through a GradeWatermark, so rows committed late with a lower ID are
+seen too) and drops the cached network, hub antenna, satellite and link
+analyses covering them, so a hit never predates a grade the database
+already has. A late row timestamped before the watermark's overlap is
+missed, but stays stale for at most one bucket.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import CorrelationAnalysis, GradeWatermark
+from app.services.satellite_index import normalize_satellite
+from app.services.topology_index import get_topology_index
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Any, int, int]
+
+# Buckets are counted from the epoch; timestamps are naive UTC
+_EPOCH = datetime(1970, 1, 1)
+
+
+class CorrelationResultCache:
+    """TTL cache of CorrelationAnalysis results, invalidated per link."""
+
+    SCOPES = ('network', 'hub_antenna', 'satellite', 'link')
+
+    def __init__(self, bucket_seconds: int = 60, max_entries: int = 1000):
+        """
+        Initialize the result cache.
+
+        Args:
+            bucket_seconds: Length of a time bucket, and so the TTL (0 disables)
+            max_entries: Maximum number of cached analyses
+        """
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        # Entries in LRU order (least recently used first)
+        self._entries: "OrderedDict[CacheKey, Dict]" = OrderedDict()
+        # Keys in expiry order; buckets only move forward, so insertion order is expiry order
+        self._expiry: "OrderedDict[CacheKey, datetime]" = OrderedDict()
+        # (scope, scope_id) -> cached keys, for invalidation
+        self._by_scope: Dict[Tuple[str, Any], Set[CacheKey]] = {}
+        self._watermark = GradeWatermark()
+        self._primed = False
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.RLock()
+
+    def configure(self, bucket_seconds: int, max_entries: int) -> None:
+        """Change bucket length and size; drops all entries."""
+        with self._lock:
+            self.bucket_seconds = bucket_seconds
+            self.max_entries = max_entries
+            self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.bucket_seconds > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            self._by_scope.clear()
+
+    @staticmethod
+    def _scope_id(scope: str, scope_id: Any) -> Any:
+        if scope not in CorrelationResultCache.SCOPES:
+            raise ValueError(f"Unknown correlation scope '{scope}', expected {CorrelationResultCache.SCOPES}")
+        return normalize_satellite(scope_id) if scope == 'satellite' else int(scope_id)
+
+    def _key(self, scope: str, scope_id: Any, hours_lookback: int, now: datetime) -> CacheKey:
+        bucket = int((now - _EPOCH).total_seconds() // self.bucket_seconds)
+        return scope, self._scope_id(scope, scope_id), hours_lookback, bucket
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove an entry from all indexes (caller holds the lock)."""
+        self._entries.pop(key, None)
+        self._expiry.pop(key, None)
+        keys = self._by_scope.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_scope[key[:2]]
+
+    def _purge_expired(self, now: datetime) -> None:
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if now < expires_at:
+                break
+            self._remove(key)
+
+    @staticmethod
+    def _metadata(key: CacheKey, entry: Dict, hit: bool, now: datetime) -> Dict[str, Any]:
+        return {
+            "hit": hit,
+            "key": f"{key[0]}:{key[1]}:{key[2]}h",
+            "bucket_start": entry["bucket_start"].isoformat(),
+            "expires_at": entry["expires_at"].isoformat(),
+            "computed_at": entry["created_at"].isoformat(),
+            "age_seconds": round((now - entry["created_at"]).total_seconds(), 3),
+            "hits": entry["hits"],
+        }
+
+    def get(
+        self,
+        scope: str,
+        scope_id: Any,
+        hours_lookback: int,
+        now: Optional[datetime] = None
+    ) -> Optional[Tuple[CorrelationAnalysis, Dict[str, Any]]]:
+        """
+        Cached analysis of the current time bucket.
+
+        Args:
+            scope: 'network', 'hub_antenna', 'satellite' or 'link'
+            scope_id: Network ID, site ID, satellite name or link ID
+            hours_lookback: Hours of history analyzed
+            now: Current time (default: utcnow)
+
+        Returns:
+            (analysis, cache metadata), or None on a miss
+        """
+        if not self.enabled:
+            return None
+        now = now or datetime.utcnow()
+        key = self._key(scope, scope_id, hours_lookback, now)
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            entry["hits"] += 1
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry["analysis"], self._metadata(key, entry, True, now)
+
+    def set(
+        self,
+        scope: str,
+        scope_id: Any,
+        hours_lookback: int,
+        analysis: Optional[CorrelationAnalysis],
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Cache an analysis for the rest of the current time bucket.
+
+        Missing analyses (unknown scopes) are not cached.
+
+        Returns:
+            Cache metadata for the response
+        """
+        if not self.enabled or analysis is None:
+            return {"hit": False}
+        now = now or datetime.utcnow()
+        key = self._key(scope, scope_id, hours_lookback, now)
+        bucket_start = _EPOCH + timedelta(seconds=key[3] * self.bucket_seconds)
+        entry = {
+            "analysis": analysis,
+            "created_at": now,
+            "bucket_start": bucket_start,
+            "expires_at": bucket_start + timedelta(seconds=self.bucket_seconds),
+            "hits": 0,
+        }
+        with self._lock:
+            self._purge_expired(now)
+            self._remove(key)
+            while self._entries and len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = entry
+            self._expiry[key] = entry["expires_at"]
+            self._by_scope.setdefault(key[:2], set()).add(key)
+        return self._metadata(key, entry, False, now)
+
+    def get_or_compute(
+        self,
+        scope: str,
+        scope_id: Any,
+        hours_lookback: int,
+        compute: Callable[[], Optional[CorrelationAnalysis]]
+    ) -> Tuple[Optional[CorrelationAnalysis], Dict[str, Any]]:
+        """
+        Return the cached analysis, computing and caching it on a miss.
+
+        Returns:
+            (analysis, cache metadata)
+        """
+        cached = self.get(scope, scope_id, hours_lookback)
+        if cached is not None:
+            return cached
+        analysis = compute()
+        return analysis, self.set(scope, scope_id, hours_lookback, analysis)
+
+    def invalidate(self, scope: str, scope_id: Any) -> int:
+        """
+        Drop every cached analysis of a scope.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = list(self._by_scope.get((scope, self._scope_id(scope, scope_id)), ()))
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_links(self, links) -> int:
+        """
+        Drop the cached analyses covering links that received new grades.
+
+        Args:
+            links: Rows with link_id, network_id, site_id and link_type
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = 0
+        with self._lock:
+            satellite_ids = [scope_id for scope, scope_id in self._by_scope if scope == 'satellite']
+            for link in links:
+                dropped += self.invalidate('link', link.link_id)
+                dropped += self.invalidate('network', link.network_id)
+                dropped += self.invalidate('hub_antenna', link.site_id)
+                # Satellite entries are keyed by the requested name, which
+                # matches every link_type containing it
+                link_type = normalize_satellite(link.link_type)
+                for satellite_id in satellite_ids:
+                    if satellite_id in link_type:
+                        dropped += self.invalidate('satellite', satellite_id)
+        return dropped
+
+    def sync(self, db: Session) -> int:
+        """
+        Invalidate entries of links that received grades since the last sync.
+
+        New grades are read through the watermark, under its lock; the scopes
+        of their links come from the topology index.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of entries dropped
+        """
+        from app.models.bcom_models import SiteGrade
+
+        if not self.enabled:
+            return 0
+
+        # The first sync only marks the existing grades as read
+        with self._lock:
+            if not self._primed:
+                self._watermark.prime(db)
+                self._primed = True
+                return 0
+
+        updated = self._watermark.read(db.query(SiteGrade.id, SiteGrade.timestamp, SiteGrade.link_id))
+        if not updated or not self._entries:
+            return 0
+
+        # Network, site and satellite of the updated links from the topology index
+        links = get_topology_index().get(db).links(sorted({row.link_id for row in updated}))
+        dropped = self.invalidate_links(links)
+        if dropped:
+            logger.debug(f"Correlation cache: dropped {dropped} entries for {len(links)} updated links")
+        return dropped
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics for monitoring."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bucket_seconds": self.bucket_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                **self._watermark.get_stats(),
+            }
+
+
+# Global correlation result cache
+correlation_cache = CorrelationResultCache()
+
+
+def get_correlation_cache() -> CorrelationResultCache:
+    """Get the global correlation result cache."""
+    return correlation_cache
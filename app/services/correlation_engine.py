@@ -6,19 +6,29 @@ Identifies correlations in RF/traffic degradation patterns to detect root causes
 2. Hub antenna-level degradation -> Antenna alignment or equipment issues
 3. Satellite-level degradation -> Interference or satellite underperformance
 4. Link-level bidirectional degradation -> Antenna misalignment
+5. Regional degradation of nearby sites -> Weather / rain fade
 """
 
 import logging
+import threading
+from operator import attrgetter
 from typing import Dict, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from statistics import mean, stdev, StatisticsError
 import numpy as np
 from sqlalchemy.orm import Session
 
+from app.services.satellite_index import SatelliteLinkIndex, get_satellite_index
+from app.services.site_geo_index import SiteGeoIndex, SiteLocations, get_site_geo_index
+from app.services.topology_index import TopologyIndex, get_topology_index
+
 logger = logging.getLogger(__name__)
 
 
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
 # ==================== DATA CLASSES ====================
 
 @dataclass
@@ -81,6 +91,166 @@ class CorrelationAnalysis:
         }
 
 
+@dataclass
+class GradeColumns:
+    """
+    Columnar view of SiteGrade rows, one numpy array per field.
+    
+    The pattern detectors bucket and aggregate over these arrays instead of
+    iterating ORM objects. Missing metric values are stored as 0, matching
+    the `value or 0` convention used for single grades.
+    """
+    
+    METRICS = ('ib_degradation', 'ob_degradation', 'ib_instability', 'ob_instability', 'congestion')
+    
+    link_id: np.ndarray     # int64
+    timestamp: np.ndarray   # datetime64[us]
+    grade: np.ndarray       # float64
+    ib_degradation: np.ndarray
+    ob_degradation: np.ndarray
+    ib_instability: np.ndarray
+    ob_instability: np.ndarray
+    congestion: np.ndarray
+    
+    @classmethod
+    def from_rows(cls, rows: List) -> 'GradeColumns':
+        """Build columns from grade rows or objects with SiteGrade attributes."""
+        fields = ('link_id', 'timestamp', 'grade') + cls.METRICS
+        columns = list(zip(*map(attrgetter(*fields), rows))) or [()] * len(fields)
+        link_ids, timestamps, grades = columns[:3]
+        
+        # Offsets from the epoch convert several times faster than numpy's
+        # datetime object parsing; timestamps are naive UTC
+        micros = np.fromiter(((t - _EPOCH) // _MICROSECOND for t in timestamps), dtype=np.int64, count=len(timestamps))
+        return cls(
+            link_id=np.array(link_ids, dtype=np.int64),
+            timestamp=micros.view('datetime64[us]'),
+            grade=np.array(grades, dtype=np.float64),
+            **{
+                name: np.nan_to_num(np.array(values, dtype=np.float64))
+                for name, values in zip(cls.METRICS, columns[3:])
+            }
+        )
+    
+    def __len__(self) -> int:
+        return len(self.link_id)
+    
+    def select(self, mask: np.ndarray) -> 'GradeColumns':
+        """Return the rows where mask is True."""
+        return GradeColumns(**{name: values[mask] for name, values in vars(self).items()})
+    
+    def links(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Factorize link IDs.
+        
+        Returns:
+            Tuple of (sorted unique link IDs, index into them for every row)
+        """
+        return np.unique(self.link_id, return_inverse=True)
+
+
+def grade_query(db: Session, *extra_columns):
+    """
+    Query the SiteGrade columns the pattern detectors read.
+    
+    Selecting columns instead of ORM entities skips identity-map and
+    instance construction, which dominates for wide lookback windows.
+    The rows can be passed straight to GradeColumns.from_rows. Scopes are
+    resolved to link IDs through the topology index, so no join to Link is
+    needed.
+    
+    Args:
+        db: Database session
+        *extra_columns: Additional columns to select (e.g. SiteGrade.id)
+        
+    Returns:
+        Query to be filtered by SiteGrade columns
+    """
+    from app.models.bcom_models import SiteGrade
+    
+    return db.query(
+        SiteGrade.link_id,
+        SiteGrade.timestamp,
+        SiteGrade.grade,
+        SiteGrade.ib_degradation,
+        SiteGrade.ob_degradation,
+        SiteGrade.ib_instability,
+        SiteGrade.ob_instability,
+        SiteGrade.congestion,
+        *extra_columns
+    )
+
+
+class GradeWatermark:
+    """
+    Tracks which SiteGrade rows an incremental consumer has already read.
+    
+    With several ingesters committing concurrently, IDs are not committed in
+    order, so a row can become visible below the highest ID already read.
+    Each read therefore returns the rows above the ID watermark plus the rows
+    timestamped within the last overlap_minutes, minus the IDs read before
+    (remembered only while their timestamp is within the overlap). Rows that
+    are both committed late and timestamped before the overlap are still
+    missed; consumers bound that by rebuilding or expiring their state.
+    """
+    
+    def __init__(self, overlap_minutes: int = 15):
+        self.overlap = timedelta(minutes=overlap_minutes)
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget all rows read; the next read starts from ID 0."""
+        with self._lock:
+            self.last_id = 0
+            self._recent: Dict[int, datetime] = {}
+    
+    def prime(self, db: Session, now: Optional[datetime] = None) -> None:
+        """Mark every row already in the database as read, without reading them."""
+        from sqlalchemy import func
+        from app.models.bcom_models import SiteGrade
+        
+        overlap_start = (now or datetime.utcnow()) - self.overlap
+        with self._lock:
+            self.last_id = db.query(func.max(SiteGrade.id)).scalar() or 0
+            self._recent = dict(db.query(SiteGrade.id, SiteGrade.timestamp).filter(
+                SiteGrade.timestamp >= overlap_start, SiteGrade.id <= self.last_id
+            ).all())
+    
+    def read(self, query, now: Optional[datetime] = None) -> List:
+        """
+        Run a SiteGrade query restricted to the rows not read yet.
+        
+        Args:
+            query: Query selecting at least SiteGrade.id and SiteGrade.timestamp
+            now: Current time (default: utcnow)
+            
+        Returns:
+            New rows in ID order
+        """
+        from sqlalchemy import or_
+        from app.models.bcom_models import SiteGrade
+        
+        overlap_start = (now or datetime.utcnow()) - self.overlap
+        with self._lock:
+            rows = query.filter(
+                or_(SiteGrade.id > self.last_id, SiteGrade.timestamp >= overlap_start)
+            ).order_by(SiteGrade.id).all()
+            recent = {row_id: ts for row_id, ts in self._recent.items() if ts >= overlap_start}
+            rows = [row for row in rows if row.id not in recent]
+            for row in rows:
+                if row.timestamp >= overlap_start:
+                    recent[row.id] = row.timestamp
+            self._recent = recent
+            if rows:
+                self.last_id = max(self.last_id, rows[-1].id)
+            return rows
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"last_grade_id": self.last_id, "overlap_ids": len(self._recent)}
+
+
 # ==================== CORRELATION ENGINE ====================
 
 class CorrelationEngine:
@@ -92,11 +262,31 @@ class CorrelationEngine:
     2. Hub antenna: Multiple links from same hub antenna -> antenna alignment issue
     3. Satellite: Multiple links using same satellite -> interference/underperformance
     4. Link-level: Both IB and OB degradation on same link -> antenna misalignment
+    5. Regional: Nearby sites degrading together -> weather / rain fade
     """
     
-    def __init__(self):
-        """Initialize correlation engine."""
+    def __init__(
+        self,
+        satellite_index: Optional[SatelliteLinkIndex] = None,
+        topology: Optional[TopologyIndex] = None,
+        geo_index: Optional[SiteGeoIndex] = None
+    ):
+        """
+        Initialize correlation engine.
+        
+        Args:
+            satellite_index: Satellite -> link index (default: derived from the topology index)
+            topology: Customer/network/site/link topology index (default: the global index)
+            geo_index: Site location index (default: the global index)
+        """
         self.logger = logging.getLogger(__name__)
+        self.topology = topology or get_topology_index()
+        if satellite_index is None:
+            satellite_index = get_satellite_index()
+            if satellite_index.topology is not self.topology:
+                satellite_index = SatelliteLinkIndex(self.topology)
+        self.satellite_index = satellite_index
+        self.geo_index = geo_index or get_site_geo_index()
         
         # Degradation thresholds
         self.CRITICAL_GRADE_THRESHOLD = 6.0  # Grade < 6.0 is critical
@@ -131,84 +321,80 @@ class CorrelationEngine:
             CorrelationAnalysis with detected patterns
         """
         import uuid
-        from app.models.bcom_models import Link, SiteGrade, Site
+        from app.models.bcom_models import SiteGrade
         
         analysis_id = f"NET_{network_id}_{uuid.uuid4().hex[:8]}"
         
         try:
-            # Get all links in network
-            links = db.query(Link).filter(Link.network_id == network_id).all()
-            if not links:
+            topology = self.topology.get(db)
+            link_ids = topology.links_under('network', network_id)
+            if not len(link_ids):
                 self.logger.warning(f"No links found for network {network_id}")
                 return None
             
-            link_ids = [link.link_id for link in links]
             cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
             
-            # Get recent grades for all links
-            link_grades = {}
-            for link_id in link_ids:
-                grades = db.query(SiteGrade).filter(
-                    SiteGrade.link_id == link_id,
-                    SiteGrade.timestamp >= cutoff_time,
-                    SiteGrade.grade < self.WARNING_GRADE_THRESHOLD
-                ).all()
-                
-                if grades:
-                    link_grades[link_id] = grades
-            
-            if not link_grades:
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='network',
-                    scope_id=network_id,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['No degradation detected in this network']
-                )
-            
-            # Analyze temporal correlation
-            patterns = self._detect_temporal_correlation(
-                link_grades, 
-                network_id,
-                pattern_type='network_equipment'
-            )
-            
-            # Analyze which sites are affected
-            affected_sites = set()
-            for link_id, grades in link_grades.items():
-                link = next((l for l in links if l.link_id == link_id), None)
-                if link:
-                    affected_sites.add(link.site_id)
-            
-            # Calculate correlation score
-            correlation_score = self._calculate_correlation_score(link_grades, hours_lookback)
-            
-            # Generate recommendations
-            recommendations = self._generate_network_recommendations(
-                len(affected_sites),
-                len(link_grades),
-                correlation_score,
-                patterns
-            )
+            # Degraded grades of every link in the network in one round trip
+            rows = grade_query(db).filter(
+                SiteGrade.link_id.in_(link_ids.tolist()),
+                SiteGrade.timestamp >= cutoff_time,
+                SiteGrade.grade < self.WARNING_GRADE_THRESHOLD
+            ).order_by(SiteGrade.link_id, SiteGrade.timestamp).all()
             
-            return CorrelationAnalysis(
-                analysis_id=analysis_id,
-                scope='network',
-                scope_id=network_id,
-                timestamp=datetime.utcnow(),
-                hours_analyzed=hours_lookback,
-                patterns_found=patterns,
-                correlation_score=correlation_score,
-                recommendations=recommendations
+            grades = GradeColumns.from_rows(rows)
+            return self._build_network_analysis(
+                analysis_id, network_id, hours_lookback,
+                grades, len(np.unique(topology.site_of(grades.link_id)))
             )
             
         except Exception as e:
             self.logger.error(f"Error analyzing network {network_id}: {e}")
             return None
     
+    def _build_network_analysis(
+        self,
+        analysis_id: str,
+        network_id: int,
+        hours_lookback: int,
+        grades: GradeColumns,
+        affected_sites: int
+    ) -> CorrelationAnalysis:
+        """Build a network analysis from the network's degraded grades."""
+        if not len(grades):
+            return self._empty_analysis(
+                analysis_id, 'network', network_id, hours_lookback,
+                'No degradation detected in this network'
+            )
+        
+        # Analyze temporal correlation
+        patterns = self._detect_temporal_correlation(
+            grades, 
+            network_id,
+            pattern_type='network_equipment'
+        )
+        
+        # Calculate correlation score
+        correlation_score = self._calculate_correlation_score(grades, hours_lookback)
+        
+        # Generate recommendations
+        recommendations = self._generate_network_recommendations(
+            affected_sites,
+            len(np.unique(grades.link_id)),
+            correlation_score,
+            patterns
+        )
+        
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='network',
+            scope_id=network_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+    
     def analyze_hub_antenna_degradation(
         self,
         db: Session,
@@ -230,86 +416,84 @@ class CorrelationEngine:
             CorrelationAnalysis with detected patterns
         """
         import uuid
-        from app.models.bcom_models import Link, SiteGrade, Site
+        from app.models.bcom_models import SiteGrade
         
         analysis_id = f"HUB_{site_id}_{uuid.uuid4().hex[:8]}"
         
         try:
             # Verify this is a hub antenna site
-            site = db.query(Site).filter(Site.site_id == site_id).first()
-            if not site or 'Hub' not in (site.site_type or ''):
+            topology = self.topology.get(db)
+            if not topology.is_hub(site_id):
                 self.logger.warning(f"Site {site_id} is not a hub antenna")
                 return None
             
-            # Get all links from this hub antenna
-            links = db.query(Link).filter(Link.site_id == site_id).all()
-            if not links:
+            link_ids = topology.links_under('site', site_id)
+            if not len(link_ids):
                 return None
             
             cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
             
-            # Get grades showing degradation
-            degraded_links = {}
-            for link in links:
-                grades = db.query(SiteGrade).filter(
-                    SiteGrade.link_id == link.link_id,
-                    SiteGrade.timestamp >= cutoff_time
-                ).all()
-                
-                if grades:
-                    # Check for antenna-specific metrics (IB/OB instability)
-                    antenna_issues = [
-                        g for g in grades 
-                        if (g.ib_instability or 0) > self.INSTABILITY_THRESHOLD or
-                           (g.ob_instability or 0) > self.INSTABILITY_THRESHOLD
-                    ]
-                    
-                    if antenna_issues:
-                        degraded_links[link.link_id] = grades
-            
-            if not degraded_links:
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='hub_antenna',
-                    scope_id=site_id,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['No antenna-level degradation detected']
-                )
-            
-            # Detect antenna alignment patterns
-            patterns = self._detect_antenna_alignment_patterns(
-                degraded_links,
-                site_id
-            )
-            
-            # Calculate correlation
-            correlation_score = self._calculate_correlation_score(degraded_links, hours_lookback)
-            
-            recommendations = self._generate_antenna_recommendations(
-                len(degraded_links),
-                len(links),
-                correlation_score,
-                patterns
-            )
+            # All recent grades of the hub's links in one round trip
+            rows = grade_query(db).filter(
+                SiteGrade.link_id.in_(link_ids.tolist()),
+                SiteGrade.timestamp >= cutoff_time
+            ).order_by(SiteGrade.link_id, SiteGrade.timestamp).all()
             
-            return CorrelationAnalysis(
-                analysis_id=analysis_id,
-                scope='hub_antenna',
-                scope_id=site_id,
-                timestamp=datetime.utcnow(),
-                hours_analyzed=hours_lookback,
-                patterns_found=patterns,
-                correlation_score=correlation_score,
-                recommendations=recommendations
+            return self._build_hub_antenna_analysis(
+                analysis_id, site_id, hours_lookback, GradeColumns.from_rows(rows), len(link_ids)
             )
             
         except Exception as e:
             self.logger.error(f"Error analyzing hub antenna {site_id}: {e}")
             return None
     
+    def _build_hub_antenna_analysis(
+        self,
+        analysis_id: str,
+        site_id: int,
+        hours_lookback: int,
+        grades: GradeColumns,
+        total_links: int
+    ) -> CorrelationAnalysis:
+        """Build a hub antenna analysis from all grades of the hub's links."""
+        # Keep every grade of links with antenna-specific metrics (IB/OB instability)
+        unstable = (grades.ib_instability > self.INSTABILITY_THRESHOLD) | \
+                   (grades.ob_instability > self.INSTABILITY_THRESHOLD)
+        degraded = grades.select(np.isin(grades.link_id, grades.link_id[unstable]))
+        
+        if not len(degraded):
+            return self._empty_analysis(
+                analysis_id, 'hub_antenna', site_id, hours_lookback,
+                'No antenna-level degradation detected'
+            )
+        
+        # Detect antenna alignment patterns
+        patterns = self._detect_antenna_alignment_patterns(
+            degraded,
+            site_id
+        )
+        
+        # Calculate correlation
+        correlation_score = self._calculate_correlation_score(degraded, hours_lookback)
+        
+        recommendations = self._generate_antenna_recommendations(
+            len(np.unique(degraded.link_id)),
+            total_links,
+            correlation_score,
+            patterns
+        )
+        
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='hub_antenna',
+            scope_id=site_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+    
     def analyze_satellite_degradation(
         self,
         db: Session,
@@ -333,87 +517,79 @@ class CorrelationEngine:
             CorrelationAnalysis with detected patterns
         """
         import uuid
-        from app.models.bcom_models import Link, SiteGrade, Device
+        from app.models.bcom_models import SiteGrade
         
         analysis_id = f"SAT_{satellite_name}_{uuid.uuid4().hex[:8]}"
         
         try:
-            # Note: This assumes satellite info is in device metadata or link_type
+            # Note: This assumes satellite info is in link_type
             # Adjust based on your actual data structure
             
-            # For now, search in link_type if satellite info is available
-            relevant_links = db.query(Link).filter(
-                Link.link_type.ilike(f"%{satellite_name}%")
-            ).all()
-            
-            if not relevant_links:
+            # Links whose link_type contains the name, from the in-memory index
+            link_ids = self.satellite_index.links_for(db, satellite_name)
+            if not link_ids:
                 self.logger.info(f"No links found for satellite {satellite_name}")
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='satellite',
-                    scope_id=0,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['No matching satellite links found']
+                return self._empty_analysis(
+                    analysis_id, 'satellite', 0, hours_lookback,
+                    'No matching satellite links found'
                 )
             
             cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
             
-            # Get degradation data
-            degraded_links = {}
-            for link in relevant_links:
-                grades = db.query(SiteGrade).filter(
-                    SiteGrade.link_id == link.link_id,
-                    SiteGrade.timestamp >= cutoff_time,
-                    SiteGrade.grade < self.WARNING_GRADE_THRESHOLD
-                ).all()
-                
-                if grades:
-                    degraded_links[link.link_id] = grades
-            
-            if not degraded_links:
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='satellite',
-                    scope_id=0,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['No degradation detected on this satellite']
-                )
-            
-            # Detect satellite interference patterns
-            patterns = self._detect_satellite_patterns(
-                degraded_links,
-                satellite_name
-            )
-            
-            correlation_score = self._calculate_correlation_score(degraded_links, hours_lookback)
+            # Degraded grades of every matching link in one round trip
+            rows = grade_query(db).filter(
+                SiteGrade.link_id.in_(link_ids),
+                SiteGrade.timestamp >= cutoff_time,
+                SiteGrade.grade < self.WARNING_GRADE_THRESHOLD
+            ).order_by(SiteGrade.link_id, SiteGrade.timestamp).all()
             
-            recommendations = self._generate_satellite_recommendations(
-                len(degraded_links),
-                correlation_score,
-                patterns
-            )
-            
-            return CorrelationAnalysis(
-                analysis_id=analysis_id,
-                scope='satellite',
-                scope_id=0,
-                timestamp=datetime.utcnow(),
-                hours_analyzed=hours_lookback,
-                patterns_found=patterns,
-                correlation_score=correlation_score,
-                recommendations=recommendations
+            return self._build_satellite_analysis(
+                analysis_id, satellite_name, hours_lookback, GradeColumns.from_rows(rows)
             )
             
         except Exception as e:
             self.logger.error(f"Error analyzing satellite {satellite_name}: {e}")
             return None
     
+    def _build_satellite_analysis(
+        self,
+        analysis_id: str,
+        satellite_name: str,
+        hours_lookback: int,
+        grades: GradeColumns
+    ) -> CorrelationAnalysis:
+        """Build a satellite analysis from the satellite links' degraded grades."""
+        if not len(grades):
+            return self._empty_analysis(
+                analysis_id, 'satellite', 0, hours_lookback,
+                'No degradation detected on this satellite'
+            )
+        
+        # Detect satellite interference patterns
+        patterns = self._detect_satellite_patterns(
+            grades,
+            satellite_name
+        )
+        
+        correlation_score = self._calculate_correlation_score(grades, hours_lookback)
+        
+        recommendations = self._generate_satellite_recommendations(
+            len(np.unique(grades.link_id)),
+            correlation_score,
+            patterns
+        )
+        
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='satellite',
+            scope_id=0,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+    
     def analyze_link_bidirectional_degradation(
         self,
         db: Session,
@@ -443,115 +619,247 @@ class CorrelationEngine:
             cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
             
             # Get all grades for this link
-            grades = db.query(SiteGrade).filter(
+            rows = grade_query(db).filter(
                 SiteGrade.link_id == link_id,
                 SiteGrade.timestamp >= cutoff_time
             ).order_by(SiteGrade.timestamp).all()
             
-            if not grades:
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='link',
-                    scope_id=link_id,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['Insufficient data for analysis']
-                )
+            return self._build_link_bidirectional_analysis(
+                analysis_id, link_id, hours_lookback, GradeColumns.from_rows(rows)
+            )
             
-            # Detect bidirectional degradation patterns
-            patterns = self._detect_bidirectional_degradation(
-                grades,
-                link_id
+        except Exception as e:
+            self.logger.error(f"Error analyzing link {link_id}: {e}")
+            return None
+    
+    def _build_link_bidirectional_analysis(
+        self,
+        analysis_id: str,
+        link_id: int,
+        hours_lookback: int,
+        grades: GradeColumns
+    ) -> CorrelationAnalysis:
+        """Build a bidirectional analysis from all grades of one link."""
+        if not len(grades):
+            return self._empty_analysis(
+                analysis_id, 'link', link_id, hours_lookback,
+                'Insufficient data for analysis'
+            )
+        
+        # Detect bidirectional degradation patterns
+        patterns = self._detect_bidirectional_degradation(
+            grades,
+            link_id
+        )
+        
+        if not patterns:
+            return self._empty_analysis(
+                analysis_id, 'link', link_id, hours_lookback,
+                'No bidirectional degradation detected'
             )
+        
+        correlation_score = self._calculate_bidirectional_score(grades)
+        
+        recommendations = self._generate_bidirectional_recommendations(
+            patterns,
+            correlation_score
+        )
+        
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='link',
+            scope_id=link_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+    
+    def analyze_regional_degradation(
+        self,
+        db: Session,
+        site_id: Optional[int] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: float = 50.0,
+        hours_lookback: int = 24
+    ) -> Optional[CorrelationAnalysis]:
+        """
+        Analyze regional degradation to detect weather or rain fade.
+        
+        Pattern: Sites within radius_km of each other degrading in the same hour,
+        whatever network, hub or satellite they use
+        Root Cause: Regional weather, rain fade or sea state
+        
+        Args:
+            db: Database session
+            site_id: Center the region on this site
+            latitude: Center latitude (with longitude, instead of site_id)
+            longitude: Center longitude
+            radius_km: Region radius, and the largest gap between neighbouring degraded sites
+            hours_lookback: Hours of historical data
             
-            if not patterns:
-                return CorrelationAnalysis(
-                    analysis_id=analysis_id,
-                    scope='link',
-                    scope_id=link_id,
-                    timestamp=datetime.utcnow(),
-                    hours_analyzed=hours_lookback,
-                    patterns_found=[],
-                    correlation_score=0.0,
-                    recommendations=['No bidirectional degradation detected']
-                )
+        Returns:
+            CorrelationAnalysis with one pattern per region and run of hours,
+            None if the center site has no known location
+        """
+        import uuid
+        from app.models.bcom_models import SiteGrade
+        
+        scope_id = site_id if site_id is not None else 0
+        analysis_id = f"REGION_{site_id if site_id is not None else 'fleet'}_{uuid.uuid4().hex[:8]}"
+        
+        try:
+            locations = self.geo_index.get(db)
+            topology = self.topology.get(db)
             
-            correlation_score = self._calculate_bidirectional_score(grades)
+            if site_id is not None:
+                center = locations.location(site_id)
+                if center is None:
+                    self.logger.warning(f"Site {site_id} has no known location")
+                    return None
+                latitude, longitude = center
             
-            recommendations = self._generate_bidirectional_recommendations(
-                patterns,
-                correlation_score
+            cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
+            query = grade_query(db).filter(
+                SiteGrade.timestamp >= cutoff_time,
+                SiteGrade.grade < self.WARNING_GRADE_THRESHOLD
             )
             
-            return CorrelationAnalysis(
-                analysis_id=analysis_id,
-                scope='link',
-                scope_id=link_id,
-                timestamp=datetime.utcnow(),
-                hours_analyzed=hours_lookback,
-                patterns_found=patterns,
-                correlation_score=correlation_score,
-                recommendations=recommendations
+            if latitude is not None and longitude is not None:
+                # Links of the sites around the center, from the KD-tree
+                sites = locations.within(latitude, longitude, radius_km)
+                link_ids = topology.link_ids[np.isin(topology.site_of(topology.link_ids), sites)]
+                if not len(link_ids):
+                    return self._empty_analysis(
+                        analysis_id, 'region', scope_id, hours_lookback,
+                        'No located sites in this region'
+                    )
+                query = query.filter(SiteGrade.link_id.in_(link_ids.tolist()))
+            
+            # Degraded grades of every link in the region in one round trip
+            rows = query.order_by(SiteGrade.link_id, SiteGrade.timestamp).all()
+            grades = GradeColumns.from_rows(rows)
+            
+            return self._build_regional_analysis(
+                analysis_id, scope_id, hours_lookback, grades,
+                topology.site_of(grades.link_id), locations, radius_km
             )
             
         except Exception as e:
-            self.logger.error(f"Error analyzing link {link_id}: {e}")
+            self.logger.error(f"Error analyzing regional degradation: {e}")
             return None
     
+    def _build_regional_analysis(
+        self,
+        analysis_id: str,
+        scope_id: int,
+        hours_lookback: int,
+        grades: GradeColumns,
+        grade_sites: np.ndarray,
+        locations: SiteLocations,
+        radius_km: float
+    ) -> CorrelationAnalysis:
+        """Build a regional analysis from degraded grades and the site of every grade."""
+        if not len(grades):
+            return self._empty_analysis(
+                analysis_id, 'region', scope_id, hours_lookback,
+                'No degradation detected in this region'
+            )
+        
+        patterns = self._detect_regional_patterns(grades, grade_sites, locations, radius_km)
+        if not patterns:
+            return self._empty_analysis(
+                analysis_id, 'region', scope_id, hours_lookback,
+                'No simultaneous degradation of nearby sites detected'
+            )
+        
+        in_patterns = np.isin(grade_sites, [site for p in patterns for site in p.affected_items])
+        correlation_score = self._calculate_correlation_score(grades.select(in_patterns), hours_lookback)
+        
+        recommendations = self._generate_regional_recommendations(
+            len({site for p in patterns for site in p.affected_items}),
+            correlation_score,
+            patterns
+        )
+        
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='region',
+            scope_id=scope_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+    
+    # ==================== RESULT HELPERS ====================
+    
+    @staticmethod
+    def _empty_analysis(
+        analysis_id: str,
+        scope: str,
+        scope_id: int,
+        hours_lookback: int,
+        message: str
+    ) -> CorrelationAnalysis:
+        """Build an analysis with no patterns and a single explanatory recommendation."""
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope=scope,
+            scope_id=scope_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=hours_lookback,
+            patterns_found=[],
+            correlation_score=0.0,
+            recommendations=[message]
+        )
+    
     # ==================== PATTERN DETECTION METHODS ====================
     
     def _detect_temporal_correlation(
         self,
-        link_grades: Dict[int, List],
+        grades: GradeColumns,
         network_id: int,
         pattern_type: str
     ) -> List[DegradationPattern]:
         """Detect temporal correlation between multiple links."""
         patterns = []
         
-        if not link_grades or len(link_grades) < self.MIN_DEVICES_FOR_PATTERN:
+        if not len(grades):
+            return patterns
+        
+        links, link_index = grades.links()
+        if len(links) < self.MIN_DEVICES_FOR_PATTERN:
             return patterns
         
         try:
             # Group grades by hour
-            hourly_buckets = {}
-            for link_id, grades in link_grades.items():
-                for grade in grades:
-                    hour_key = grade.timestamp.replace(minute=0, second=0, microsecond=0)
-                    if hour_key not in hourly_buckets:
-                        hourly_buckets[hour_key] = []
-                    hourly_buckets[hour_key].append((link_id, grade))
+            hours, hour_index = np.unique(grades.timestamp.astype('datetime64[h]'), return_inverse=True)
+            n_hours = len(hours)
+            entry_counts = np.bincount(hour_index, minlength=n_hours)
+            grade_sums = np.bincount(hour_index, weights=grades.grade, minlength=n_hours)
+            grade_mins = np.full(n_hours, np.inf)
+            np.minimum.at(grade_mins, hour_index, grades.grade)
+            
+            # Distinct (hour, link) pairs, sorted by hour then link
+            pairs = np.unique(hour_index * len(links) + link_index)
+            pair_hours = pairs // len(links)
+            links_per_hour = np.bincount(pair_hours, minlength=n_hours)
+            hour_links = np.split(links[pairs % len(links)], np.cumsum(links_per_hour)[:-1])
             
             # Find hours with simultaneous degradation
-            for hour, entries in hourly_buckets.items():
-                if len(entries) >= self.MIN_DEVICES_FOR_PATTERN:
-                    affected_links = list(set([e[0] for e in entries]))
-                    grades_list = [e[1].grade for e in entries]
-                    
-                    severity = 1.0 - (mean(grades_list) / 10.0)  # Normalized to 0-1
-                    confidence = min(0.95, len(affected_links) / 10.0 * 2)
-                    
-                    pattern = DegradationPattern(
-                        pattern_id=f"{network_id}_{hour.isoformat()}",
-                        pattern_type='network_equipment_failure',
-                        severity=severity,
-                        confidence=confidence,
-                        affected_items=affected_links,
-                        root_cause='Possible equipment/hardware failure affecting multiple sites',
-                        supporting_metrics={
-                            'avg_grade': mean(grades_list),
-                            'min_grade': min(grades_list),
-                            'affected_links': len(affected_links),
-                            'simultaneous_degradation_count': len(entries)
-                        },
-                        timestamp=hour,
-                        hours_duration=1,
-                        devices_affected_count=len(affected_links),
-                        links_affected_count=len(affected_links)
-                    )
-                    patterns.append(pattern)
+            for h in np.flatnonzero(entry_counts >= self.MIN_DEVICES_FOR_PATTERN):
+                patterns.append(self._network_hour_pattern(
+                    network_id,
+                    hours[h].astype('datetime64[us]').item(),
+                    hour_links[h].tolist(),
+                    float(grade_sums[h] / entry_counts[h]),
+                    float(grade_mins[h]),
+                    int(entry_counts[h])
+                ))
         
         except Exception as e:
             self.logger.error(f"Error in temporal correlation: {e}")
@@ -560,46 +868,35 @@ class CorrelationEngine:
     
     def _detect_antenna_alignment_patterns(
         self,
-        degraded_links: Dict[int, List],
+        grades: GradeColumns,
         site_id: int
     ) -> List[DegradationPattern]:
         """Detect antenna alignment issues from instability patterns."""
         patterns = []
         
+        if not len(grades):
+            return patterns
+        
         try:
-            for link_id, grades in degraded_links.items():
-                # Look for high instability on both directions
-                ib_instability_values = [g.ib_instability or 0 for g in grades]
-                ob_instability_values = [g.ob_instability or 0 for g in grades]
-                
-                avg_ib_instability = mean(ib_instability_values) if ib_instability_values else 0
-                avg_ob_instability = mean(ob_instability_values) if ob_instability_values else 0
-                
-                # Antenna alignment issue if both directions have high instability
-                if avg_ib_instability > self.INSTABILITY_THRESHOLD and \
-                   avg_ob_instability > self.INSTABILITY_THRESHOLD:
-                    
-                    severity = max(avg_ib_instability, avg_ob_instability)
-                    confidence = 0.85
-                    
-                    pattern = DegradationPattern(
-                        pattern_id=f"ANTENNA_{site_id}_{link_id}",
-                        pattern_type='antenna_alignment',
-                        severity=severity,
-                        confidence=confidence,
-                        affected_items=[link_id],
-                        root_cause='Antenna alignment issue causing bidirectional instability',
-                        supporting_metrics={
-                            'avg_ib_instability': avg_ib_instability,
-                            'avg_ob_instability': avg_ob_instability,
-                            'grade_records_analyzed': len(grades)
-                        },
-                        timestamp=grades[0].timestamp if grades else datetime.utcnow(),
-                        hours_duration=len(grades),
-                        devices_affected_count=1,
-                        links_affected_count=1
-                    )
-                    patterns.append(pattern)
+            # Per-link instability averages in one pass
+            links, first_seen, link_index = np.unique(grades.link_id, return_index=True, return_inverse=True)
+            counts = np.bincount(link_index)
+            avg_ib_instability = np.bincount(link_index, weights=grades.ib_instability) / counts
+            avg_ob_instability = np.bincount(link_index, weights=grades.ob_instability) / counts
+            
+            # Antenna alignment issue if both directions have high instability
+            aligned = (avg_ib_instability > self.INSTABILITY_THRESHOLD) & \
+                      (avg_ob_instability > self.INSTABILITY_THRESHOLD)
+            
+            for i in np.flatnonzero(aligned):
+                patterns.append(self._antenna_pattern(
+                    site_id,
+                    int(links[i]),
+                    float(avg_ib_instability[i]),
+                    float(avg_ob_instability[i]),
+                    int(counts[i]),
+                    grades.timestamp[first_seen[i]].item()
+                ))
         
         except Exception as e:
             self.logger.error(f"Error detecting antenna alignment: {e}")
@@ -608,156 +905,332 @@ class CorrelationEngine:
     
     def _detect_satellite_patterns(
         self,
-        degraded_links: Dict[int, List],
+        grades: GradeColumns,
         satellite_name: str
     ) -> List[DegradationPattern]:
         """Detect satellite interference or underperformance patterns."""
         patterns = []
         
         try:
-            if len(degraded_links) >= self.MIN_DEVICES_FOR_PATTERN:
-                all_grades = []
-                for grades in degraded_links.values():
-                    all_grades.extend(grades)
-                
-                grades_values = [g.grade for g in all_grades]
-                avg_grade = mean(grades_values) if grades_values else 0
-                
-                # High correlation across multiple links suggests satellite issue
-                congestion_values = [g.congestion or 0 for g in all_grades]
-                avg_congestion = mean(congestion_values) if congestion_values else 0
-                
-                severity = max(1.0 - (avg_grade / 10.0), avg_congestion)
-                confidence = 0.88
-                
-                pattern = DegradationPattern(
-                    pattern_id=f"SAT_{satellite_name}",
-                    pattern_type='satellite_interference',
-                    severity=severity,
-                    confidence=confidence,
-                    affected_items=list(degraded_links.keys()),
-                    root_cause='Possible satellite interference or underperformance',
-                    supporting_metrics={
-                        'affected_links': len(degraded_links),
-                        'avg_grade': avg_grade,
-                        'avg_congestion': avg_congestion,
-                        'total_measurements': len(all_grades)
-                    },
-                    timestamp=all_grades[0].timestamp if all_grades else datetime.utcnow(),
-                    hours_duration=len(all_grades),
-                    devices_affected_count=len(degraded_links),
-                    links_affected_count=len(degraded_links)
-                )
-                patterns.append(pattern)
+            links = np.unique(grades.link_id)
+            # High correlation across multiple links suggests satellite issue
+            if len(links) >= self.MIN_DEVICES_FOR_PATTERN:
+                patterns.append(self._satellite_pattern(
+                    satellite_name,
+                    links.tolist(),
+                    float(grades.grade.mean()),
+                    float(grades.congestion.mean()),
+                    len(grades),
+                    grades.timestamp.min().item()
+                ))
         
         except Exception as e:
             self.logger.error(f"Error detecting satellite patterns: {e}")
         
         return patterns
+
+    def _bidirectional_mask(self, grades: GradeColumns) -> np.ndarray:
+        """Grades with simultaneous IB and OB degradation."""
+        return (grades.ib_degradation >= self.IB_DEGRADATION_THRESHOLD) & \
+               (grades.ob_degradation >= self.OB_DEGRADATION_THRESHOLD)
     
     def _detect_bidirectional_degradation(
         self,
-        grades: List,
+        grades: GradeColumns,
         link_id: int
     ) -> List[DegradationPattern]:
         """Detect simultaneous IB and OB degradation (antenna misalignment)."""
         patterns = []
         
         try:
-            for grade in grades:
-                # Check for simultaneous IB and OB degradation
-                ib_deg = (grade.ib_degradation or 0)
-                ob_deg = (grade.ob_degradation or 0)
-                
-                if ib_deg >= self.IB_DEGRADATION_THRESHOLD and \
-                   ob_deg >= self.OB_DEGRADATION_THRESHOLD:
-                    
-                    severity = max(ib_deg, ob_deg)
-                    confidence = 0.90  # High confidence for bidirectional pattern
-                    
-                    pattern = DegradationPattern(
-                        pattern_id=f"BIDIR_{link_id}_{grade.timestamp.isoformat()}",
-                        pattern_type='antenna_misalignment',
-                        severity=severity,
-                        confidence=confidence,
-                        affected_items=[link_id],
-                        root_cause='Antenna misalignment: simultaneous IB & OB degradation',
-                        supporting_metrics={
-                            'ib_degradation': ib_deg,
-                            'ob_degradation': ob_deg,
-                            'grade': grade.grade,
-                            'timestamp': grade.timestamp.isoformat()
-                        },
-                        timestamp=grade.timestamp,
-                        hours_duration=1,
-                        devices_affected_count=1,
-                        links_affected_count=1
-                    )
-                    patterns.append(pattern)
+            for i in np.flatnonzero(self._bidirectional_mask(grades)):
+                patterns.append(self._bidirectional_pattern(
+                    link_id,
+                    float(grades.ib_degradation[i]),
+                    float(grades.ob_degradation[i]),
+                    float(grades.grade[i]),
+                    grades.timestamp[i].item()
+                ))
         
         except Exception as e:
             self.logger.error(f"Error detecting bidirectional degradation: {e}")
         
         return patterns
     
+    def _detect_regional_patterns(
+        self,
+        grades: GradeColumns,
+        grade_sites: np.ndarray,
+        locations: SiteLocations,
+        radius_km: float
+    ) -> List[DegradationPattern]:
+        """
+        Detect nearby sites degrading in the same hour.
+        
+        The degraded sites of each hour are grouped by the KD-tree; a region
+        degraded in consecutive hours becomes one pattern spanning them.
+        """
+        patterns = []
+        
+        if not len(grades):
+            return patterns
+        
+        try:
+            hours, hour_index = np.unique(grades.timestamp.astype('datetime64[h]'), return_inverse=True)
+            order = np.argsort(hour_index, kind='stable')
+            hour_rows = np.split(order, np.cumsum(np.bincount(hour_index, minlength=len(hours)))[:-1])
+            
+            # Site set -> [(hour position, grade rows)] in hour order
+            regions: Dict[Tuple[int, ...], List[Tuple[int, np.ndarray]]] = {}
+            for h, rows in enumerate(hour_rows):
+                for sites in locations.regions(grade_sites[rows], radius_km, self.MIN_DEVICES_FOR_PATTERN):
+                    in_region = rows[np.isin(grade_sites[rows], sites)]
+                    regions.setdefault(tuple(sites.tolist()), []).append((h, in_region))
+            
+            for sites, occurrences in regions.items():
+                run = [occurrences[0]]
+                for occurrence in occurrences[1:] + [None]:
+                    # Extend the run while the region stays degraded hour after hour
+                    if occurrence is not None and hours[occurrence[0]] - hours[run[-1][0]] == np.timedelta64(1, 'h'):
+                        run.append(occurrence)
+                        continue
+                    patterns.append(self._regional_pattern(
+                        list(sites),
+                        hours[run[0][0]].astype('datetime64[us]').item(),
+                        len(run),
+                        grades.select(np.concatenate([rows for _, rows in run])),
+                        locations,
+                        radius_km
+                    ))
+                    run = [occurrence]
+            
+            patterns.sort(key=lambda p: (p.timestamp, p.affected_items))
+        
+        except Exception as e:
+            self.logger.error(f"Error detecting regional patterns: {e}")
+        
+        return patterns
+    
+    # ==================== PATTERN BUILDERS ====================
+    
+    def _network_hour_pattern(
+        self,
+        network_id: int,
+        hour: datetime,
+        affected_links: List[int],
+        avg_grade: float,
+        min_grade: float,
+        degraded_count: int
+    ) -> DegradationPattern:
+        """Pattern for one hour in which several links of a network degraded."""
+        severity = 1.0 - (avg_grade / 10.0)  # Normalized to 0-1
+        confidence = min(0.95, len(affected_links) / 10.0 * 2)
+        
+        return DegradationPattern(
+            pattern_id=f"{network_id}_{hour.isoformat()}",
+            pattern_type='network_equipment_failure',
+            severity=severity,
+            confidence=confidence,
+            affected_items=affected_links,
+            root_cause='Possible equipment/hardware failure affecting multiple sites',
+            supporting_metrics={
+                'avg_grade': avg_grade,
+                'min_grade': min_grade,
+                'affected_links': len(affected_links),
+                'simultaneous_degradation_count': degraded_count
+            },
+            timestamp=hour,
+            hours_duration=1,
+            devices_affected_count=len(affected_links),
+            links_affected_count=len(affected_links)
+        )
+    
+    def _antenna_pattern(
+        self,
+        site_id: int,
+        link_id: int,
+        avg_ib_instability: float,
+        avg_ob_instability: float,
+        grade_count: int,
+        first_seen: datetime
+    ) -> DegradationPattern:
+        """Pattern for a hub link unstable in both directions."""
+        return DegradationPattern(
+            pattern_id=f"ANTENNA_{site_id}_{link_id}",
+            pattern_type='antenna_alignment',
+            severity=max(avg_ib_instability, avg_ob_instability),
+            confidence=0.85,
+            affected_items=[link_id],
+            root_cause='Antenna alignment issue causing bidirectional instability',
+            supporting_metrics={
+                'avg_ib_instability': avg_ib_instability,
+                'avg_ob_instability': avg_ob_instability,
+                'grade_records_analyzed': grade_count
+            },
+            timestamp=first_seen,
+            hours_duration=grade_count,
+            devices_affected_count=1,
+            links_affected_count=1
+        )
+    
+    def _satellite_pattern(
+        self,
+        satellite_name: str,
+        links: List[int],
+        avg_grade: float,
+        avg_congestion: float,
+        measurements: int,
+        first_seen: datetime
+    ) -> DegradationPattern:
+        """Pattern for several links of one satellite degrading."""
+        severity = max(1.0 - (avg_grade / 10.0), avg_congestion)
+        confidence = 0.88
+        
+        return DegradationPattern(
+            pattern_id=f"SAT_{satellite_name}",
+            pattern_type='satellite_interference',
+            severity=severity,
+            confidence=confidence,
+            affected_items=links,
+            root_cause='Possible satellite interference or underperformance',
+            supporting_metrics={
+                'affected_links': len(links),
+                'avg_grade': avg_grade,
+                'avg_congestion': avg_congestion,
+                'total_measurements': measurements
+            },
+            timestamp=first_seen,
+            hours_duration=measurements,
+            devices_affected_count=len(links),
+            links_affected_count=len(links)
+        )
+    
+    def _bidirectional_pattern(
+        self,
+        link_id: int,
+        ib_degradation: float,
+        ob_degradation: float,
+        grade: float,
+        timestamp: datetime
+    ) -> DegradationPattern:
+        """Pattern for one grade with simultaneous IB and OB degradation."""
+        severity = max(ib_degradation, ob_degradation)
+        confidence = 0.90  # High confidence for bidirectional pattern
+        
+        return DegradationPattern(
+            pattern_id=f"BIDIR_{link_id}_{timestamp.isoformat()}",
+            pattern_type='antenna_misalignment',
+            severity=severity,
+            confidence=confidence,
+            affected_items=[link_id],
+            root_cause='Antenna misalignment: simultaneous IB & OB degradation',
+            supporting_metrics={
+                'ib_degradation': ib_degradation,
+                'ob_degradation': ob_degradation,
+                'grade': grade,
+                'timestamp': timestamp.isoformat()
+            },
+            timestamp=timestamp,
+            hours_duration=1,
+            devices_affected_count=1,
+            links_affected_count=1
+        )
+    
+    def _regional_pattern(
+        self,
+        sites: List[int],
+        start_hour: datetime,
+        hours_duration: int,
+        grades: GradeColumns,
+        locations: SiteLocations,
+        radius_km: float
+    ) -> DegradationPattern:
+        """Pattern for a run of hours in which a region of nearby sites degraded."""
+        avg_grade = float(grades.grade.mean())
+        links = np.unique(grades.link_id).tolist()
+        latitude, longitude, extent_km = locations.extent_km(sites)
+        
+        severity = 1.0 - (avg_grade / 10.0)  # Normalized to 0-1
+        # More sites and a longer run make weather more likely than coincidence
+        confidence = min(0.95, len(sites) / 10.0 * 2 + 0.05 * (hours_duration - 1))
+        
+        return DegradationPattern(
+            pattern_id=f"REGION_{sites[0]}_{start_hour.isoformat()}",
+            pattern_type='regional_weather',
+            severity=severity,
+            confidence=confidence,
+            affected_items=sites,
+            root_cause='Possible regional weather or rain fade affecting nearby sites',
+            supporting_metrics={
+                'avg_grade': avg_grade,
+                'min_grade': float(grades.grade.min()),
+                'affected_sites': len(sites),
+                'affected_links': len(links),
+                'degraded_grade_count': len(grades),
+                'centroid_latitude': round(latitude, 6),
+                'centroid_longitude': round(longitude, 6),
+                'extent_km': round(extent_km, 3),
+                'radius_km': radius_km
+            },
+            timestamp=start_hour,
+            hours_duration=hours_duration,
+            devices_affected_count=len(links),
+            links_affected_count=len(links)
+        )
+    
     # ==================== SCORING & RECOMMENDATION METHODS ====================
     
     def _calculate_correlation_score(
         self,
-        degraded_items: Dict,
+        grades: GradeColumns,
         hours_lookback: int
     ) -> float:
         """Calculate overall correlation strength (0-1)."""
         try:
-            if not degraded_items:
+            if not len(grades):
                 return 0.0
             
-            # More items = stronger correlation
-            item_count = len(degraded_items)
-            item_score = min(item_count / 10.0, 1.0)
-            
-            # Consistency of degradation
-            all_grades = []
-            for grades in degraded_items.values():
-                all_grades.extend([g.grade for g in grades])
-            
-            if all_grades:
-                try:
-                    grade_stdev = stdev(all_grades)
-                    # Lower stdev = more consistent = stronger correlation
-                    consistency_score = 1.0 - (grade_stdev / 10.0)
-                    consistency_score = max(0, min(1.0, consistency_score))
-                except StatisticsError:
-                    consistency_score = 0.5
-            else:
-                consistency_score = 0.5
-            
-            # Average of both factors
-            correlation_score = (item_score * 0.4) + (consistency_score * 0.6)
-            return min(1.0, correlation_score)
+            # Consistency of degradation (sample stdev, undefined for one value)
+            grade_stdev = float(np.std(grades.grade, ddof=1)) if len(grades) >= 2 else None
+            return self._correlation_score(len(np.unique(grades.link_id)), grade_stdev)
         
         except Exception as e:
             self.logger.error(f"Error calculating correlation score: {e}")
             return 0.5
     
-    def _calculate_bidirectional_score(self, grades: List) -> float:
+    @staticmethod
+    def _correlation_score(item_count: int, grade_stdev: Optional[float]) -> float:
+        """
+        Combine item count and grade consistency into a correlation score.
+        
+        Args:
+            item_count: Distinct links involved
+            grade_stdev: Sample stdev of their grades, None for a single grade
+            
+        Returns:
+            Correlation score (0-1)
+        """
+        # More items = stronger correlation
+        item_score = min(item_count / 10.0, 1.0)
+        
+        if grade_stdev is not None:
+            # Lower stdev = more consistent = stronger correlation
+            consistency_score = 1.0 - (grade_stdev / 10.0)
+            consistency_score = max(0, min(1.0, consistency_score))
+        else:
+            consistency_score = 0.5
+        
+        # Average of both factors
+        correlation_score = (item_score * 0.4) + (consistency_score * 0.6)
+        return min(1.0, correlation_score)
+    
+    def _calculate_bidirectional_score(self, grades: GradeColumns) -> float:
         """Calculate correlation score for bidirectional degradation."""
         try:
-            bidirectional_count = 0
-            total_count = len(grades)
-            
-            for grade in grades:
-                ib_deg = (grade.ib_degradation or 0)
-                ob_deg = (grade.ob_degradation or 0)
-                
-                if ib_deg >= self.IB_DEGRADATION_THRESHOLD and \
-                   ob_deg >= self.OB_DEGRADATION_THRESHOLD:
-                    bidirectional_count += 1
-            
-            if total_count == 0:
+            if not len(grades):
                 return 0.0
             
-            return bidirectional_count / total_count
+            return float(self._bidirectional_mask(grades).mean())
         
         except Exception as e:
             self.logger.error(f"Error calculating bidirectional score: {e}")
@@ -919,3 +1392,50 @@ class CorrelationEngine:
         )
         
         return recommendations
+
+    
+    def _generate_regional_recommendations(
+        self,
+        affected_sites: int,
+        correlation_score: float,
+        patterns: List[DegradationPattern]
+    ) -> List[str]:
+        """Generate regional (weather) recommendations."""
+        recommendations = []
+        
+        if correlation_score > 0.7:
+            recommendations.append(
+                "🔴 CRITICAL: Nearby sites on different links degrading simultaneously. "
+                "Likely regional weather or rain fade rather than equipment failure."
+            )
+        elif correlation_score > 0.5:
+            recommendations.append(
+                "🟠 HIGH: Simultaneous degradation of geographically clustered sites detected."
+            )
+        
+        widest = max(patterns, key=lambda p: p.supporting_metrics['affected_sites'])
+        recommendations.append(
+            f"• Affected Sites: {affected_sites} in {len(patterns)} regional pattern(s); "
+            f"largest centred at {widest.supporting_metrics['centroid_latitude']:.3f}, "
+            f"{widest.supporting_metrics['centroid_longitude']:.3f}"
+        )
+        recommendations.append(
+            "• Check weather radar and precipitation for the affected area and period"
+        )
+        recommendations.append(
+            "• Review rain fade margins, adaptive coding/modulation and uplink power control"
+        )
+        recommendations.append(
+            "• Hold equipment interventions until the weather clears unless degradation persists"
+        )
+        
+        return recommendations
+
+
+# Global correlation engine
+correlation_engine = CorrelationEngine()
+
+
+def get_correlation_engine() -> CorrelationEngine:
+    """Get the global correlation engine."""
+    return correlation_engine
@@ -0,0 +1,348 @@
+"""
+Fleet-wide correlation sweep.
+
+Runs the network, hub-antenna, satellite and link-bidirectional detectors of
+the CorrelationEngine for every scope in the fleet from a single load of the
+lookback window: one grade query in total, with scopes resolved through the
+topology index, instead of one HTTP call and one query set per scope. Patterns are
+stored in the degradation_patterns table under the sweep's job ID, and a
+SweepJob tracks progress for the progress/result API.
+"""
+
+import logging
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import CorrelationEngine, DegradationPattern, GradeColumns, grade_query
+
+logger = logging.getLogger(__name__)
+
+SWEEP_SCOPES = ('network', 'hub_antenna', 'satellite', 'link')
+
+
+class SweepJob:
+    """Progress and outcome of one fleet sweep."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    TOP_PATTERNS = 20
+
+    def __init__(self, job_id: str, hours_lookback: int, scopes: Sequence[str]):
+        self.job_id = job_id
+        self.hours_lookback = hours_lookback
+        self.scopes = list(scopes)
+        self.status = self.PENDING
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.total_scopes = 0
+        self.completed_scopes = 0
+        self.current_scope: Optional[str] = None
+        self.grades_loaded = 0
+        self.patterns_found = 0
+        self.patterns_stored = 0
+        self.patterns_by_type: Counter = Counter()
+        self.patterns_by_scope: Counter = Counter()
+        self.top_patterns: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == self.COMPLETED:
+            return 1.0
+        return self.completed_scopes / self.total_scopes if self.total_scopes else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for the progress/result API."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "hours_lookback": self.hours_lookback,
+            "scopes": self.scopes,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": round(self.progress, 4),
+            "total_scopes": self.total_scopes,
+            "completed_scopes": self.completed_scopes,
+            "current_scope": self.current_scope,
+            "grades_loaded": self.grades_loaded,
+            "patterns_found": self.patterns_found,
+            "patterns_stored": self.patterns_stored,
+            "patterns_by_type": dict(self.patterns_by_type),
+            "patterns_by_scope": dict(self.patterns_by_scope),
+            "top_patterns": self.top_patterns,
+            "error": self.error,
+        }
+
+
+class SweepJobRegistry:
+    """In-memory registry of recent sweep jobs (per worker)."""
+
+    MAX_JOBS = 50
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, SweepJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, hours_lookback: int = 24, scopes: Optional[Sequence[str]] = None) -> SweepJob:
+        """
+        Register a new pending job.
+
+        Args:
+            hours_lookback: Hours of history to sweep
+            scopes: Detectors to run, None for all of SWEEP_SCOPES
+
+        Returns:
+            The new job
+        """
+        scopes = list(scopes) if scopes else list(SWEEP_SCOPES)
+        unknown = [s for s in scopes if s not in SWEEP_SCOPES]
+        if unknown:
+            raise ValueError(f"Unknown sweep scope(s) {unknown}, expected {SWEEP_SCOPES}")
+
+        job = SweepJob(f"SWEEP_{uuid.uuid4().hex[:12]}", hours_lookback, scopes)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            # Forget the oldest finished jobs; their patterns stay in the table
+            while len(self._jobs) > self.MAX_JOBS:
+                oldest = next(
+                    (jid for jid, j in self._jobs.items() if j.status in (SweepJob.COMPLETED, SweepJob.FAILED)),
+                    None
+                )
+                if oldest is None:
+                    break
+                del self._jobs[oldest]
+        return job
+
+    def get(self, job_id: str) -> Optional[SweepJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[SweepJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+
+def _groups(keys: np.ndarray) -> Iterator[Tuple[Any, np.ndarray]]:
+    """Yield (key, row indices) per distinct key, keeping row order within a group."""
+    if not len(keys):
+        return
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    for indices in np.split(order, np.flatnonzero(ordered[1:] != ordered[:-1]) + 1):
+        yield keys[indices[0]].item(), indices
+
+
+def run_sweep(
+    db: Session,
+    job: SweepJob,
+    engine: Optional[CorrelationEngine] = None,
+    store: bool = True
+) -> List[Tuple[str, str, DegradationPattern]]:
+    """
+    Run every selected detector for every scope from one load of the window.
+
+    Args:
+        db: Database session
+        job: Job to update with progress
+        engine: Correlation engine providing the detectors
+        store: Persist the patterns to degradation_patterns
+
+    Returns:
+        List of (scope, scope key, pattern)
+    """
+    from app.models.bcom_models import SiteGrade
+
+    engine = engine or CorrelationEngine()
+    hours_lookback = job.hours_lookback
+    cutoff_time = datetime.utcnow() - timedelta(hours=hours_lookback)
+
+    # ---- Load the window once
+    topology = engine.topology.get(db)
+    link_ids = topology.link_ids
+    link_network = topology.network_of(link_ids)
+    link_site = topology.site_of(link_ids)
+    links_per_site = dict(zip(topology.site_ids.tolist(), topology.site_links.degree().tolist()))
+
+    # Satellite of every link, from the same snapshot
+    satellite_names = []
+    link_satellite = np.full(len(link_ids), -1, dtype=np.int64)
+    for name, satellite_links in engine.satellite_index.groups(topology).items():
+        link_satellite[np.searchsorted(link_ids, satellite_links)] = len(satellite_names)
+        satellite_names.append(name)
+
+    hub_sites = set(topology.hub_site_ids().tolist())
+
+    grades = GradeColumns.from_rows(
+        grade_query(db).filter(SiteGrade.timestamp >= cutoff_time).order_by(SiteGrade.link_id, SiteGrade.timestamp).all()
+    )
+    job.grades_loaded = len(grades)
+
+    # Link attributes of every grade row
+    row_link = topology.link_positions(grades.link_id)
+    known = row_link >= 0
+    grades = grades.select(known)
+    row_link = row_link[known]
+    degraded = grades.grade < engine.WARNING_GRADE_THRESHOLD
+
+    # ---- Plan the scopes: (scope, key, builder, builder args)
+    plan: List[Tuple[str, Any, Callable[..., Any], tuple]] = []
+    if 'network' in job.scopes:
+        network_grades = grades.select(degraded)
+        network_rows = row_link[degraded]
+        for network_id, idx in _groups(link_network[network_rows]):
+            affected_sites = len(np.unique(link_site[network_rows[idx]]))
+            plan.append(('network', network_id, engine._build_network_analysis, (
+                f"NET_{network_id}_{job.job_id}", network_id, hours_lookback,
+                network_grades.select(idx), affected_sites
+            )))
+    if 'hub_antenna' in job.scopes:
+        for site_id, idx in _groups(link_site[row_link]):
+            if site_id in hub_sites:
+                plan.append(('hub_antenna', site_id, engine._build_hub_antenna_analysis, (
+                    f"HUB_{site_id}_{job.job_id}", site_id, hours_lookback,
+                    grades.select(idx), links_per_site[site_id]
+                )))
+    if 'satellite' in job.scopes:
+        satellite_grades = grades.select(degraded)
+        for code, idx in _groups(link_satellite[row_link[degraded]]):
+            if code >= 0:
+                name = satellite_names[code]
+                plan.append(('satellite', name, engine._build_satellite_analysis, (
+                    f"SAT_{name}_{job.job_id}", name, hours_lookback, satellite_grades.select(idx)
+                )))
+    if 'link' in job.scopes:
+        for link_id, idx in _groups(grades.link_id):
+            plan.append(('link', link_id, engine._build_link_bidirectional_analysis, (
+                f"LINK_{link_id}_{job.job_id}", link_id, hours_lookback, grades.select(idx)
+            )))
+
+    job.total_scopes = len(plan)
+    logger.info(f"Sweep {job.job_id}: {len(grades)} grades, {len(plan)} scopes")
+
+    # ---- Run the detectors
+    results: List[Tuple[str, str, DegradationPattern]] = []
+    for scope, key, build, args in plan:
+        job.current_scope = f"{scope}:{key}"
+        try:
+            analysis = build(*args)
+        except Exception as e:
+            logger.error(f"Sweep {job.job_id}: {scope} {key} failed: {e}")
+            analysis = None
+        if analysis is not None:
+            for pattern in analysis.patterns_found:
+                results.append((scope, str(key), pattern))
+                job.patterns_by_type[pattern.pattern_type] += 1
+                job.patterns_by_scope[scope] += 1
+        job.completed_scopes += 1
+    job.current_scope = None
+    job.patterns_found = len(results)
+
+    ranked = sorted(results, key=lambda r: r[2].severity * r[2].confidence, reverse=True)
+    job.top_patterns = [
+        {"scope": scope, "scope_key": key, **pattern.to_dict()}
+        for scope, key, pattern in ranked[:SweepJob.TOP_PATTERNS]
+    ]
+
+    if store and results:
+        job.patterns_stored = store_patterns(db, job.job_id, results)
+
+    return results
+
+
+def store_patterns(
+    db: Session,
+    sweep_id: str,
+    results: Sequence[Tuple[str, str, DegradationPattern]],
+    batch_size: int = 1000
+) -> int:
+    """
+    Persist sweep patterns to degradation_patterns.
+
+    Args:
+        db: Database session
+        sweep_id: Sweep job ID the patterns belong to
+        results: (scope, scope key, pattern) tuples
+        batch_size: Rows per flush
+
+    Returns:
+        Number of rows stored
+    """
+    from app.models.bcom_models import DegradationPatternRecord
+
+    stored = 0
+    for start in range(0, len(results), batch_size):
+        db.add_all([
+            DegradationPatternRecord(
+                sweep_id=sweep_id,
+                scope=scope,
+                scope_key=key,
+                pattern_id=pattern.pattern_id,
+                pattern_type=pattern.pattern_type,
+                severity=float(pattern.severity),
+                confidence=float(pattern.confidence),
+                root_cause=pattern.root_cause,
+                affected_items=list(pattern.affected_items),
+                supporting_metrics=pattern.supporting_metrics,
+                timestamp=pattern.timestamp,
+                hours_duration=pattern.hours_duration,
+                devices_affected_count=pattern.devices_affected_count,
+                links_affected_count=pattern.links_affected_count,
+            )
+            for scope, key, pattern in results[start:start + batch_size]
+        ])
+        db.flush()
+        stored += min(batch_size, len(results) - start)
+    db.commit()
+    return stored
+
+
+def execute_sweep_job(job: SweepJob, session_factory: Callable[[], Session]) -> SweepJob:
+    """
+    Run a registered job on its own session (blocking; for a background task).
+
+    Args:
+        job: Pending job
+        session_factory: Creates the database session (e.g. SessionLocal)
+
+    Returns:
+        The finished job
+    """
+    job.status = SweepJob.RUNNING
+    job.started_at = datetime.utcnow()
+    db = session_factory()
+    try:
+        run_sweep(db, job)
+        job.status = SweepJob.COMPLETED
+    except Exception as e:
+        db.rollback()
+        job.status = SweepJob.FAILED
+        job.error = str(e)
+        logger.error(f"Sweep {job.job_id} failed: {str(e)}")
+    finally:
+        db.close()
+        job.finished_at = datetime.utcnow()
+    logger.info(
+        f"Sweep {job.job_id} {job.status}: {job.patterns_found} patterns "
+        f"from {job.completed_scopes}/{job.total_scopes} scopes"
+    )
+    return job
+
+
+# Global sweep job registry
+sweep_registry = SweepJobRegistry()
+
+
+def get_sweep_registry() -> SweepJobRegistry:
+    """Get the global sweep job registry."""
+    return sweep_registry
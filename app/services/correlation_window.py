@@ -0,0 +1,632 @@
+"""
+Incremental sliding-window correlation state.
+
+Keeps the aggregates the CorrelationEngine detectors read for one rolling
+lookback window, bucketed by UTC hour:
+- per hour, a bitset of the links with at least one degraded grade
+- per hour and network/satellite, running sums of the degraded grades
+- per link, running grade and instability sums and IB/OB degradation counters
+
+New SiteGrade rows are folded in as they arrive (sync() reads the rows not
+seen yet through a GradeWatermark, which also re-reads a short overlap so
+rows committed late with a lower ID are not lost) and hours leaving the
+window are subtracted again, so an analysis reads the current state of its
+scope instead of rescanning the raw grades of the whole lookback window.
+The whole window is reloaded every REBUILD_SECONDS, which also picks up
+late rows timestamped before the overlap.
+
+The window is kept at hour granularity: the oldest bucket is kept whole, so
+up to one hour more than the lookback may be included.
+"""
+
+import logging
+import math
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import (
+    CorrelationAnalysis,
+    CorrelationEngine,
+    GradeColumns,
+    GradeWatermark,
+    get_correlation_engine,
+    grade_query,
+)
+from app.services.satellite_index import normalize_satellite
+from app.services.topology_index import Topology
+
+logger = logging.getLogger(__name__)
+
+
+class GradeStats:
+    """Running sums over a set of grades that can be merged and subtracted."""
+
+    __slots__ = (
+        "count", "grade_sum", "grade_sq", "grade_min", "congestion_sum",
+        "ib_instability_sum", "ob_instability_sum", "unstable", "bidirectional", "first"
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.grade_sum = 0.0
+        self.grade_sq = 0.0
+        self.grade_min = math.inf
+        self.congestion_sum = 0.0
+        self.ib_instability_sum = 0.0
+        self.ob_instability_sum = 0.0
+        self.unstable = 0
+        self.bidirectional = 0
+        self.first: Optional[datetime] = None
+
+    def merge(self, other: 'GradeStats') -> None:
+        """Add another set of grades."""
+        self.count += other.count
+        self.grade_sum += other.grade_sum
+        self.grade_sq += other.grade_sq
+        self.grade_min = min(self.grade_min, other.grade_min)
+        self.congestion_sum += other.congestion_sum
+        self.ib_instability_sum += other.ib_instability_sum
+        self.ob_instability_sum += other.ob_instability_sum
+        self.unstable += other.unstable
+        self.bidirectional += other.bidirectional
+        if other.first is not None and (self.first is None or other.first < self.first):
+            self.first = other.first
+
+    def remove(self, other: 'GradeStats') -> None:
+        """
+        Subtract a set of grades previously added.
+
+        The minimum grade and first timestamp cannot be undone; they are only
+        read from hourly buckets, which are never subtracted from.
+        """
+        self.count -= other.count
+        self.grade_sum -= other.grade_sum
+        self.grade_sq -= other.grade_sq
+        self.congestion_sum -= other.congestion_sum
+        self.ib_instability_sum -= other.ib_instability_sum
+        self.ob_instability_sum -= other.ob_instability_sum
+        self.unstable -= other.unstable
+        self.bidirectional -= other.bidirectional
+
+    @property
+    def mean(self) -> float:
+        return self.grade_sum / self.count if self.count else 0.0
+
+    def stdev(self) -> Optional[float]:
+        """Sample standard deviation of the grades, None below two grades."""
+        if self.count < 2:
+            return None
+        variance = (self.grade_sq - self.grade_sum * self.grade_sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class HourBucket:
+    """Aggregates of the grades of one UTC hour."""
+
+    __slots__ = ("hour", "degraded_links", "links", "networks", "satellites", "bidirectional")
+
+    def __init__(self, hour: datetime):
+        self.hour = hour
+        self.degraded_links = 0  # bitset over link slots
+        self.links: Dict[int, GradeStats] = {}  # all grades per link
+        self.networks: Dict[int, GradeStats] = {}  # degraded grades per network
+        self.satellites: Dict[str, GradeStats] = {}  # degraded grades per link_type
+        # (timestamp, ib_degradation, ob_degradation, grade) per link
+        self.bidirectional: Dict[int, List[Tuple[datetime, float, float, float]]] = {}
+
+
+class LinkInfo(NamedTuple):
+    slot: int
+    network_id: int
+    site_id: int
+    link_type: str
+
+
+def _hour_link_stats(
+    grades: GradeColumns,
+    unstable: np.ndarray,
+    bidirectional: np.ndarray
+) -> Iterator[Tuple[datetime, int, GradeStats]]:
+    """Aggregate grades per (hour, link) in one vectorized pass."""
+    if not len(grades):
+        return
+    hours = grades.timestamp.astype('datetime64[h]').astype(np.int64)
+    keys, group = np.unique(np.stack([hours, grades.link_id], axis=1), axis=0, return_inverse=True)
+    group = group.ravel()
+    n = len(keys)
+
+    grade_min = np.full(n, np.inf)
+    np.minimum.at(grade_min, group, grades.grade)
+    first = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(first, group, grades.timestamp.view(np.int64))
+
+    columns = zip(
+        keys[:, 0].astype('datetime64[h]').astype('datetime64[us]').tolist(),
+        keys[:, 1].tolist(),
+        np.bincount(group, minlength=n).tolist(),
+        np.bincount(group, weights=grades.grade, minlength=n).tolist(),
+        np.bincount(group, weights=grades.grade * grades.grade, minlength=n).tolist(),
+        grade_min.tolist(),
+        np.bincount(group, weights=grades.congestion, minlength=n).tolist(),
+        np.bincount(group, weights=grades.ib_instability, minlength=n).tolist(),
+        np.bincount(group, weights=grades.ob_instability, minlength=n).tolist(),
+        np.bincount(group, weights=unstable, minlength=n).astype(np.int64).tolist(),
+        np.bincount(group, weights=bidirectional, minlength=n).astype(np.int64).tolist(),
+        first.view('datetime64[us]').tolist(),
+    )
+    for hour, link_id, *values in columns:
+        stats = GradeStats()
+        (stats.count, stats.grade_sum, stats.grade_sq, stats.grade_min, stats.congestion_sum,
+         stats.ib_instability_sum, stats.ob_instability_sum, stats.unstable, stats.bidirectional,
+         stats.first) = values
+        yield hour, link_id, stats
+
+
+def _accumulate(aggregates: Dict[Any, GradeStats], key: Any, stats: GradeStats) -> None:
+    """Merge stats into the entry for key, creating it if needed."""
+    entry = aggregates.get(key)
+    if entry is None:
+        entry = aggregates[key] = GradeStats()
+    entry.merge(stats)
+
+
+def _subtract(totals: Dict[Any, GradeStats], part: Dict[Any, GradeStats]) -> None:
+    """Remove an expired bucket's stats from the window totals."""
+    for key, stats in part.items():
+        total = totals.get(key)
+        if total is None:
+            continue
+        total.remove(stats)
+        if total.count <= 0:
+            del totals[key]
+
+
+class CorrelationWindow:
+    """
+    Rolling per-scope correlation state for one lookback window.
+
+    Each link gets a stable bit slot on first sight; network and satellite
+    link sets are kept as bitmasks so the degraded links of a scope in an
+    hour are a single AND. All methods are thread-safe.
+    """
+
+    # Reload the whole window this long after it was loaded
+    REBUILD_SECONDS = 3600
+
+    def __init__(self, window_hours: int = 24, engine: Optional[CorrelationEngine] = None):
+        self.window_hours = window_hours
+        self.engine = engine or get_correlation_engine()
+        self._lock = threading.RLock()
+        self._watermark = GradeWatermark()
+        self.reset()
+
+    def configure(self, window_hours: int) -> None:
+        """Change the window length (0 disables); drops the current state."""
+        with self._lock:
+            if window_hours != self.window_hours:
+                self.window_hours = window_hours
+                self.reset()
+
+    def covers(self, hours_lookback: int) -> bool:
+        """Whether an analysis with this lookback can be read from the window."""
+        return self.window_hours > 0 and hours_lookback == self.window_hours
+
+    def reset(self) -> None:
+        """Drop all state; the next sync reloads the whole window."""
+        with self._lock:
+            self._links: Dict[int, LinkInfo] = {}
+            self._slot_links: List[int] = []
+            self._network_masks: Dict[int, int] = {}
+            self._satellite_masks: Dict[str, int] = {}
+            self._topology: Optional[Topology] = None
+
+            self._buckets: Dict[datetime, HourBucket] = {}
+            self._link_totals: Dict[int, GradeStats] = {}
+            self._network_totals: Dict[int, GradeStats] = {}
+            self._satellite_totals: Dict[str, GradeStats] = {}
+            self._window_start = datetime.min
+            self._watermark.reset()
+            self._loaded_at: Optional[datetime] = None
+            self._last_sync: Optional[datetime] = None
+
+    # ==================== STATE MAINTENANCE ====================
+
+    def load_links(self, topology: Topology) -> None:
+        """Load the link directory (network, site, satellite of every link) from a topology snapshot."""
+        with self._lock:
+            network_masks: Dict[int, int] = {}
+            satellite_masks: Dict[str, int] = {}
+            for row in topology.links():
+                # Keep slots stable, the hourly bitsets refer to them
+                known = self._links.get(row.link_id)
+                slot = known.slot if known else len(self._slot_links)
+                if not known:
+                    self._slot_links.append(row.link_id)
+                info = LinkInfo(slot, row.network_id, row.site_id, row.link_type or '')
+                self._links[row.link_id] = info
+
+                network_masks[info.network_id] = network_masks.get(info.network_id, 0) | (1 << slot)
+                if info.link_type:
+                    satellite_masks[info.link_type] = satellite_masks.get(info.link_type, 0) | (1 << slot)
+
+            self._network_masks = network_masks
+            self._satellite_masks = satellite_masks
+            self._topology = topology
+
+    def sync(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Fold in the SiteGrade rows added since the last sync.
+
+        The first sync, and the first one REBUILD_SECONDS after it, loads the
+        whole window. Later syncs read the rows above the highest SiteGrade
+        ID seen so far plus the unseen rows of the watermark's overlap.
+
+        Args:
+            db: Database session
+            now: Current time (default: utcnow)
+
+        Returns:
+            Number of grades added to the window
+        """
+        from app.models.bcom_models import SiteGrade
+
+        with self._lock:
+            if self._loaded_at and datetime.utcnow() - self._loaded_at > timedelta(seconds=self.REBUILD_SECONDS):
+                logger.debug("Correlation window: reloading the whole window")
+                self.reset()
+            self._expire(now)
+            # Reload the directory whenever the topology index was rebuilt
+            topology = self.engine.topology.get(db)
+            if topology is not self._topology:
+                self.load_links(topology)
+
+            rows = self._watermark.read(
+                grade_query(db, SiteGrade.id).filter(SiteGrade.timestamp >= self._window_start), now
+            )
+            self._last_sync = datetime.utcnow()
+            if self._loaded_at is None:
+                self._loaded_at = self._last_sync
+            if not rows:
+                return 0
+
+            if any(row.link_id not in self._links for row in rows):
+                self.engine.topology.invalidate()
+                self.load_links(self.engine.topology.get(db))
+            added = self.ingest(GradeColumns.from_rows(rows), now)
+            logger.debug(f"Correlation window: {added} new grades up to id {self._watermark.last_id}")
+            return added
+
+    def ingest(self, grades: GradeColumns, now: Optional[datetime] = None) -> int:
+        """
+        Fold new grades into the window.
+
+        The batch is aggregated per (hour, link) first, so the Python-level
+        work grows with the number of groups rather than grades. Grades of
+        unknown links or of hours already outside the window are skipped.
+
+        Args:
+            grades: New grades
+            now: Current time (default: utcnow)
+
+        Returns:
+            Number of grades added
+        """
+        engine = self.engine
+        with self._lock:
+            self._expire(now)
+            known = np.fromiter(self._links, dtype=np.int64, count=len(self._links))
+            grades = grades.select(
+                np.isin(grades.link_id, known) & (grades.timestamp >= np.datetime64(self._window_start, 'us'))
+            )
+            degraded = grades.grade < engine.WARNING_GRADE_THRESHOLD
+            unstable = (grades.ib_instability > engine.INSTABILITY_THRESHOLD) | \
+                       (grades.ob_instability > engine.INSTABILITY_THRESHOLD)
+            bidirectional = engine._bidirectional_mask(grades)
+
+            for hour, link_id, stats in _hour_link_stats(grades, unstable, bidirectional):
+                _accumulate(self._bucket(hour).links, link_id, stats)
+                _accumulate(self._link_totals, link_id, stats)
+
+            for hour, link_id, stats in _hour_link_stats(
+                grades.select(degraded), unstable[degraded], bidirectional[degraded]
+            ):
+                info = self._links[link_id]
+                bucket = self._bucket(hour)
+                bucket.degraded_links |= 1 << info.slot
+                _accumulate(bucket.networks, info.network_id, stats)
+                _accumulate(self._network_totals, info.network_id, stats)
+                if info.link_type:
+                    _accumulate(bucket.satellites, info.link_type, stats)
+                    _accumulate(self._satellite_totals, info.link_type, stats)
+
+            # Bidirectional grades are kept individually, one pattern each
+            for i in np.flatnonzero(bidirectional):
+                timestamp = grades.timestamp[i].item()
+                self._bucket(timestamp.replace(minute=0, second=0, microsecond=0)).bidirectional.setdefault(
+                    int(grades.link_id[i]), []
+                ).append((
+                    timestamp, float(grades.ib_degradation[i]), float(grades.ob_degradation[i]), float(grades.grade[i])
+                ))
+
+            return len(grades)
+
+    def _bucket(self, hour: datetime) -> HourBucket:
+        bucket = self._buckets.get(hour)
+        if bucket is None:
+            bucket = self._buckets[hour] = HourBucket(hour)
+        return bucket
+
+    def _expire(self, now: Optional[datetime] = None) -> None:
+        """Advance the window start and subtract the hours that left it."""
+        now = now or datetime.utcnow()
+        self._window_start = (now - timedelta(hours=self.window_hours)).replace(minute=0, second=0, microsecond=0)
+        for hour in sorted(h for h in self._buckets if h < self._window_start):
+            bucket = self._buckets.pop(hour)
+            _subtract(self._link_totals, bucket.links)
+            _subtract(self._network_totals, bucket.networks)
+            _subtract(self._satellite_totals, bucket.satellites)
+
+    def _ordered_buckets(self) -> List[HourBucket]:
+        return [self._buckets[hour] for hour in sorted(self._buckets)]
+
+    def _link_ids(self, bits: int) -> List[int]:
+        """Sorted link IDs of the set bits of a link bitset."""
+        link_ids = []
+        while bits:
+            low = bits & -bits
+            link_ids.append(self._slot_links[low.bit_length() - 1])
+            bits ^= low
+        return sorted(link_ids)
+
+    def _degraded_links(self, mask: int) -> List[int]:
+        """Links of a mask with a degraded grade anywhere in the window."""
+        bits = 0
+        for bucket in self._buckets.values():
+            bits |= bucket.degraded_links
+        return self._link_ids(bits & mask)
+
+    # ==================== ANALYSES ====================
+
+    def analyze_network(self, network_id: int, now: Optional[datetime] = None) -> Optional[CorrelationAnalysis]:
+        """Network equipment analysis (see CorrelationEngine.analyze_network_degradation)."""
+        engine = self.engine
+        analysis_id = f"NET_{network_id}_{uuid.uuid4().hex[:8]}"
+
+        with self._lock:
+            self._expire(now)
+            mask = self._network_masks.get(network_id)
+            if mask is None:
+                logger.warning(f"No links found for network {network_id}")
+                return None
+
+            totals = self._network_totals.get(network_id)
+            if totals is None:
+                return engine._empty_analysis(
+                    analysis_id, 'network', network_id, self.window_hours,
+                    'No degradation detected in this network'
+                )
+
+            links = self._degraded_links(mask)
+            patterns = []
+            if len(links) >= engine.MIN_DEVICES_FOR_PATTERN:
+                for bucket in self._ordered_buckets():
+                    stats = bucket.networks.get(network_id)
+                    if stats is None or stats.count < engine.MIN_DEVICES_FOR_PATTERN:
+                        continue
+                    patterns.append(engine._network_hour_pattern(
+                        network_id,
+                        bucket.hour,
+                        self._link_ids(bucket.degraded_links & mask),
+                        stats.mean,
+                        stats.grade_min,
+                        stats.count
+                    ))
+
+            correlation_score = engine._correlation_score(len(links), totals.stdev())
+            recommendations = engine._generate_network_recommendations(
+                len({self._links[link_id].site_id for link_id in links}),
+                len(links),
+                correlation_score,
+                patterns
+            )
+
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='network',
+            scope_id=network_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=self.window_hours,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+
+    def analyze_hub_antenna(self, site_id: int, now: Optional[datetime] = None) -> Optional[CorrelationAnalysis]:
+        """Hub antenna analysis (see CorrelationEngine.analyze_hub_antenna_degradation)."""
+        engine = self.engine
+        analysis_id = f"HUB_{site_id}_{uuid.uuid4().hex[:8]}"
+
+        with self._lock:
+            self._expire(now)
+            topology = self._topology
+            site_links = topology.links_under('site', site_id).tolist() if topology else []
+            if not site_links or not topology.is_hub(site_id):
+                logger.warning(f"Site {site_id} is not a hub antenna")
+                return None
+
+            # Links with any grade over the instability threshold
+            unstable = [
+                link_id for link_id in site_links
+                if link_id in self._link_totals and self._link_totals[link_id].unstable
+            ]
+            if not unstable:
+                return engine._empty_analysis(
+                    analysis_id, 'hub_antenna', site_id, self.window_hours,
+                    'No antenna-level degradation detected'
+                )
+
+            combined = GradeStats()
+            patterns = []
+            for link_id in unstable:
+                totals = self._link_totals[link_id]
+                combined.merge(totals)
+                avg_ib = totals.ib_instability_sum / totals.count
+                avg_ob = totals.ob_instability_sum / totals.count
+                if avg_ib > engine.INSTABILITY_THRESHOLD and avg_ob > engine.INSTABILITY_THRESHOLD:
+                    first_seen = next(b.links[link_id].first for b in self._ordered_buckets() if link_id in b.links)
+                    patterns.append(engine._antenna_pattern(
+                        site_id, link_id, avg_ib, avg_ob, totals.count, first_seen
+                    ))
+
+            correlation_score = engine._correlation_score(len(unstable), combined.stdev())
+            recommendations = engine._generate_antenna_recommendations(
+                len(unstable),
+                len(site_links),
+                correlation_score,
+                patterns
+            )
+
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='hub_antenna',
+            scope_id=site_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=self.window_hours,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+
+    def analyze_satellite(self, satellite_name: str, now: Optional[datetime] = None) -> CorrelationAnalysis:
+        """Satellite analysis (see CorrelationEngine.analyze_satellite_degradation)."""
+        engine = self.engine
+        analysis_id = f"SAT_{satellite_name}_{uuid.uuid4().hex[:8]}"
+
+        with self._lock:
+            self._expire(now)
+            # Same substring match as the satellite index
+            needle = normalize_satellite(satellite_name)
+            names = [name for name in self._satellite_masks if needle in normalize_satellite(name)]
+            if not names:
+                logger.info(f"No links found for satellite {satellite_name}")
+                return engine._empty_analysis(
+                    analysis_id, 'satellite', 0, self.window_hours,
+                    'No matching satellite links found'
+                )
+
+            combined = GradeStats()
+            mask = 0
+            for name in names:
+                mask |= self._satellite_masks[name]
+                if name in self._satellite_totals:
+                    combined.merge(self._satellite_totals[name])
+            if not combined.count:
+                return engine._empty_analysis(
+                    analysis_id, 'satellite', 0, self.window_hours,
+                    'No degradation detected on this satellite'
+                )
+
+            links = self._degraded_links(mask)
+            patterns = []
+            if len(links) >= engine.MIN_DEVICES_FOR_PATTERN:
+                first_seen = min(
+                    stats.first
+                    for bucket in self._ordered_buckets()
+                    for name, stats in bucket.satellites.items() if name in names
+                )
+                patterns.append(engine._satellite_pattern(
+                    satellite_name,
+                    links,
+                    combined.mean,
+                    combined.congestion_sum / combined.count,
+                    combined.count,
+                    first_seen
+                ))
+
+            correlation_score = engine._correlation_score(len(links), combined.stdev())
+            recommendations = engine._generate_satellite_recommendations(
+                len(links),
+                correlation_score,
+                patterns
+            )
+
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='satellite',
+            scope_id=0,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=self.window_hours,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+
+    def analyze_link_bidirectional(self, link_id: int, now: Optional[datetime] = None) -> CorrelationAnalysis:
+        """Bidirectional analysis (see CorrelationEngine.analyze_link_bidirectional_degradation)."""
+        engine = self.engine
+        analysis_id = f"LINK_{link_id}_{uuid.uuid4().hex[:8]}"
+
+        with self._lock:
+            self._expire(now)
+            totals = self._link_totals.get(link_id)
+            if totals is None:
+                return engine._empty_analysis(
+                    analysis_id, 'link', link_id, self.window_hours,
+                    'Insufficient data for analysis'
+                )
+
+            events = sorted(
+                event for bucket in self._buckets.values() for event in bucket.bidirectional.get(link_id, ())
+            )
+            if not events:
+                return engine._empty_analysis(
+                    analysis_id, 'link', link_id, self.window_hours,
+                    'No bidirectional degradation detected'
+                )
+
+            patterns = [
+                engine._bidirectional_pattern(link_id, ib_degradation, ob_degradation, grade, timestamp)
+                for timestamp, ib_degradation, ob_degradation, grade in events
+            ]
+            correlation_score = totals.bidirectional / totals.count
+            recommendations = engine._generate_bidirectional_recommendations(patterns, correlation_score)
+
+        return CorrelationAnalysis(
+            analysis_id=analysis_id,
+            scope='link',
+            scope_id=link_id,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=self.window_hours,
+            patterns_found=patterns,
+            correlation_score=correlation_score,
+            recommendations=recommendations
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Window size and sync position."""
+        with self._lock:
+            return {
+                "window_hours": self.window_hours,
+                "window_start": self._window_start.isoformat() if self._buckets else None,
+                "hours_buffered": len(self._buckets),
+                "links_known": len(self._links),
+                "links_in_window": len(self._link_totals),
+                "grades_in_window": sum(stats.count for stats in self._link_totals.values()),
+                **self._watermark.get_stats(),
+                "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None,
+                "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            }
+
+
+# Global correlation window
+correlation_window = CorrelationWindow()
+
+
+def get_correlation_window() -> CorrelationWindow:
+    """Get the global correlation window."""
+    return correlation_window
@@ -23,11 +23,14 @@ import os
 import json
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple, Set
-import pandas as pd
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple, Set
 from collections import defaultdict
 
+if TYPE_CHECKING:
+    # pandas is imported on first data load, not at module import (API startup)
+    import pandas as pd
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -69,8 +72,8 @@ class DataLoader:
             raise FileNotFoundError(f"kpis directory not found: {self.kpis_dir}")
         
         # Lazy-loaded cache
-        self._entities_df: Optional[pd.DataFrame] = None
-        self._site_grades_df: Optional[pd.DataFrame] = None
+        self._entities_df: Optional['pd.DataFrame'] = None
+        self._site_grades_df: Optional['pd.DataFrame'] = None
         self._kpi_cache: Dict[int, List[Dict[str, Any]]] = {}
         
         # Indexed caches for fast lookups
@@ -84,17 +87,19 @@ class DataLoader:
 
     # ==================== Lazy Loaders ====================
 
-    def _load_entities(self) -> pd.DataFrame:
+    def _load_entities(self) -> 'pd.DataFrame':
         """Load Entities.csv (lazy loading)."""
         if self._entities_df is None:
+            import pandas as pd
             logger.info("Loading Entities.csv...")
             self._entities_df = pd.read_csv(self.entities_file)
             logger.info(f"Loaded {len(self._entities_df)} entity records")
         return self._entities_df
 
-    def _load_site_grades(self) -> pd.DataFrame:
+    def _load_site_grades(self) -> 'pd.DataFrame':
         """Load site_grades.csv (lazy loading)."""
         if self._site_grades_df is None:
+            import pandas as pd
             logger.info("Loading site_grades.csv...")
             self._site_grades_df = pd.read_csv(self.site_grades_file)
             # Parse timestamp column
@@ -102,6 +107,54 @@ class DataLoader:
             logger.info(f"Loaded {len(self._site_grades_df)} site grade records")
         return self._site_grades_df
 
+    # ==================== Indexes ====================
+
+    _CUSTOMER_COLUMNS = ['customerid', 'customername']
+    _NETWORK_COLUMNS = ['customerid', 'networkid', 'networkname', 'networktype']
+    _SITE_COLUMNS = ['siteid', 'sitename', 'sitetype', 'sitecountry', 'sitecity', 'sitelatitude', 'sitelongitude']
+    _LINK_COLUMNS = ['linkid', 'linkname', 'linktype']
+    _DEVICE_COLUMNS = ['deviceid', 'deviceapi', 'deviceapiid', 'devicesource']
+
+    @staticmethod
+    def _build_index(df: 'pd.DataFrame', id_column: str, columns: List[str]) -> Dict[int, Dict[str, Any]]:
+        """Map each ID to its first row (same shape as the get_* lookups)."""
+        rows = df[columns].drop_duplicates(subset=[id_column]).to_dict('records')
+        return {row[id_column]: row for row in rows}
+
+    def build_indexes(self) -> Dict[str, int]:
+        """
+        Load the CSV files and build the ID lookup indexes.
+
+        Called during startup warm-up so the first requests do not pay for
+        CSV parsing; single-entity lookups then become dict reads.
+
+        Returns:
+            Dict with the number of entries in each index
+        """
+        df = self._load_entities()
+        self._load_site_grades()
+
+        self._customer_index = self._build_index(df, 'customerid', self._CUSTOMER_COLUMNS)
+        self._network_index = self._build_index(df, 'networkid', self._NETWORK_COLUMNS)
+        self._site_index = self._build_index(df, 'siteid', self._SITE_COLUMNS)
+        self._link_index = self._build_index(df, 'linkid', self._LINK_COLUMNS)
+        self._device_index = self._build_index(df, 'deviceid', self._DEVICE_COLUMNS)
+
+        counts = {
+            'customers': len(self._customer_index),
+            'networks': len(self._network_index),
+            'sites': len(self._site_index),
+            'links': len(self._link_index),
+            'devices': len(self._device_index),
+        }
+        logger.info(f"DataLoader indexes built: {counts}")
+        return counts
+
+    @staticmethod
+    def _lookup(index: Dict[int, Dict[str, Any]], entity_id: int) -> Optional[Dict[str, Any]]:
+        row = index.get(entity_id)
+        return dict(row) if row is not None else None
+
     # ==================== Customer Data ====================
 
     def get_all_customers(self) -> List[Dict[str, Any]]:
@@ -125,6 +178,8 @@ class DataLoader:
         Returns:
             Dict with customer info or None if not found
         """
+        if self._customer_index is not None:
+            return self._lookup(self._customer_index, customer_id)
         df = self._load_entities()
         customer_rows = df[df['customerid'] == customer_id][['customerid', 'customername']].drop_duplicates()
         if len(customer_rows) > 0:
@@ -159,6 +214,8 @@ class DataLoader:
         Returns:
             Dict with network info or None if not found
         """
+        if self._network_index is not None:
+            return self._lookup(self._network_index, network_id)
         df = self._load_entities()
         network_rows = df[df['networkid'] == network_id][
             ['customerid', 'networkid', 'networkname', 'networktype']
@@ -185,6 +242,16 @@ class DataLoader:
         ].drop_duplicates().to_dict('records')
         return sites
 
+    def get_site_locations(self) -> 'pd.DataFrame':
+        """
+        Get the coordinates of every site.
+        
+        Returns:
+            DataFrame with one row per site: siteid, sitelatitude, sitelongitude
+        """
+        df = self._load_entities()
+        return df[['siteid', 'sitelatitude', 'sitelongitude']].drop_duplicates(subset=['siteid'])
+
     def get_site(self, site_id: int) -> Optional[Dict[str, Any]]:
         """
         Get site details by ID.
@@ -195,6 +262,8 @@ class DataLoader:
         Returns:
             Dict with site info or None if not found
         """
+        if self._site_index is not None:
+            return self._lookup(self._site_index, site_id)
         df = self._load_entities()
         site_rows = df[df['siteid'] == site_id][
             ['siteid', 'sitename', 'sitetype', 'sitecountry', 'sitecity', 'sitelatitude', 'sitelongitude']
@@ -247,6 +316,8 @@ class DataLoader:
         Returns:
             Dict with link info or None if not found
         """
+        if self._link_index is not None:
+            return self._lookup(self._link_index, link_id)
         df = self._load_entities()
         link_rows = df[df['linkid'] == link_id][
             ['linkid', 'linkname', 'linktype']
@@ -299,6 +370,8 @@ class DataLoader:
         Returns:
             Dict with device info or None if not found
         """
+        if self._device_index is not None:
+            return self._lookup(self._device_index, device_id)
         df = self._load_entities()
         device_rows = df[df['deviceid'] == device_id][
             ['deviceid', 'deviceapi', 'deviceapiid', 'devicesource']
@@ -340,6 +413,8 @@ class DataLoader:
             ib_degradation, ob_degradation, ib_instability, ob_instability, 
             up_time, status, performance, congestion, latency, grade (1-10)
         """
+        import pandas as pd
+
         df = self._load_site_grades()
         grades = df[df['link_id'] == link_id].copy()
         
@@ -369,7 +444,7 @@ class DataLoader:
             return grades.iloc[0].to_dict()
         return None
 
-    def get_site_grades_by_customer(self, customer_id: int) -> pd.DataFrame:
+    def get_site_grades_by_customer(self, customer_id: int) -> 'pd.DataFrame':
         """
         Get all grades for a customer's links.
         
@@ -506,7 +581,7 @@ class DataLoader:
             'devices': self.get_devices_by_link(link_id),
             'latest_grade': self.get_latest_grade(link_id),
             'grades_30days': self.get_link_grades(link_id, 
-                                                  start_date=(datetime.now() - pd.Timedelta(days=30)).strftime('%Y-%m-%d'))
+                                                  start_date=(datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
         }
 
     def get_network_performance_summary(self, network_id: int) -> Dict[str, Any]:
@@ -543,7 +618,7 @@ class DataLoader:
 
     # ==================== Bulk Operations ====================
 
-    def export_customer_data_for_ml(self, customer_id: int) -> pd.DataFrame:
+    def export_customer_data_for_ml(self, customer_id: int) -> 'pd.DataFrame':
         """
         Export all data for a customer ready for ML processing.
         
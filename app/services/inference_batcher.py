@@ -0,0 +1,193 @@
+"""
+Dynamic micro-batching of concurrent inference requests.
+
+Concurrent handlers scoring against the same pre-trained model submit their
+feature matrices to a per-model queue. The queue waits a few milliseconds (or
+until enough rows are pending), stacks everything into one matrix, scores it
+with a single vectorized call off the event loop and fans the results back
+out to the awaiting handlers.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ScoreFn = Callable[[np.ndarray], np.ndarray]
+
+
+class InferenceBatcher:
+    """
+    Collects inference requests for one model and scores them in batches.
+
+    Must be used from a single asyncio event loop.
+    """
+
+    def __init__(self, score_fn: ScoreFn, max_wait_ms: float = 5.0, max_batch_rows: int = 4096):
+        """
+        Initialize batcher.
+
+        Args:
+            score_fn: Vectorized scoring function (e.g. model.predict)
+            max_wait_ms: Maximum time the first queued request waits for company
+            max_batch_rows: Flush as soon as this many rows are pending
+        """
+        self.score_fn = score_fn
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_rows = max_batch_rows
+        self._pending: List[Tuple[np.ndarray, asyncio.Future, float]] = []
+        self._pending_rows = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Monitoring counters
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.max_queue_wait_ms = 0.0
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        """
+        Queue a feature matrix for scoring and wait for its results.
+
+        Args:
+            X: 2-D feature matrix for this request
+
+        Returns:
+            Scores/predictions for the rows of X, in order
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((X, future, time.perf_counter()))
+        self._pending_rows += len(X)
+
+        if self._pending_rows >= self.max_batch_rows:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def rebind(self, score_fn: ScoreFn) -> None:
+        """
+        Switch to a new scoring function (e.g. after a model reload).
+
+        Requests already queued are flushed against the previous function.
+        """
+        if self._pending:
+            self._flush()
+        self.score_fn = score_fn
+
+    def _flush(self) -> None:
+        """Take the pending requests and score them as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        self._pending_rows = 0
+        asyncio.get_running_loop().create_task(self._run_batch(batch, self.score_fn))
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]], score_fn: ScoreFn) -> None:
+        started = time.perf_counter()
+        self.batches += 1
+        self.requests += len(batch)
+        self.max_queue_wait_ms = max(
+            self.max_queue_wait_ms,
+            max((started - queued_at) * 1000.0 for _, _, queued_at in batch)
+        )
+
+        try:
+            stacked = np.vstack([X for X, _, _ in batch])
+            self.rows += len(stacked)
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, score_fn, stacked)
+        except Exception as e:
+            logger.error(f"Batched inference failed: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for X, future, _ in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(X)])
+            offset += len(X)
+
+    def get_stats(self) -> Dict:
+        """
+        Get batcher statistics for monitoring.
+
+        Returns:
+            Dictionary with batch counts and queue wait
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "rows": self.rows,
+            "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+            "max_queue_wait_ms": self.max_queue_wait_ms,
+            "pending_rows": self._pending_rows,
+            "max_wait_ms": self.max_wait_ms,
+            "max_batch_rows": self.max_batch_rows,
+        }
+
+
+class InferenceBatcherRegistry:
+    """One InferenceBatcher per model key."""
+
+    def __init__(self, max_wait_ms: float = 5.0, max_batch_rows: int = 4096):
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_rows = max_batch_rows
+        self._batchers: Dict[str, InferenceBatcher] = {}
+
+    def get(self, model_key: str, score_fn: ScoreFn) -> InferenceBatcher:
+        """
+        Get the batcher for a model, creating it on first use.
+
+        Args:
+            model_key: Stable model identifier (e.g. model name)
+            score_fn: Current scoring function for that model
+
+        Returns:
+            InferenceBatcher bound to score_fn
+        """
+        batcher = self._batchers.get(model_key)
+        if batcher is None:
+            batcher = InferenceBatcher(score_fn, self.max_wait_ms, self.max_batch_rows)
+            self._batchers[model_key] = batcher
+        elif batcher.score_fn != score_fn:
+            batcher.rebind(score_fn)
+        return batcher
+
+    def configure(self, max_wait_ms: float, max_batch_rows: int) -> None:
+        """Update batching limits for new and existing batchers."""
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_rows = max_batch_rows
+        for batcher in self._batchers.values():
+            batcher.max_wait_ms = max_wait_ms
+            batcher.max_batch_rows = max_batch_rows
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get statistics for every model batcher."""
+        return {key: batcher.get_stats() for key, batcher in self._batchers.items()}
+
+
+# Global batcher registry
+inference_batchers = InferenceBatcherRegistry()
+
+
+def get_inference_batchers() -> InferenceBatcherRegistry:
+    """Get the global inference batcher registry."""
+    return inference_batchers
@@ -0,0 +1,445 @@
+"""
+Pairwise Link Correlation for BCom Offshore Network Analysis
+
+Aligns each link's grades (or one IB/OB metric) onto a common hourly grid and
+computes the Pearson or Spearman correlation of every pair of links, using
+only the hours both links reported. Links whose series move together strongly
+are grouped into clusters, which point at shared causes that the scope-based
+detectors in correlation_engine cannot see.
+
+The matrix is computed in row blocks sized to a memory budget, so thousands
+of links can be correlated without materializing more than one block of the
+intermediate sums at a time.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import GradeColumns, grade_query
+from app.services.topology_index import get_topology_index
+
+logger = logging.getLogger(__name__)
+
+GRID_METRICS = ('grade',) + GradeColumns.METRICS
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+# float64 (block x links) intermediates alive per block row
+_BLOCK_INTERMEDIATES = 8
+
+
+# ==================== DATA CLASSES ====================
+
+@dataclass
+class HourlyGrid:
+    """One metric of many links aligned on a common hourly axis."""
+
+    link_ids: np.ndarray  # (n_links,) int64, sorted
+    hours: np.ndarray     # (n_hours,) datetime64[h]
+    values: np.ndarray    # (n_links, n_hours) float64, NaN where a link has no data
+    metric: str
+
+    @classmethod
+    def from_columns(
+        cls,
+        grades: GradeColumns,
+        metric: str = 'grade',
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> 'HourlyGrid':
+        """
+        Average a metric per link and hour.
+
+        Args:
+            grades: Grade columns to align
+            metric: Column to align ('grade' or one of GradeColumns.METRICS)
+            start: First hour of the grid, defaults to the earliest grade
+            end: Last hour of the grid, defaults to the latest grade
+
+        Returns:
+            HourlyGrid covering every hour from start to end
+        """
+        if metric not in GRID_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {GRID_METRICS}")
+
+        stamps = grades.timestamp.astype('datetime64[h]')
+        first = np.datetime64(start, 'h') if start is not None else (stamps.min() if len(stamps) else None)
+        last = np.datetime64(end, 'h') if end is not None else (stamps.max() if len(stamps) else None)
+        if first is None or last < first:
+            return cls(np.empty(0, np.int64), np.empty(0, 'datetime64[h]'), np.empty((0, 0)), metric)
+
+        in_range = (stamps >= first) & (stamps <= last)
+        links, link_index = np.unique(grades.link_id[in_range], return_inverse=True)
+        hour_index = (stamps[in_range] - first).astype(np.int64)
+        n_hours = int((last - first).astype(np.int64)) + 1
+
+        # Flat (link, hour) cell index -> mean of the grades in that cell
+        cells = link_index * n_hours + hour_index
+        size = len(links) * n_hours
+        counts = np.bincount(cells, minlength=size)
+        sums = np.bincount(cells, weights=getattr(grades, metric)[in_range], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(counts > 0, sums / counts, np.nan)
+
+        return cls(
+            link_ids=links,
+            hours=first + np.arange(n_hours),
+            values=values.reshape(len(links), n_hours),
+            metric=metric
+        )
+
+    @property
+    def coverage(self) -> np.ndarray:
+        """Fraction of hours with data, per link."""
+        if not self.values.size:
+            return np.zeros(len(self.link_ids))
+        return np.mean(~np.isnan(self.values), axis=1)
+
+
+@dataclass
+class LinkCorrelationResult:
+    """Pairwise link correlation result."""
+
+    analysis_id: str
+    scope: str  # 'network', 'links', 'fleet'
+    scope_id: Optional[int]
+    metric: str
+    method: str
+    timestamp: datetime
+    hours_analyzed: int
+    link_ids: List[int]
+    clusters: List[Dict]
+    strong_pairs: int
+    matrix: Optional[List[List[Optional[float]]]] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'analysis_id': self.analysis_id,
+            'scope': self.scope,
+            'scope_id': self.scope_id,
+            'metric': self.metric,
+            'method': self.method,
+            'timestamp': self.timestamp.isoformat() if isinstance(self.timestamp, datetime) else self.timestamp,
+            'hours_analyzed': self.hours_analyzed,
+            'link_ids': self.link_ids,
+            'clusters': self.clusters,
+            'strong_pairs': self.strong_pairs,
+            'matrix': self.matrix,
+        }
+
+
+# ==================== MATRIX COMPUTATION ====================
+
+def _prepare(values: np.ndarray, method: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Center (and for Spearman, rank) each row, then split values and mask.
+
+    Pearson is invariant to shifting a series, so centering each link on its
+    own mean only improves the numerical conditioning of the sums below.
+    Spearman ranks each link over the hours it reported.
+
+    Returns:
+        Tuple of (values with missing hours set to 0, float validity mask)
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {CORRELATION_METHODS}")
+
+    if method == 'spearman':
+        from scipy.stats import rankdata
+        values = rankdata(values, axis=1, nan_policy='omit')
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    means = filled.sum(axis=1, keepdims=True) / np.maximum(valid.sum(axis=1, keepdims=True), 1)
+    return np.where(valid, filled - means, 0.0), valid.astype(np.float64)
+
+
+def block_rows(n_links: int, n_hours: int, memory_budget_mb: float) -> int:
+    """
+    Number of matrix rows per block that fit the memory budget.
+
+    Args:
+        n_links: Number of links (matrix columns)
+        n_hours: Number of hours on the grid
+        memory_budget_mb: Budget for the per-block intermediates
+
+    Returns:
+        Rows per block, at least 1
+    """
+    bytes_per_row = 8 * (_BLOCK_INTERMEDIATES * n_links + 3 * n_hours)
+    return max(1, int(memory_budget_mb * 1024 * 1024) // max(bytes_per_row, 1))
+
+
+def iter_correlation_blocks(
+    values: np.ndarray,
+    method: str = 'pearson',
+    min_overlap: int = 12,
+    memory_budget_mb: float = 64
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield the correlation matrix in row blocks.
+
+    Each pair is correlated over the hours both links reported, computed for
+    a whole block at once from masked sums (counts, sums, sums of squares and
+    cross products are all matrix products). Pairs with fewer than
+    min_overlap shared hours or a constant series are NaN.
+
+    Args:
+        values: (n_links, n_hours) matrix with NaN for missing hours
+        method: 'pearson' or 'spearman'
+        min_overlap: Minimum shared hours for a correlation to be reported
+        memory_budget_mb: Budget for the per-block intermediates
+
+    Yields:
+        Tuples of (first row index, (rows, n_links) correlation block)
+    """
+    X, M = _prepare(values, method)
+    X2 = X * X
+    n_links, n_hours = values.shape
+    step = block_rows(n_links, n_hours, memory_budget_mb)
+
+    for start in range(0, n_links, step):
+        stop = min(start + step, n_links)
+        Xb, Mb, X2b = X[start:stop], M[start:stop], X2[start:stop]
+
+        n = Mb @ M.T            # shared hours
+        sx = Xb @ M.T           # sum of x_i over the shared hours
+        sy = Mb @ X.T           # sum of x_j over the shared hours
+        sxx = X2b @ M.T
+        syy = Mb @ X2.T
+        cov = n * (Xb @ X.T) - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = cov / np.sqrt(var_x * var_y)
+        # A series constant over the shared hours leaves only rounding noise
+        degenerate = (n < min_overlap) | (var_x <= 1e-10 * n * sxx) | (var_y <= 1e-10 * n * syy)
+        r[degenerate] = np.nan
+        yield start, np.clip(r, -1.0, 1.0, out=r)
+
+
+def correlation_matrix(
+    values: np.ndarray,
+    method: str = 'pearson',
+    min_overlap: int = 12,
+    memory_budget_mb: float = 64
+) -> np.ndarray:
+    """
+    Full (n_links, n_links) correlation matrix (float32).
+
+    Args:
+        values: (n_links, n_hours) matrix with NaN for missing hours
+        method: 'pearson' or 'spearman'
+        min_overlap: Minimum shared hours for a correlation to be reported
+        memory_budget_mb: Budget for the per-block intermediates
+
+    Returns:
+        Symmetric matrix with NaN where a pair could not be correlated
+    """
+    n_links = values.shape[0]
+    matrix = np.empty((n_links, n_links), dtype=np.float32)
+    for start, block in iter_correlation_blocks(values, method, min_overlap, memory_budget_mb):
+        matrix[start:start + len(block)] = block
+    return matrix
+
+
+def strong_pairs(
+    values: np.ndarray,
+    threshold: float = 0.8,
+    method: str = 'pearson',
+    min_overlap: int = 12,
+    memory_budget_mb: float = 64
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs (i < j) correlating at or above a threshold, without keeping the matrix.
+
+    Args:
+        values: (n_links, n_hours) matrix with NaN for missing hours
+        threshold: Minimum correlation of a strong pair
+        method: 'pearson' or 'spearman'
+        min_overlap: Minimum shared hours for a correlation to be reported
+        memory_budget_mb: Budget for the per-block intermediates
+
+    Returns:
+        Tuple of (row indices, column indices, correlations)
+    """
+    rows, cols, scores = [], [], []
+    for start, block in iter_correlation_blocks(values, method, min_overlap, memory_budget_mb):
+        i, j = np.nonzero(block >= threshold)
+        i = i + start
+        upper = j > i
+        rows.append(i[upper])
+        cols.append(j[upper])
+        scores.append(block[i[upper] - start, j[upper]])
+
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+
+
+def cluster_pairs(n_links: int, rows: np.ndarray, cols: np.ndarray) -> List[np.ndarray]:
+    """
+    Connected components of the strong-pair graph.
+
+    Args:
+        n_links: Number of links
+        rows: Row index of each strong pair
+        cols: Column index of each strong pair
+
+    Returns:
+        Index arrays of every component with two or more links, largest first
+    """
+    if not len(rows):
+        return []
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_links, n_links))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    order = np.argsort(labels, kind='stable')
+    groups = np.split(order, np.cumsum(sizes)[:-1])
+    return sorted((g for g in groups if len(g) >= 2), key=len, reverse=True)
+
+
+# ==================== ENGINE ====================
+
+class LinkCorrelationEngine:
+    """Correlates link time series and extracts co-moving clusters."""
+
+    # Matrices larger than this are only summarized as clusters by default
+    MAX_MATRIX_LINKS = 200
+    # Matrices larger than this are never returned (n^2 values as JSON)
+    MATRIX_LINK_LIMIT = 1000
+
+    def __init__(self, memory_budget_mb: float = 64):
+        """
+        Initialize engine.
+
+        Args:
+            memory_budget_mb: Budget for the per-block intermediates
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memory_budget_mb = memory_budget_mb
+
+    def load_grid(
+        self,
+        db: Session,
+        hours_lookback: int = 168,
+        metric: str = 'grade',
+        network_id: Optional[int] = None,
+        link_ids: Optional[Sequence[int]] = None
+    ) -> HourlyGrid:
+        """
+        Fetch grades in one query and align them on an hourly grid.
+
+        Args:
+            db: Database session
+            hours_lookback: Hours of history to correlate
+            metric: Metric to correlate
+            network_id: Restrict to one network
+            link_ids: Restrict to these links
+
+        Returns:
+            HourlyGrid ending at the current hour
+        """
+        from app.models.bcom_models import SiteGrade
+
+        end = datetime.utcnow()
+        start = end - timedelta(hours=hours_lookback)
+        query = grade_query(db).filter(SiteGrade.timestamp >= start)
+        if network_id is not None:
+            network_links = get_topology_index().get(db).links_under('network', network_id)
+            query = query.filter(SiteGrade.link_id.in_(network_links.tolist()))
+        if link_ids:
+            query = query.filter(SiteGrade.link_id.in_(list(link_ids)))
+
+        grades = GradeColumns.from_rows(query.all())
+        return HourlyGrid.from_columns(grades, metric, start=start, end=end)
+
+    def analyze(
+        self,
+        grid: HourlyGrid,
+        method: str = 'pearson',
+        threshold: float = 0.8,
+        min_overlap: int = 12,
+        include_matrix: Optional[bool] = None,
+        scope: str = 'fleet',
+        scope_id: Optional[int] = None
+    ) -> LinkCorrelationResult:
+        """
+        Correlate every pair of links on a grid and cluster the strong pairs.
+
+        Args:
+            grid: Aligned link series
+            method: 'pearson' or 'spearman'
+            threshold: Minimum correlation for two links to be clustered
+            min_overlap: Minimum shared hours for a correlation to count
+            include_matrix: Return the full matrix; by default only up to MAX_MATRIX_LINKS
+            scope: Scope label for the result
+            scope_id: Scope ID for the result
+
+        Returns:
+            LinkCorrelationResult with clusters (and optionally the matrix)
+
+        Raises:
+            ValueError: If the matrix is requested for more than MATRIX_LINK_LIMIT links
+        """
+        import uuid
+
+        n_links = len(grid.link_ids)
+        if include_matrix is None:
+            include_matrix = n_links <= self.MAX_MATRIX_LINKS
+        elif include_matrix and n_links > self.MATRIX_LINK_LIMIT:
+            raise ValueError(
+                f"The matrix of {n_links} links is too large to return "
+                f"(limit {self.MATRIX_LINK_LIMIT}); narrow the links or omit include_matrix"
+            )
+
+        matrix = None
+        if include_matrix:
+            full = correlation_matrix(grid.values, method, min_overlap, self.memory_budget_mb)
+            upper = np.triu(full >= threshold, k=1)
+            rows, cols = np.nonzero(upper)
+            scores = full[rows, cols].astype(np.float64)
+            matrix = [
+                [None if np.isnan(v) else round(float(v), 4) for v in row]
+                for row in full
+            ]
+        else:
+            rows, cols, scores = strong_pairs(grid.values, threshold, method, min_overlap, self.memory_budget_mb)
+
+        clusters = []
+        for members in cluster_pairs(n_links, rows, cols):
+            in_cluster = np.isin(rows, members) & np.isin(cols, members)
+            clusters.append({
+                'link_ids': grid.link_ids[members].tolist(),
+                'size': len(members),
+                'mean_correlation': round(float(scores[in_cluster].mean()), 4),
+                'min_correlation': round(float(scores[in_cluster].min()), 4),
+            })
+
+        self.logger.info(
+            f"Correlated {n_links} links over {len(grid.hours)} hours ({method}): "
+            f"{len(rows)} strong pairs, {len(clusters)} clusters"
+        )
+
+        return LinkCorrelationResult(
+            analysis_id=f"LINKCORR_{uuid.uuid4().hex[:8]}",
+            scope=scope,
+            scope_id=scope_id,
+            metric=grid.metric,
+            method=method,
+            timestamp=datetime.utcnow(),
+            hours_analyzed=len(grid.hours),
+            link_ids=grid.link_ids.tolist(),
+            clusters=clusters,
+            strong_pairs=len(rows),
+            matrix=matrix
+        )
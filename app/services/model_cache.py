@@ -1,13 +1,40 @@
 """
 ML Model caching module for efficient anomaly detection.
 Caches trained models to avoid retraining on each request.
+
+Entries are kept in an OrderedDict in least-recently-used order, with a
+second OrderedDict in expiry order, so lookups, LRU eviction and TTL cleanup
+all run in constant (amortized) time regardless of cache size. The cache is
+bounded both by entry count and by an estimated byte budget.
+
+An optional disk tier (see model_disk_cache) persists fitted detectors as
+joblib files, written in the background; memory misses fall through to it,
+so other workers on one host and restarted workers load a model instead of
+retraining it.
+
+A background task (run_cache_maintenance) sweeps expired entries and
+retrains hot entries shortly before their TTL runs out, so traffic does not
+hit a cold retrain when a popular model expires. "Hot" counts hits since the
+entry was stored or last refreshed, so entries that stop being used expire.
+Deterministic entries (models fully determined by their key, such as
+detectors keyed by a payload hash) are not retrained: a refresh only extends
+their expiry, and their factory is not kept after the first fit.
 """
 
+import asyncio
 import logging
-from typing import Dict, Optional
+import pickle
+import sys
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import threading
-from app.services.anomaly_detector import AnomalyDetector
+from app.services.single_flight import SingleFlight
+from app.services.model_disk_cache import DiskModelStore
+
+if TYPE_CHECKING:
+    # Type-only: importing the detector pulls in sklearn/pandas/polars
+    from app.services.anomaly_detector import AnomalyDetector
 
 logger = logging.getLogger(__name__)
 
@@ -18,18 +45,77 @@ class ModelCache:
     Prevents retraining models for similar data patterns.
     """
 
-    def __init__(self, ttl_minutes: int = 60, max_cache_size: int = 10):
+    def __init__(
+        self,
+        ttl_minutes: int = 60,
+        max_cache_size: int = 10,
+        max_bytes: Optional[int] = None,
+        disk_dir: Optional[str] = None
+    ):
         """
         Initialize model cache.
 
         Args:
             ttl_minutes: Time-to-live for cached models in minutes
             max_cache_size: Maximum number of models to cache
+            max_bytes: Maximum estimated size of all cached models (None = unbounded)
+            disk_dir: Directory for the on-disk tier (None = memory only)
         """
         self.ttl_minutes = ttl_minutes
         self.max_cache_size = max_cache_size
-        self._cache: Dict[str, Dict] = {}
+        self.max_bytes = max_bytes
+        # Entries in LRU order (least recently used first)
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        # Keys in expiry order; the TTL is fixed, so insertion order is expiry order
+        self._expiry: "OrderedDict[str, datetime]" = OrderedDict()
+        self._total_bytes = 0
         self._lock = threading.RLock()  # Thread-safe cache operations
+        # Deduplicates concurrent misses so only one caller trains per key
+        self._single_flight = SingleFlight()
+        self._disk: Optional[DiskModelStore] = None
+        if disk_dir:
+            self.enable_disk_tier(disk_dir)
+
+    def enable_disk_tier(self, directory: str) -> None:
+        """
+        Enable the on-disk second tier.
+
+        Args:
+            directory: Directory for memory-mappable model files
+        """
+        self._disk = DiskModelStore(directory, ttl_minutes=self.ttl_minutes)
+        logger.info(f"Model cache disk tier enabled at {directory}")
+
+    @staticmethod
+    def _estimate_size(model: Any) -> int:
+        """
+        Estimate the in-memory size of a model from its pickled size.
+
+        Fitted detectors are dominated by numpy arrays, whose pickled size
+        closely tracks their memory footprint.
+        """
+        try:
+            return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(model)
+
+    def _remove(self, cache_key: str) -> None:
+        """Remove an entry from both indexes (caller holds the lock)."""
+        item = self._cache.pop(cache_key, None)
+        if item is not None:
+            self._total_bytes -= item["size_bytes"]
+        self._expiry.pop(cache_key, None)
+
+    def _purge_expired(self, now: datetime) -> int:
+        """Drop expired entries from the front of the expiry index."""
+        removed = 0
+        while self._expiry:
+            cache_key, expires_at = next(iter(self._expiry.items()))
+            if now <= expires_at:
+                break
+            self._remove(cache_key)
+            removed += 1
+        return removed
 
     def _generate_cache_key(self, anomaly_type: str, feature_count: int, data_size: int) -> str:
         """
@@ -45,7 +131,7 @@ class ModelCache:
         """
         return f"{anomaly_type}_{feature_count}_{data_size}"
 
-    def get(self, anomaly_type: str, feature_count: int, data_size: int) -> Optional[AnomalyDetector]:
+    def get(self, anomaly_type: str, feature_count: int, data_size: int) -> Optional['AnomalyDetector']:
         """
         Retrieve a cached model if available and not expired.
 
@@ -57,32 +143,46 @@ class ModelCache:
         Returns:
             Cached AnomalyDetector instance or None
         """
-        with self._lock:
-            cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
+        cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
 
-            if cache_key not in self._cache:
-                logger.debug(f"Cache miss for key: {cache_key}")
-                return None
-
-            cached_item = self._cache[cache_key]
-
-            # Check if cache entry has expired
-            if datetime.utcnow() > cached_item["expires_at"]:
-                logger.info(f"Cache entry expired for key: {cache_key}")
-                del self._cache[cache_key]
-                return None
-
-            logger.debug(f"Cache hit for key: {cache_key}")
-            cached_item["hits"] += 1
-            cached_item["last_accessed"] = datetime.utcnow()
-            return cached_item["model"]
+        with self._lock:
+            cached_item = self._cache.get(cache_key)
+            if cached_item is not None:
+                # Check if cache entry has expired
+                now = datetime.utcnow()
+                if now > cached_item["expires_at"]:
+                    logger.info(f"Cache entry expired for key: {cache_key}")
+                    self._remove(cache_key)
+                else:
+                    logger.debug(f"Cache hit for key: {cache_key}")
+                    cached_item["hits"] += 1
+                    cached_item["last_accessed"] = now
+                    self._cache.move_to_end(cache_key)
+                    return cached_item["model"]
+
+        if self._disk is None:
+            logger.debug(f"Cache miss for key: {cache_key}")
+            return None
+
+        # Fall through to the disk tier and promote the memory-mapped model
+        loaded = self._disk.get(cache_key)
+        if loaded is None:
+            logger.debug(f"Cache miss for key: {cache_key}")
+            return None
+
+        model, size_bytes, created_ts = loaded
+        with self._lock:
+            self._store(cache_key, model, size_bytes, datetime.utcfromtimestamp(created_ts), hits=1)
+        return model
 
     def set(
         self,
         anomaly_type: str,
         feature_count: int,
         data_size: int,
-        model: AnomalyDetector
+        model: 'AnomalyDetector',
+        factory: Optional[Callable[[], 'AnomalyDetector']] = None,
+        deterministic: bool = False
     ) -> None:
         """
         Cache a trained model.
@@ -92,47 +192,269 @@ class ModelCache:
             feature_count: Number of features
             data_size: Size of data
             model: Trained AnomalyDetector instance
+            factory: Optional callable that retrains the model; entries with a
+                factory can be refreshed ahead of expiry
+            deterministic: The model is fully determined by the key; hot entries
+                have their expiry extended instead of being retrained
         """
+        cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
+        size_bytes = self._estimate_size(model)
+
         with self._lock:
-            cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
-
-            # Check cache size and evict if necessary
-            if len(self._cache) >= self.max_cache_size:
-                self._evict_least_used()
-
-            self._cache[cache_key] = {
-                "model": model,
-                "created_at": datetime.utcnow(),
-                "expires_at": datetime.utcnow() + timedelta(minutes=self.ttl_minutes),
-                "hits": 0,
-                "last_accessed": datetime.utcnow(),
-            }
-            logger.info(f"Model cached for key: {cache_key}")
+            self._store(
+                cache_key, model, size_bytes, datetime.utcnow(),
+                factory=factory, deterministic=deterministic
+            )
+
+        if self._disk is not None:
+            self._disk.set_in_background(cache_key, model)
+
+    def _store(
+        self,
+        cache_key: str,
+        model: Any,
+        size_bytes: int,
+        created_at: datetime,
+        hits: int = 0,
+        factory: Optional[Callable[[], 'AnomalyDetector']] = None,
+        deterministic: bool = False
+    ) -> None:
+        """Insert an entry into the memory tier (caller holds the lock)."""
+        self._remove(cache_key)
 
-    def _evict_least_used(self) -> None:
+        if self.max_bytes is not None and size_bytes > self.max_bytes:
+            logger.warning(
+                f"Model for key {cache_key} ({size_bytes} bytes) exceeds cache budget, not caching"
+            )
+            return
+
+        now = datetime.utcnow()
+        self._purge_expired(now)
+
+        # Evict least recently used entries until the new model fits
+        while self._cache and (
+            len(self._cache) >= self.max_cache_size
+            or (self.max_bytes is not None and self._total_bytes + size_bytes > self.max_bytes)
+        ):
+            self._evict_lru()
+
+        # Entries promoted from disk keep their original expiry, so they can
+        # sit slightly out of order in the expiry index; get() still checks
+        # every entry's own expires_at
+        expires_at = created_at + timedelta(minutes=self.ttl_minutes)
+        self._cache[cache_key] = {
+            "model": model,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "hits": hits,
+            "last_accessed": now,
+            "size_bytes": size_bytes,
+            "factory": factory,
+            "deterministic": deterministic,
+        }
+        self._expiry[cache_key] = expires_at
+        self._total_bytes += size_bytes
+        logger.info(f"Model cached for key: {cache_key} ({size_bytes} bytes)")
+
+    def get_or_create(
+        self,
+        anomaly_type: str,
+        feature_count: int,
+        data_size: int,
+        factory: Callable[[], 'AnomalyDetector'],
+        deterministic: bool = False
+    ) -> 'AnomalyDetector':
+        """
+        Return the cached model, training it with factory on a miss.
+
+        Concurrent misses for the same key share one factory call.
+
+        Args:
+            anomaly_type: Type of anomaly
+            feature_count: Number of features
+            data_size: Size of data
+            factory: Callable producing a trained AnomalyDetector
+            deterministic: The model is fully determined by the key; the factory
+                is only used for this miss and not kept for refreshes
+
+        Returns:
+            Cached or newly trained AnomalyDetector instance
+        """
+        cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
+        model = self.get(anomaly_type, feature_count, data_size)
+        if model is not None:
+            self._attach_factory(cache_key, factory, deterministic)
+            return model
+
+        return self._single_flight.do(
+            cache_key, self._create, anomaly_type, feature_count, data_size, factory, deterministic
+        )
+
+    async def get_or_create_async(
+        self,
+        anomaly_type: str,
+        feature_count: int,
+        data_size: int,
+        factory: Callable[[], 'AnomalyDetector'],
+        deterministic: bool = False
+    ) -> 'AnomalyDetector':
+        """
+        Async variant of get_or_create; the factory runs off the event loop.
+        """
+        cache_key = self._generate_cache_key(anomaly_type, feature_count, data_size)
+        model = self.get(anomaly_type, feature_count, data_size)
+        if model is not None:
+            self._attach_factory(cache_key, factory, deterministic)
+            return model
+
+        return await self._single_flight.do_async(
+            cache_key, self._create, anomaly_type, feature_count, data_size, factory, deterministic
+        )
+
+    def _create(
+        self,
+        anomaly_type: str,
+        feature_count: int,
+        data_size: int,
+        factory: Callable[[], 'AnomalyDetector'],
+        deterministic: bool = False
+    ) -> 'AnomalyDetector':
+        # Another caller may have filled the entry between our miss and
+        # claiming the key
+        model = self.get(anomaly_type, feature_count, data_size)
+        if model is None:
+            model = factory()
+            self.set(
+                anomaly_type, feature_count, data_size, model,
+                factory=None if deterministic else factory, deterministic=deterministic
+            )
+        return model
+
+    def _attach_factory(
+        self,
+        cache_key: str,
+        factory: Callable[[], 'AnomalyDetector'],
+        deterministic: bool = False
+    ) -> None:
+        """Remember how to refresh an entry (e.g. one promoted from disk)."""
+        with self._lock:
+            item = self._cache.get(cache_key)
+            if item is None:
+                return
+            if deterministic:
+                item["deterministic"] = True
+            elif item["factory"] is None:
+                item["factory"] = factory
+
+    def _refresh_candidates(
+        self,
+        now: datetime,
+        refresh_ahead_minutes: float,
+        refresh_min_hits: int
+    ) -> List[Tuple[str, Dict]]:
+        """
+        Hot entries expiring within the refresh window (caller holds the lock).
+
+        Walks the expiry index from the front and stops at the first entry
+        outside the window, so the cost is proportional to the candidates.
+        """
+        horizon = now + timedelta(minutes=refresh_ahead_minutes)
+        candidates = []
+        for cache_key, expires_at in self._expiry.items():
+            if expires_at > horizon:
+                break
+            item = self._cache[cache_key]
+            refreshable = item["factory"] is not None or item["deterministic"]
+            if refreshable and item["hits"] >= refresh_min_hits:
+                candidates.append((cache_key, item))
+        return candidates
+
+    def _refresh(self, cache_key: str, item: Dict) -> None:
+        """
+        Give an entry a fresh TTL, retraining it unless it is deterministic.
+
+        Hits restart at zero, so the entry is only refreshed again if it
+        keeps being used.
+        """
+        if item["factory"] is None:
+            model, size_bytes = item["model"], item["size_bytes"]
+        else:
+            model = item["factory"]()
+            size_bytes = self._estimate_size(model)
+        with self._lock:
+            self._store(
+                cache_key, model, size_bytes, datetime.utcnow(),
+                factory=item["factory"], deterministic=item["deterministic"]
+            )
+        if self._disk is not None and item["factory"] is not None:
+            self._disk.set_in_background(cache_key, model)
+        logger.info(f"Refreshed cached model ahead of expiry: {cache_key}")
+
+    async def sweep(self, refresh_ahead_minutes: float = 5, refresh_min_hits: int = 3) -> Dict[str, int]:
+        """
+        Remove expired entries and refresh hot entries before they expire.
+
+        Retraining runs off the event loop and shares the single-flight
+        registry with request-path misses, so a refresh and a concurrent
+        miss never train the same key twice.
+
+        Args:
+            refresh_ahead_minutes: Refresh entries expiring within this window
+            refresh_min_hits: Minimum hits for an entry to count as hot
+
+        Returns:
+            Dictionary with counts of expired, refreshed and failed entries
+        """
+        expired = await asyncio.to_thread(self.cleanup_expired)
+
+        with self._lock:
+            candidates = self._refresh_candidates(
+                datetime.utcnow(), refresh_ahead_minutes, refresh_min_hits
+            )
+
+        refreshed = 0
+        failed = 0
+        for cache_key, item in candidates:
+            try:
+                await self._single_flight.do_async(cache_key, self._refresh, cache_key, item)
+                refreshed += 1
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to refresh cached model {cache_key}: {str(e)}")
+
+        return {"expired": expired, "refreshed": refreshed, "failed": failed}
+
+    def _evict_lru(self) -> None:
         """Evict the least recently used model from cache."""
         if not self._cache:
             return
 
-        # Find least recently used (by hits and access time)
-        least_used_key = min(
-            self._cache.keys(),
-            key=lambda k: (
-                self._cache[k]["hits"],
-                self._cache[k]["last_accessed"]
-            )
-        )
+        least_used_key = next(iter(self._cache))
+        self._remove(least_used_key)
+        logger.info(f"Evicted least recently used model: {least_used_key}")
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for pending disk tier writes.
 
-        del self._cache[least_used_key]
-        logger.info(f"Evicted least used model: {least_used_key}")
+        Args:
+            timeout: Maximum seconds to wait (None = until done)
+        """
+        if self._disk is not None:
+            self._disk.flush(timeout)
 
     def clear(self) -> None:
         """Clear all cached models."""
         with self._lock:
             size = len(self._cache)
             self._cache.clear()
+            self._expiry.clear()
+            self._total_bytes = 0
             logger.info(f"Cleared {size} models from cache")
 
+        if self._disk is not None:
+            self._disk.clear()
+
     def cleanup_expired(self) -> int:
         """
         Remove expired models from cache.
@@ -141,19 +463,15 @@ class ModelCache:
             Number of models removed
         """
         with self._lock:
-            expired_keys = [
-                key
-                for key, item in self._cache.items()
-                if datetime.utcnow() > item["expires_at"]
-            ]
+            removed = self._purge_expired(datetime.utcnow())
 
-            for key in expired_keys:
-                del self._cache[key]
+        if self._disk is not None:
+            removed += self._disk.cleanup_expired()
 
-            if expired_keys:
-                logger.info(f"Cleaned up {len(expired_keys)} expired models")
+        if removed:
+            logger.info(f"Cleaned up {removed} expired models")
 
-            return len(expired_keys)
+        return removed
 
     def get_stats(self) -> Dict:
         """
@@ -167,12 +485,16 @@ class ModelCache:
             return {
                 "size": len(self._cache),
                 "max_size": self.max_cache_size,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
                 "ttl_minutes": self.ttl_minutes,
                 "total_hits": total_hits,
+                "disk": self._disk.get_stats() if self._disk is not None else None,
                 "models": [
                     {
                         "key": key,
                         "hits": item["hits"],
+                        "size_bytes": item["size_bytes"],
                         "created_at": item["created_at"].isoformat(),
                         "expires_at": item["expires_at"].isoformat(),
                         "last_accessed": item["last_accessed"].isoformat(),
@@ -182,8 +504,35 @@ class ModelCache:
             }
 
 
+async def run_cache_maintenance(
+    cache: ModelCache,
+    interval_seconds: float = 60,
+    refresh_ahead_minutes: float = 5,
+    refresh_min_hits: int = 3
+) -> None:
+    """
+    Periodically sweep and refresh a model cache until cancelled.
+
+    Intended to run as a background task for the lifetime of the app.
+
+    Args:
+        cache: Cache to maintain
+        interval_seconds: Time between sweeps
+        refresh_ahead_minutes: Refresh hot entries expiring within this window
+        refresh_min_hits: Minimum hits for an entry to count as hot
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = await cache.sweep(refresh_ahead_minutes, refresh_min_hits)
+            if result["expired"] or result["refreshed"] or result["failed"]:
+                logger.info(f"Model cache sweep: {result}")
+        except Exception as e:
+            logger.error(f"Model cache sweep failed: {str(e)}")
+
+
 # Global cache instance
-model_cache = ModelCache(ttl_minutes=60, max_cache_size=10)
+model_cache = ModelCache(ttl_minutes=60, max_cache_size=256, max_bytes=512 * 1024 * 1024)
 
 
 def get_model_cache() -> ModelCache:
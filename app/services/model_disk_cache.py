@@ -0,0 +1,213 @@
+"""
+On-disk second tier for the ML model cache.
+
+Fitted detectors are persisted as uncompressed joblib files and loaded with
+mmap_mode='r', so workers on the same host and restarted workers pick up
+models that are still within their TTL instead of retraining them. Only plain
+numpy attributes (e.g. the scaler's statistics, estimators_features_) stay
+memory-mapped and shared through the page cache: sklearn's
+Tree.__setstate__ copies the node arrays, so every worker holds its own copy
+of the trees.
+
+Writes happen on a single background thread, so a cache miss does not wait
+for the model to be serialized.
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.model_management import set_default_file_mode
+
+logger = logging.getLogger(__name__)
+
+
+class DiskModelStore:
+    """
+    Directory of joblib-serialized models keyed by cache fingerprint.
+
+    A file's modification time is its creation time, so entries expire
+    ttl_minutes after they were written, matching the in-memory tier.
+    """
+
+    SUFFIX = ".joblib"
+
+    def __init__(self, directory: str, ttl_minutes: int = 60):
+        """
+        Initialize disk store.
+
+        Args:
+            directory: Directory holding the cached model files
+            ttl_minutes: Time-to-live for cached models in minutes
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_minutes = ttl_minutes
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-disk-cache")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, cache_key: str) -> Path:
+        safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", cache_key)
+        return self.directory / f"{safe_key}{self.SUFFIX}"
+
+    def _is_expired(self, mtime: float) -> bool:
+        return time.time() > mtime + self.ttl_minutes * 60
+
+    def get(self, cache_key: str) -> Optional[Tuple[Any, int, float]]:
+        """
+        Load a cached model memory-mapped from disk.
+
+        Args:
+            cache_key: Cache fingerprint
+
+        Returns:
+            Tuple of (model, file size in bytes, created-at epoch seconds),
+            or None on a miss or expired entry
+        """
+        path = self._path(cache_key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        if self._is_expired(stat.st_mtime):
+            logger.info(f"Disk cache entry expired for key: {cache_key}")
+            self._unlink(path)
+            return None
+
+        try:
+            import joblib
+            model = joblib.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"Unreadable disk cache entry {path}: {str(e)}")
+            self._unlink(path)
+            return None
+
+        logger.debug(f"Disk cache hit for key: {cache_key}")
+        return model, stat.st_size, stat.st_mtime
+
+    def set_in_background(self, cache_key: str, model: Any) -> Future:
+        """
+        Persist a model for the given key on the writer thread.
+
+        Until the write lands, get() for the key misses.
+
+        Returns:
+            Future resolving to the result of set()
+        """
+        future = self._writer.submit(self.set, cache_key, model)
+        with self._lock:
+            self._pending[cache_key] = future
+        future.add_done_callback(lambda done: self._write_done(cache_key, done))
+        return future
+
+    def _write_done(self, cache_key: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(cache_key) is future:
+                del self._pending[cache_key]
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background writes submitted so far."""
+        with self._lock:
+            pending = list(self._pending.values())
+        wait(pending, timeout=timeout)
+
+    def set(self, cache_key: str, model: Any) -> bool:
+        """
+        Persist a model for the given key (blocking).
+
+        The file is written to a temporary name and renamed into place, so
+        concurrent readers never see a partial file.
+
+        Returns:
+            True if the model was written
+        """
+        path = self._path(cache_key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            set_default_file_mode(fd)
+        finally:
+            os.close(fd)
+        try:
+            import joblib
+            # Uncompressed so numpy arrays can be memory-mapped on load
+            joblib.dump(model, tmp_path, compress=0)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to write disk cache entry {path}: {str(e)}")
+            self._unlink(Path(tmp_path))
+            return False
+
+    def delete(self, cache_key: str) -> None:
+        """Remove the entry for a key if present."""
+        self._unlink(self._path(cache_key))
+
+    def cleanup_expired(self) -> int:
+        """
+        Remove expired model files.
+
+        Returns:
+            Number of files removed
+        """
+        removed = 0
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                if self._is_expired(path.stat().st_mtime):
+                    self._unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove every cached model file.
+
+        Returns:
+            Number of files removed
+        """
+        # Let queued writes land first so they are removed too
+        self.flush()
+        removed = 0
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            self._unlink(path)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict:
+        """
+        Get disk tier statistics for monitoring.
+
+        Returns:
+            Dictionary with file count and total size
+        """
+        files = list(self.directory.glob(f"*{self.SUFFIX}"))
+        total = 0
+        for path in files:
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "directory": str(self.directory),
+            "files": len(files),
+            "bytes": total,
+            "pending_writes": pending,
+        }
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -8,132 +8,151 @@ with the anomaly detection and recommendation services.
 import logging
 from typing import Any, Optional, Dict
 from datetime import datetime
-from app.services.model_management import ModelManager, ModelMetadata
+
+import numpy as np
+
+from app.services.model_management import ModelManager, ModelMetadata, get_model_manager
+from app.services.model_pipeline import ModelPipeline
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
-class AnomalyDetectorModelLoader:
+class _CachedModelLoader:
     """
-    Helper class to load and manage anomaly detection models.
+    Shared loading logic: per-process model cache with single-flight loads.
+
+    Concurrent cache misses for the same model/version unpickle it once;
+    the other callers wait for that load instead of reading their own copy.
     """
 
+    category = ""
+
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
-        self.category = "anomaly_detection"
         self.cached_models: Dict[str, Any] = {}
+        # Resolved version behind each cache key (e.g. "<name>_latest" -> "2.0.0")
+        self.loaded_versions: Dict[str, str] = {}
+        self._single_flight = SingleFlight()
 
-    def load_network_detector(self, version: Optional[str] = None) -> Optional[Any]:
+    def _load(self, model_name: str, version: Optional[str] = None) -> Optional[Any]:
         """
-        Load the network anomaly detection model.
+        Load a model from cache or disk.
 
         Args:
+            model_name: Name of the model
             version: Specific version to load, None for latest
 
         Returns:
             The loaded model or None if not found
         """
-        model_name = "isolation_forest_network"
-
-        # Check cache first
         cache_key = f"{model_name}_{version or 'latest'}"
         if cache_key in self.cached_models:
             logger.debug(f"Loaded {model_name} from cache")
             return self.cached_models[cache_key]
 
-        # Load from disk
-        if version:
-            model, _ = self.model_manager.load_model(
-                model_name, self.category, version
-            )
-        else:
-            model, _, version = self.model_manager.load_latest_model(
-                model_name, self.category
-            )
-
-        if model:
-            self.cached_models[cache_key] = model
-            logger.info(
-                f"Loaded {model_name} version {version or 'latest'} from disk"
-            )
-
-        return model
+        return self._single_flight.do(cache_key, self._load_from_disk, model_name, version)
 
-    def load_site_detector(self, version: Optional[str] = None) -> Optional[Any]:
+    async def load_async(self, model_name: str, version: Optional[str] = None) -> Optional[Any]:
         """
-        Load the site anomaly detection model.
+        Async variant of model loading; disk reads run off the event loop.
 
         Args:
+            model_name: Name of the model
             version: Specific version to load, None for latest
 
         Returns:
             The loaded model or None if not found
         """
-        model_name = "isolation_forest_site"
-
-        # Check cache first
         cache_key = f"{model_name}_{version or 'latest'}"
         if cache_key in self.cached_models:
             logger.debug(f"Loaded {model_name} from cache")
             return self.cached_models[cache_key]
 
-        # Load from disk
+        return await self._single_flight.do_async(cache_key, self._load_from_disk, model_name, version)
+
+    def _load_from_disk(self, model_name: str, version: Optional[str]) -> Optional[Any]:
+        cache_key = f"{model_name}_{version or 'latest'}"
+        # A concurrent load may have finished between the miss and this call
+        if cache_key in self.cached_models:
+            return self.cached_models[cache_key]
+
         if version:
-            model, _ = self.model_manager.load_model(
+            model, metadata = self.model_manager.load_model(
                 model_name, self.category, version
             )
         else:
-            model, _, version = self.model_manager.load_latest_model(
+            model, metadata, version = self.model_manager.load_latest_model(
                 model_name, self.category
             )
 
         if model:
+            model = self._wrap(model, metadata, model_name, version)
             self.cached_models[cache_key] = model
+            self.loaded_versions[cache_key] = version
             logger.info(
                 f"Loaded {model_name} version {version or 'latest'} from disk"
             )
 
         return model
 
-    def load_link_detector(self, version: Optional[str] = None) -> Optional[Any]:
+    def _wrap(
+        self, model: Any, metadata: Optional[ModelMetadata], model_name: str, version: str
+    ) -> Any:
+        """Turn a freshly loaded model into what callers receive (hook)."""
+        return model
+
+    def build(self, model_name: str, version: str) -> Optional[Any]:
         """
-        Load the link anomaly detection model.
+        Load a specific version as callers would receive it, bypassing the cache.
+
+        Used to prepare a new version before it is swapped in.
 
         Args:
-            version: Specific version to load, None for latest
+            model_name: Name of the model
+            version: Version to load
 
         Returns:
             The loaded model or None if not found
         """
-        model_name = "isolation_forest_link"
+        model, metadata = self.model_manager.load_model(model_name, self.category, version)
+        if model is None:
+            return None
+        return self._wrap(model, metadata, model_name, version)
 
-        # Check cache first
-        cache_key = f"{model_name}_{version or 'latest'}"
-        if cache_key in self.cached_models:
-            logger.debug(f"Loaded {model_name} from cache")
-            return self.cached_models[cache_key]
+    def get_loaded_version(self, model_name: str) -> Optional[str]:
+        """
+        Version currently served as "latest" for a model.
 
-        # Load from disk
-        if version:
-            model, _ = self.model_manager.load_model(
-                model_name, self.category, version
-            )
-        else:
-            model, _, version = self.model_manager.load_latest_model(
-                model_name, self.category
-            )
+        Args:
+            model_name: Name of the model
 
-        if model:
-            self.cached_models[cache_key] = model
-            logger.info(
-                f"Loaded {model_name} version {version or 'latest'} from disk"
-            )
+        Returns:
+            Version string, or None if the latest model is not loaded
+        """
+        return self.loaded_versions.get(f"{model_name}_latest")
 
-        return model
+    def swap_latest(self, model_name: str, model: Any, version: str) -> None:
+        """
+        Replace the model served as "latest" with a new version.
+
+        The swap is a single reference assignment: requests that already hold
+        the previous model finish on it, later requests get the new one.
+
+        Args:
+            model_name: Name of the model
+            model: Loaded and validated model
+            version: Version of the new model
+        """
+        cache_key = f"{model_name}_latest"
+        previous = self.loaded_versions.get(cache_key)
+        self.cached_models[cache_key] = model
+        self.loaded_versions[cache_key] = version
+        logger.info(f"Swapped {model_name} latest: {previous} -> {version}")
 
     def list_available_models(self) -> Dict[str, list[str]]:
         """
-        List all available anomaly detection models and versions.
+        List all available models and versions in this loader's category.
 
         Returns:
             Dictionary mapping model names to versions
@@ -143,22 +162,33 @@ class AnomalyDetectorModelLoader:
     def clear_cache(self) -> None:
         """Clear the model cache"""
         self.cached_models.clear()
+        self.loaded_versions.clear()
         logger.debug("Model cache cleared")
 
 
-class RecommendationModelLoader:
+class AnomalyDetectorModelLoader(_CachedModelLoader):
     """
-    Helper class to load and manage recommendation models.
+    Helper class to load and manage anomaly detection models.
+
+    Models are returned as ModelPipeline instances (scaler + model with the
+    training feature order), ready to score raw feature rows.
     """
 
-    def __init__(self, model_manager: ModelManager):
-        self.model_manager = model_manager
-        self.category = "recommendations"
-        self.cached_models: Dict[str, Any] = {}
+    category = "anomaly_detection"
 
-    def load_ranking_model(self, version: Optional[str] = None) -> Optional[Any]:
+    def _wrap(
+        self, model: Any, metadata: Optional[ModelMetadata], model_name: str, version: str
+    ) -> ModelPipeline:
+        """Bundle the model with its scaler and training feature order."""
+        scaler = self.model_manager.load_scaler(model_name, self.category, version)
+        feature_names = None
+        if metadata is not None:
+            feature_names = metadata.hyperparameters.get("features")
+        return ModelPipeline(model, scaler=scaler, feature_names=feature_names, version=version)
+
+    def load_network_detector(self, version: Optional[str] = None) -> Optional[Any]:
         """
-        Load the recommendation ranking model.
+        Load the network anomaly detection model.
 
         Args:
             version: Specific version to load, None for latest
@@ -166,35 +196,35 @@ class RecommendationModelLoader:
         Returns:
             The loaded model or None if not found
         """
-        model_name = "ranking_model"
+        return self._load("isolation_forest_network", version)
 
-        # Check cache first
-        cache_key = f"{model_name}_{version or 'latest'}"
-        if cache_key in self.cached_models:
-            logger.debug(f"Loaded {model_name} from cache")
-            return self.cached_models[cache_key]
+    def load_site_detector(self, version: Optional[str] = None) -> Optional[Any]:
+        """
+        Load the site anomaly detection model.
 
-        # Load from disk
-        if version:
-            model, _ = self.model_manager.load_model(
-                model_name, self.category, version
-            )
-        else:
-            model, _, version = self.model_manager.load_latest_model(
-                model_name, self.category
-            )
+        Args:
+            version: Specific version to load, None for latest
 
-        if model:
-            self.cached_models[cache_key] = model
-            logger.info(
-                f"Loaded {model_name} version {version or 'latest'} from disk"
-            )
+        Returns:
+            The loaded model or None if not found
+        """
+        return self._load("isolation_forest_site", version)
 
-        return model
+    def load_link_detector(self, version: Optional[str] = None) -> Optional[Any]:
+        """
+        Load the link anomaly detection model.
 
-    def load_priority_classifier(self, version: Optional[str] = None) -> Optional[Any]:
+        Args:
+            version: Specific version to load, None for latest
+
+        Returns:
+            The loaded model or None if not found
         """
-        Load the recommendation priority classifier model.
+        return self._load("isolation_forest_link", version)
+
+    def load_device_detector(self, version: Optional[str] = None) -> Optional[Any]:
+        """
+        Load the device KPI anomaly detection model.
 
         Args:
             version: Specific version to load, None for latest
@@ -202,45 +232,98 @@ class RecommendationModelLoader:
         Returns:
             The loaded model or None if not found
         """
-        model_name = "priority_classifier"
+        return self._load("isolation_forest_device", version)
 
-        # Check cache first
-        cache_key = f"{model_name}_{version or 'latest'}"
-        if cache_key in self.cached_models:
-            logger.debug(f"Loaded {model_name} from cache")
-            return self.cached_models[cache_key]
 
-        # Load from disk
-        if version:
-            model, _ = self.model_manager.load_model(
-                model_name, self.category, version
-            )
-        else:
-            model, _, version = self.model_manager.load_latest_model(
-                model_name, self.category
-            )
+class RecommendationModelLoader(_CachedModelLoader):
+    """
+    Helper class to load and manage recommendation models.
+    """
 
-        if model:
-            self.cached_models[cache_key] = model
-            logger.info(
-                f"Loaded {model_name} version {version or 'latest'} from disk"
-            )
+    category = "recommendations"
 
-        return model
+    def load_ranking_model(self, version: Optional[str] = None) -> Optional[Any]:
+        """
+        Load the recommendation ranking model.
 
-    def list_available_models(self) -> Dict[str, list[str]]:
+        Args:
+            version: Specific version to load, None for latest
+
+        Returns:
+            The loaded model or None if not found
         """
-        List all available recommendation models and versions.
+        return self._load("ranking_model", version)
+
+    def load_priority_classifier(self, version: Optional[str] = None) -> Optional[Any]:
+        """
+        Load the recommendation priority classifier model.
+
+        Args:
+            version: Specific version to load, None for latest
 
         Returns:
-            Dictionary mapping model names to versions
+            The loaded model or None if not found
         """
-        return self.model_manager.list_models(self.category)
+        return self._load("priority_classifier", version)
 
-    def clear_cache(self) -> None:
-        """Clear the model cache"""
-        self.cached_models.clear()
-        logger.debug("Model cache cleared")
+
+def run_smoke_inference(model: Any) -> bool:
+    """
+    Run one prediction on an all-zero row.
+
+    Args:
+        model: Loaded model
+
+    Returns:
+        True if the model was exercised, False if it exposes no
+        predict/n_features_in_ to build an input from
+
+    Raises:
+        Exception: Whatever the model raises on prediction
+    """
+    n_features = getattr(model, "n_features_in_", None)
+    predict = getattr(model, "predict", None)
+    if n_features is None or predict is None:
+        return False
+    predict(np.zeros((1, int(n_features))))
+    return True
+
+
+# Singleton loaders so every caller (endpoints, warm-up) shares one model cache
+_anomaly_loader_instance: Optional[AnomalyDetectorModelLoader] = None
+_recommendation_loader_instance: Optional[RecommendationModelLoader] = None
+
+
+def get_anomaly_model_loader(models_dir: str = "ml_models") -> AnomalyDetectorModelLoader:
+    """
+    Get or create the global anomaly detection model loader.
+
+    Args:
+        models_dir: Root directory containing model subdirectories
+
+    Returns:
+        AnomalyDetectorModelLoader instance
+    """
+    global _anomaly_loader_instance
+    if _anomaly_loader_instance is None:
+        _anomaly_loader_instance = AnomalyDetectorModelLoader(get_model_manager(models_dir))
+    return _anomaly_loader_instance
+
+
+def get_recommendation_model_loader(models_dir: str = "ml_models") -> RecommendationModelLoader:
+    """
+    Get or create the global recommendation model loader.
+
+    Args:
+        models_dir: Root directory containing model subdirectories
+
+    Returns:
+        RecommendationModelLoader instance
+    """
+    global _recommendation_loader_instance
+    if _recommendation_loader_instance is None:
+        _recommendation_loader_instance = RecommendationModelLoader(get_model_manager(models_dir))
+    return _recommendation_loader_instance
 
 
 def create_model_metadata(
@@ -2,19 +2,204 @@
 ML Model Management and Serialization Utilities
 
 This module provides utilities for loading, saving, and managing
-pre-trained ML models (pickle files) with versioning support.
+pre-trained ML models (pickle or joblib files) with versioning support.
+
+Each category directory holds a manifest.json index of its models, versions,
+checksums and file sizes. The manifest is maintained by save_model and
+delete_model and read once per process, so resolving the latest version is a
+dict lookup rather than a directory scan. Updates re-read the manifest from
+disk under an exclusive lock on manifest.lock, so trainers in different
+processes never drop each other's versions.
+
+Models can be stored as a plain pickle (model.pkl) or as an uncompressed
+joblib file (model.joblib). The joblib format is loaded with mmap_mode='r',
+so its numpy arrays are backed by the page cache and shared by every worker
+on a node instead of being copied into each worker's heap.
 """
 
+import copy
+import os
+from contextlib import contextmanager
 import pickle
 import json
 import logging
+import re
+import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows: manifest updates are serialized per process only
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOCK_FILE = "manifest.lock"
+
+
+def _read_umask() -> int:
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Files created through tempfile.mkstemp are 0600; published files get the
+# mode open() would give them, so other service users can read them
+DEFAULT_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def set_default_file_mode(fd: int) -> None:
+    """Give a file created by tempfile.mkstemp the umask-derived default mode."""
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, DEFAULT_FILE_MODE)
+
+# Storage format -> model file name; load order prefers the mmap format
+MODEL_FILES = {
+    "joblib": "model.joblib",
+    "pickle": "model.pkl",
+}
+DEFAULT_STORAGE_FORMAT = "pickle"
+
+
+def find_model_file(model_dir: Path) -> Tuple[Optional[Path], Optional[str]]:
+    """
+    Locate the serialized model in a version directory.
+
+    Args:
+        model_dir: Model version directory
+
+    Returns:
+        Tuple[path, storage_format], or (None, None) if there is no model file
+    """
+    for storage_format, filename in MODEL_FILES.items():
+        path = model_dir / filename
+        if path.exists():
+            return path, storage_format
+    return None, None
+
+
+# Checksums are stored as "<algorithm>:<hexdigest>"; bare hex means MD5, which
+# keeps metadata written before other algorithms were supported valid
+CHECKSUM_ALGORITHMS = ("md5", "sha256", "blake2b")
+DEFAULT_CHECKSUM_ALGORITHM = "md5"
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def format_checksum(algorithm: str, digest: str) -> str:
+    """Encode a digest for metadata.json (bare hex for MD5)."""
+    return digest if algorithm == "md5" else f"{algorithm}:{digest}"
+
+
+def parse_checksum(checksum: str) -> Tuple[str, str]:
+    """Split a stored checksum into (algorithm, hexdigest)."""
+    algorithm, sep, digest = checksum.partition(":")
+    return (algorithm, digest) if sep else ("md5", checksum)
+
+
+def _stream_digest(path: Path, algorithm: str) -> str:
+    """Hash a file in fixed-size chunks without reading it into memory."""
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """
+    Process-wide cache of file digests.
+
+    Entries are keyed by (path, size, mtime_ns, algorithm), so an unchanged
+    model file is hashed once per process however often it is validated,
+    while any rewrite of the file (new size or mtime) forces a fresh hash.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[int, int, str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> str:
+        """
+        Digest of a file, computed by streaming it on a cache miss.
+
+        Args:
+            path: File to hash
+            algorithm: hashlib algorithm name
+
+        Returns:
+            Hex digest
+        """
+        stat = os.stat(path)
+        key = str(path)
+        with self._lock:
+            cached = self._digests.get(key)
+            if cached is not None and cached[:3] == (stat.st_size, stat.st_mtime_ns, algorithm):
+                self.hits += 1
+                return cached[3]
+            self.misses += 1
+
+        digest = _stream_digest(path, algorithm)
+        with self._lock:
+            self._digests[key] = (stat.st_size, stat.st_mtime_ns, algorithm, digest)
+        return digest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._digests.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._digests), "hits": self.hits, "misses": self.misses}
+
+
+digest_cache = DigestCache()
+
+
+def file_digest(path: Path, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> str:
+    """Cached streaming digest of a file (see DigestCache)."""
+    return digest_cache.get(Path(path), algorithm)
+
+
+_VERSION_PATTERN = re.compile(r"^v?(\d+(?:\.\d+)*)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$")
+
+
+def version_sort_key(version: str) -> Tuple:
+    """
+    Sort key implementing semantic-version ordering.
+
+    "10.0.0" sorts after "9.0.0", and a pre-release ("2.0.0-rc1") sorts
+    before its release. Strings that are not versions sort first, by text.
+
+    Args:
+        version: Version string (e.g., '1.0.0')
+
+    Returns:
+        Tuple usable as a sort key
+    """
+    match = _VERSION_PATTERN.match(version)
+    if not match:
+        return (0, (), 0, version)
+    release = tuple(int(part) for part in match.group(1).split("."))
+    # Pad so "1.0" and "1.0.0" compare equal
+    release = release + (0,) * max(0, 3 - len(release))
+    prerelease = match.group(2)
+    return (1, release, 0 if prerelease else 1, prerelease or "")
+
+
 class ModelMetadata:
     """
     Metadata for tracking ML models including version, training date, and checksum.
@@ -73,15 +258,264 @@ class ModelManager:
     Manages ML model lifecycle including loading, saving, and versioning.
     """
 
-    def __init__(self, models_dir: str):
+    def __init__(
+        self,
+        models_dir: str,
+        checksum_algorithm: str = DEFAULT_CHECKSUM_ALGORITHM,
+        verify_on_load: bool = False,
+    ):
         """
         Initialize ModelManager.
 
         Args:
             models_dir: Root directory containing model subdirectories
+            checksum_algorithm: Algorithm for checksums of newly saved models
+            verify_on_load: Validate the checksum before loading a model
         """
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.configure(checksum_algorithm, verify_on_load)
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        self._manifest_lock = threading.RLock()
+
+    def configure(self, checksum_algorithm: str, verify_on_load: bool) -> None:
+        """
+        Update checksum settings.
+
+        Args:
+            checksum_algorithm: Algorithm for checksums of newly saved models
+            verify_on_load: Validate the checksum before loading a model
+        """
+        if checksum_algorithm not in CHECKSUM_ALGORITHMS:
+            raise ValueError(f"Unsupported checksum algorithm: {checksum_algorithm}")
+        self.checksum_algorithm = checksum_algorithm
+        self.verify_on_load = verify_on_load
+
+    # ==================== Manifest ====================
+
+    def _manifest_path(self, category: str) -> Path:
+        return self.models_dir / category / MANIFEST_FILE
+
+    @staticmethod
+    def _latest_version(versions: Dict[str, Any]) -> Optional[str]:
+        return max(versions, key=version_sort_key) if versions else None
+
+    def _scan_version_entry(self, model_dir: Path) -> Optional[Dict[str, Any]]:
+        """Build a manifest entry from a model version directory."""
+        model_path, storage_format = find_model_file(model_dir)
+        if model_path is None:
+            return None
+
+        checksum = None
+        training_date = None
+        metadata_path = model_dir / "metadata.json"
+        if metadata_path.exists():
+            try:
+                with open(metadata_path, "r") as f:
+                    metadata_dict = json.load(f)
+                checksum = metadata_dict.get("checksum")
+                training_date = metadata_dict.get("training_date")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable metadata {metadata_path}: {str(e)}")
+
+        return {
+            "directory": model_dir.name,
+            "checksum": checksum,
+            "size_bytes": model_path.stat().st_size,
+            "storage_format": storage_format,
+            "training_date": training_date,
+        }
+
+    def _write_manifest(self, category: str, manifest: Dict[str, Any]) -> None:
+        """Write a category manifest atomically (temp file + rename)."""
+        category_dir = self.models_dir / category
+        category_dir.mkdir(parents=True, exist_ok=True)
+        manifest["updated_at"] = datetime.now().isoformat()
+
+        fd, tmp_path = tempfile.mkstemp(dir=category_dir, suffix=".tmp")
+        try:
+            set_default_file_mode(fd)
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp_path, self._manifest_path(category))
+        except OSError as e:
+            # Read-only deployments still work from the in-memory manifest
+            logger.warning(f"Could not write manifest for {category}: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def rebuild_manifest(self, category: str) -> Dict[str, Any]:
+        """
+        Rebuild a category manifest by scanning its model directories.
+
+        Used when the manifest is missing or unreadable, or after model
+        directories were copied in by hand.
+
+        Args:
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            The rebuilt manifest
+        """
+        category_dir = self.models_dir / category
+        manifest = self._scan_manifest(category)
+        with self._manifest_lock:
+            if category_dir.exists():
+                with self._manifest_file_lock(category):
+                    self._write_manifest(category, manifest)
+            self._manifests[category] = manifest
+        logger.info(f"Manifest rebuilt for {category}: {len(manifest['models'])} models")
+        return manifest
+
+    def _scan_manifest(self, category: str) -> Dict[str, Any]:
+        """Build a manifest from the version directories without writing it."""
+        models: Dict[str, Dict[str, Any]] = {}
+        category_dir = self.models_dir / category
+        for model_dir in (category_dir.iterdir() if category_dir.exists() else []):
+            parts = model_dir.name.rsplit("_v", 1)
+            if not model_dir.is_dir() or len(parts) != 2:
+                continue
+            entry = self._scan_version_entry(model_dir)
+            if entry is not None:
+                models.setdefault(parts[0], {"versions": {}})["versions"][parts[1]] = entry
+        for model in models.values():
+            model["latest"] = self._latest_version(model["versions"])
+        return {"category": category, "models": models}
+
+    def _read_manifest_file(self, category: str) -> Optional[Dict[str, Any]]:
+        """Read the manifest from disk, None if it is missing or unreadable."""
+        manifest_path = self._manifest_path(category)
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable manifest {manifest_path}: {str(e)}")
+            return None
+
+    @contextmanager
+    def _manifest_file_lock(self, category: str):
+        """Exclusive cross-process lock for rewriting a category manifest."""
+        category_dir = self.models_dir / category
+        category_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(category_dir / MANIFEST_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _get_manifest(self, category: str) -> Dict[str, Any]:
+        """Return the in-memory manifest, reading or rebuilding it once."""
+        manifest = self._manifests.get(category)
+        if manifest is not None:
+            return manifest
+
+        with self._manifest_lock:
+            manifest = self._manifests.get(category)
+            if manifest is not None:
+                return manifest
+
+            manifest = self._read_manifest_file(category)
+            if manifest is not None:
+                self._manifests[category] = manifest
+                return manifest
+
+            return self.rebuild_manifest(category)
+
+    def refresh_manifest(self, category: str) -> Dict[str, Any]:
+        """
+        Drop the in-memory manifest and read it again from disk.
+
+        Picks up models published by another process.
+
+        Args:
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            The reloaded manifest
+        """
+        with self._manifest_lock:
+            self._manifests.pop(category, None)
+            return self._get_manifest(category)
+
+    def manifest_mtime(self, category: str) -> Optional[float]:
+        """
+        Modification time of a category manifest on disk.
+
+        Cheap change detection for watchers: publishing or deleting a model
+        rewrites the manifest.
+
+        Args:
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            mtime in epoch seconds, or None if there is no manifest file
+        """
+        try:
+            return self._manifest_path(category).stat().st_mtime_ns / 1e9
+        except FileNotFoundError:
+            return None
+
+    def get_manifest(self, category: str) -> Dict[str, Any]:
+        """
+        Get a copy of the manifest for a category.
+
+        Args:
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            Manifest dictionary (models -> latest and versions)
+        """
+        with self._manifest_lock:
+            return copy.deepcopy(self._get_manifest(category))
+
+    def _update_manifest(
+        self, category: str, model_name: str, version: str, entry: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Add (entry) or remove (None) one version and persist the manifest.
+
+        The manifest is re-read from disk under the file lock rather than
+        taken from this process's copy, which may predate versions published
+        by other processes.
+        """
+        with self._manifest_lock, self._manifest_file_lock(category):
+            manifest = self._read_manifest_file(category) or self._scan_manifest(category)
+            self._manifests[category] = manifest
+            models = manifest.setdefault("models", {})
+            model = models.setdefault(model_name, {"versions": {}})
+            if entry is None:
+                model["versions"].pop(version, None)
+            else:
+                model["versions"][version] = entry
+
+            if model["versions"]:
+                model["latest"] = self._latest_version(model["versions"])
+            else:
+                del models[model_name]
+            self._write_manifest(category, manifest)
+
+    def get_latest_version(self, model_name: str, category: str) -> Optional[str]:
+        """
+        Resolve the latest version of a model from the manifest.
+
+        Args:
+            model_name: Name of the model
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            Latest version string, or None if the model has no versions
+        """
+        model = self._get_manifest(category).get("models", {}).get(model_name)
+        return model["latest"] if model else None
 
     def save_model(
         self,
@@ -90,6 +524,7 @@ class ModelManager:
         category: str,
         version: str,
         metadata: ModelMetadata,
+        storage_format: str = DEFAULT_STORAGE_FORMAT,
     ) -> Tuple[bool, str]:
         """
         Save a model to pickle file with metadata.
@@ -100,10 +535,15 @@ class ModelManager:
             category: Category ('anomaly_detection' or 'recommendations')
             version: Version string (e.g., '1.0.0')
             metadata: ModelMetadata object containing training info
+            storage_format: 'pickle' (model.pkl) or 'joblib' (model.joblib,
+                uncompressed and memory-mapped on load)
 
         Returns:
             Tuple[success: bool, path: str] - Success status and file path
         """
+        if storage_format not in MODEL_FILES:
+            return False, f"Unknown storage format: {storage_format}"
+
         try:
             # Create category directory
             category_dir = self.models_dir / category
@@ -113,14 +553,18 @@ class ModelManager:
             model_dir = category_dir / f"{model_name}_v{version}"
             model_dir.mkdir(parents=True, exist_ok=True)
 
-            # Save model pickle
-            model_path = model_dir / "model.pkl"
-            with open(model_path, "wb") as f:
-                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
-
-            # Calculate checksum
-            with open(model_path, "rb") as f:
-                file_hash = hashlib.md5(f.read()).hexdigest()
+            # Save model in the requested format, dropping any other format
+            # left over from a previous save of this version
+            model_path = model_dir / MODEL_FILES[storage_format]
+            self._write_model_file(model, model_path, storage_format)
+            for other_format, filename in MODEL_FILES.items():
+                if other_format != storage_format and (model_dir / filename).exists():
+                    (model_dir / filename).unlink()
+
+            # Calculate checksum (also primes the digest cache)
+            file_hash = format_checksum(
+                self.checksum_algorithm, file_digest(model_path, self.checksum_algorithm)
+            )
             metadata.checksum = file_hash
 
             # Save metadata JSON
@@ -128,6 +572,14 @@ class ModelManager:
             with open(metadata_path, "w") as f:
                 json.dump(metadata.to_dict(), f, indent=2)
 
+            self._update_manifest(category, model_name, version, {
+                "directory": model_dir.name,
+                "checksum": file_hash,
+                "size_bytes": model_path.stat().st_size,
+                "storage_format": storage_format,
+                "training_date": metadata.training_date,
+            })
+
             logger.info(f"Model saved: {model_path}")
             logger.info(f"Metadata saved: {metadata_path}")
 
@@ -159,14 +611,21 @@ class ModelManager:
                 logger.warning(f"Model directory not found: {model_dir}")
                 return None, None
 
-            # Load model pickle
-            model_path = model_dir / "model.pkl"
-            if not model_path.exists():
-                logger.warning(f"Model file not found: {model_path}")
+            # Load model file (memory-mapped for the joblib format)
+            model_path, storage_format = find_model_file(model_dir)
+            if model_path is None:
+                logger.warning(f"Model file not found in: {model_dir}")
                 return None, None
 
-            with open(model_path, "rb") as f:
-                model = pickle.load(f)
+            if self.verify_on_load:
+                checksum_valid = self.check_model_checksum(model_name, category, version)
+                if checksum_valid is None:
+                    logger.warning(f"Loading unverified model (no usable checksum recorded): {model_path}")
+                elif not checksum_valid:
+                    logger.error(f"Refusing to load model with invalid checksum: {model_path}")
+                    return None, None
+
+            model = self._read_model_file(model_path, storage_format)
 
             # Load metadata
             metadata = None
@@ -183,46 +642,138 @@ class ModelManager:
             logger.error(f"Error loading model: {str(e)}")
             return None, None
 
-    def load_latest_model(
-        self, model_name: str, category: str
-    ) -> Tuple[Optional[Any], Optional[ModelMetadata], Optional[str]]:
+    def load_scaler(self, model_name: str, category: str, version: str) -> Optional[Any]:
         """
-        Load the latest version of a model.
+        Load the feature scaler saved next to a model (scaler.pkl).
 
         Args:
             model_name: Name of the model
             category: Category ('anomaly_detection' or 'recommendations')
+            version: Version string
 
         Returns:
-            Tuple[model, metadata, version] - Model, metadata, and version string
+            The fitted scaler, or None if the model has none
         """
+        scaler_path = self.models_dir / category / f"{model_name}_v{version}" / "scaler.pkl"
+        if not scaler_path.exists():
+            return None
         try:
-            category_dir = self.models_dir / category
-            if not category_dir.exists():
-                return None, None, None
+            with open(scaler_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.error(f"Error loading scaler: {str(e)}")
+            return None
 
-            # Find all versions of this model
-            pattern = f"{model_name}_v*"
-            matching_dirs = sorted(category_dir.glob(pattern), reverse=True)
+    @staticmethod
+    def _write_model_file(model: Any, model_path: Path, storage_format: str) -> None:
+        """Serialize a model to a temporary file and rename it into place."""
+        fd, tmp_path = tempfile.mkstemp(dir=model_path.parent, suffix=".tmp")
+        try:
+            set_default_file_mode(fd)
+        finally:
+            os.close(fd)
+        try:
+            if storage_format == "joblib":
+                import joblib
+                # Uncompressed so numpy arrays can be memory-mapped on load
+                joblib.dump(model, tmp_path, compress=0)
+            else:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, model_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
 
-            if not matching_dirs:
-                logger.warning(f"No versions found for {model_name}")
-                return None, None, None
+    @staticmethod
+    def _read_model_file(model_path: Path, storage_format: str) -> Any:
+        if storage_format == "joblib":
+            import joblib
+            return joblib.load(model_path, mmap_mode="r")
+        with open(model_path, "rb") as f:
+            return pickle.load(f)
+
+    def convert_model_format(
+        self, model_name: str, category: str, version: str, storage_format: str = "joblib"
+    ) -> bool:
+        """
+        Convert a stored model version to another storage format in place.
 
-            # Load the latest (first) version
-            latest_dir = matching_dirs[0]
-            version = latest_dir.name.replace(f"{model_name}_v", "")
+        The new file is written before the old one is removed, so workers
+        loading the model during the conversion always find a complete file.
+        The metadata checksum and the manifest are updated to the new file.
 
-            model_path = latest_dir / "model.pkl"
-            with open(model_path, "rb") as f:
-                model = pickle.load(f)
+        Args:
+            model_name: Name of the model
+            category: Category ('anomaly_detection' or 'recommendations')
+            version: Version string
+            storage_format: Target format ('joblib' or 'pickle')
 
-            metadata = None
-            metadata_path = latest_dir / "metadata.json"
+        Returns:
+            True if the model was converted, False if it was missing, already
+            in the target format, or the conversion failed
+        """
+        if storage_format not in MODEL_FILES:
+            logger.error(f"Unknown storage format: {storage_format}")
+            return False
+
+        try:
+            model_dir = self.models_dir / category / f"{model_name}_v{version}"
+            model_path, current_format = find_model_file(model_dir)
+            if model_path is None:
+                logger.warning(f"Model file not found in: {model_dir}")
+                return False
+            if current_format == storage_format:
+                return False
+
+            model = self._read_model_file(model_path, current_format)
+            new_path = model_dir / MODEL_FILES[storage_format]
+            self._write_model_file(model, new_path, storage_format)
+            metadata_path = model_dir / "metadata.json"
             if metadata_path.exists():
                 with open(metadata_path, "r") as f:
                     metadata_dict = json.load(f)
-                metadata = ModelMetadata.from_dict(metadata_dict)
+                # Keep the algorithm the model was published with
+                algorithm = self.checksum_algorithm
+                if metadata_dict.get("checksum"):
+                    algorithm, _ = parse_checksum(metadata_dict["checksum"])
+                metadata_dict["checksum"] = format_checksum(algorithm, file_digest(new_path, algorithm))
+                with open(metadata_path, "w") as f:
+                    json.dump(metadata_dict, f, indent=2)
+
+            model_path.unlink()
+            self._update_manifest(category, model_name, version, self._scan_version_entry(model_dir))
+
+            logger.info(f"Model converted to {storage_format}: {new_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error converting model: {str(e)}")
+            return False
+
+    def load_latest_model(
+        self, model_name: str, category: str
+    ) -> Tuple[Optional[Any], Optional[ModelMetadata], Optional[str]]:
+        """
+        Load the latest version of a model.
+
+        Args:
+            model_name: Name of the model
+            category: Category ('anomaly_detection' or 'recommendations')
+
+        Returns:
+            Tuple[model, metadata, version] - Model, metadata, and version string
+        """
+        try:
+            version = self.get_latest_version(model_name, category)
+            if version is None:
+                logger.warning(f"No versions found for {model_name}")
+                return None, None, None
+
+            model, metadata = self.load_model(model_name, category, version)
+            if model is None:
+                return None, None, None
 
             logger.info(f"Latest model loaded: {model_name} v{version}")
             return model, metadata, version
@@ -242,24 +793,11 @@ class ModelManager:
             Dictionary with model names and their versions
         """
         try:
-            category_dir = self.models_dir / category
-            if not category_dir.exists():
-                return {}
-
-            models: Dict[str, list[str]] = {}
-            for model_dir in category_dir.iterdir():
-                if model_dir.is_dir():
-                    # Extract model name and version
-                    parts = model_dir.name.rsplit("_v", 1)
-                    if len(parts) == 2:
-                        model_name, version = parts
-                        if model_name not in models:
-                            models[model_name] = []
-                        models[model_name].append(version)
-
-            # Sort versions
-            for model_name in models:
-                models[model_name] = sorted(models[model_name])
+            manifest = self._get_manifest(category)
+            models: Dict[str, list[str]] = {
+                model_name: sorted(model["versions"], key=version_sort_key)
+                for model_name, model in manifest.get("models", {}).items()
+            }
 
             logger.info(f"Models in {category}: {models}")
             return models
@@ -291,6 +829,7 @@ class ModelManager:
             import shutil
 
             shutil.rmtree(model_dir)
+            self._update_manifest(category, model_name, version, None)
             logger.info(f"Model deleted: {model_dir}")
             return True
 
@@ -338,28 +877,55 @@ class ModelManager:
             version: Version string
 
         Returns:
-            True if checksum matches, False otherwise
+            True if checksum matches, False otherwise (including when none is recorded)
+        """
+        return self.check_model_checksum(model_name, category, version) is True
+
+    def check_model_checksum(
+        self, model_name: str, category: str, version: str
+    ) -> Optional[bool]:
+        """
+        Compare a model file with its recorded checksum.
+
+        Args:
+            model_name: Name of the model
+            category: Category ('anomaly_detection' or 'recommendations')
+            version: Version string
+
+        Returns:
+            True if it matches, False on a mismatch or unreadable model, None
+            when there is no metadata.json or no checksum in a supported
+            algorithm to compare with
         """
         try:
             model_dir = self.models_dir / category / f"{model_name}_v{version}"
-            model_path = model_dir / "model.pkl"
+            model_path, _ = find_model_file(model_dir)
             metadata_path = model_dir / "metadata.json"
 
-            if not (model_path.exists() and metadata_path.exists()):
+            if model_path is None:
                 return False
+            if not metadata_path.exists():
+                logger.warning(f"No metadata recorded: {model_name} v{version}")
+                return None
 
             # Get stored checksum
             with open(metadata_path, "r") as f:
                 metadata_dict = json.load(f)
             stored_checksum = metadata_dict.get("checksum")
+            if not stored_checksum:
+                logger.warning(f"No checksum recorded: {model_name} v{version}")
+                return None
 
-            # Calculate current checksum
-            with open(model_path, "rb") as f:
-                current_checksum = hashlib.md5(f.read()).hexdigest()
+            # Calculate current checksum (cached while the file is unchanged)
+            algorithm, stored_digest = parse_checksum(stored_checksum)
+            if algorithm not in CHECKSUM_ALGORITHMS:
+                logger.warning(f"Unsupported checksum algorithm {algorithm}: {model_name} v{version}")
+                return None
+            current_digest = file_digest(model_path, algorithm)
 
-            is_valid = stored_checksum == current_checksum
+            is_valid = stored_digest == current_digest
             if is_valid:
-                logger.info(f"Model checksum valid: {model_name} v{version}")
+                logger.debug(f"Model checksum valid: {model_name} v{version}")
             else:
                 logger.warning(f"Model checksum mismatch: {model_name} v{version}")
 
@@ -368,3 +934,60 @@ class ModelManager:
         except Exception as e:
             logger.error(f"Error validating checksum: {str(e)}")
             return False
+
+    def validate_models(
+        self,
+        categories: Optional[List[str]] = None,
+        latest_only: bool = False,
+        max_workers: int = 4,
+    ) -> Dict[str, bool]:
+        """
+        Validate many model checksums in parallel.
+
+        hashlib releases the GIL while hashing, so a thread pool verifies
+        several files at disk speed. Results land in the digest cache, so
+        subsequent loads with verify_on_load do not hash again.
+
+        Args:
+            categories: Categories to validate, None for every category
+            latest_only: Only validate the latest version of each model
+            max_workers: Number of hashing threads
+
+        Returns:
+            Dictionary mapping "category/model_name/version" to validity
+        """
+        if categories is None:
+            categories = sorted(p.name for p in self.models_dir.iterdir() if p.is_dir())
+
+        jobs = []
+        for category in categories:
+            for model_name, model in self._get_manifest(category).get("models", {}).items():
+                versions = [model["latest"]] if latest_only else list(model["versions"])
+                jobs.extend((category, model_name, version) for version in versions)
+
+        if not jobs:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+            results = pool.map(lambda job: self.validate_model_checksum(job[1], job[0], job[2]), jobs)
+            return {f"{category}/{model_name}/{version}": valid
+                    for (category, model_name, version), valid in zip(jobs, results)}
+
+
+# Singleton instance shared by the model loaders
+_model_manager_instance: Optional[ModelManager] = None
+
+def get_model_manager(models_dir: str = "ml_models") -> ModelManager:
+    """
+    Get or create the global ModelManager instance.
+
+    Args:
+        models_dir: Root directory containing model subdirectories
+
+    Returns:
+        ModelManager instance
+    """
+    global _model_manager_instance
+    if _model_manager_instance is None:
+        _model_manager_instance = ModelManager(models_dir)
+    return _model_manager_instance
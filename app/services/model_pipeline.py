@@ -0,0 +1,111 @@
+"""
+Ready-to-score inference pipelines for pre-trained models.
+
+Training saves a StandardScaler (scaler.pkl) next to each model and records
+the feature order in metadata.json. A ModelPipeline bundles the three, so
+callers hand over raw feature rows and get predictions back; the scaler is
+applied as one vectorized affine transform immediately before scoring.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ModelPipeline:
+    """Scaler + model with a fixed feature order."""
+
+    def __init__(
+        self,
+        model: Any,
+        scaler: Optional[Any] = None,
+        feature_names: Optional[Sequence[str]] = None,
+        version: Optional[str] = None
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            model: Fitted estimator (e.g. IsolationForest)
+            scaler: Fitted scaler applied before the model, None for raw input
+            feature_names: Feature order the model was trained on
+            version: Model version, for provenance
+        """
+        self.model = model
+        self.scaler = scaler
+        self.feature_names: Optional[List[str]] = list(feature_names) if feature_names else None
+        self.version = version
+
+        # StandardScaler reduces to (X - mean) * inv_scale; precompute it so
+        # scaling is one fused numpy expression instead of a sklearn call
+        self._mean: Optional[np.ndarray] = None
+        self._inv_scale: Optional[np.ndarray] = None
+        if scaler is not None:
+            mean = getattr(scaler, "mean_", None)
+            scale = getattr(scaler, "scale_", None)
+            if getattr(scaler, "with_mean", True) is False:
+                mean = None
+            if scale is not None:
+                self._mean = np.asarray(mean, dtype=np.float64) if mean is not None else None
+                self._inv_scale = 1.0 / np.asarray(scale, dtype=np.float64)
+
+    @property
+    def n_features_in_(self) -> Optional[int]:
+        return getattr(self.model, "n_features_in_", None)
+
+    def feature_matrix(
+        self,
+        records: Sequence[Dict[str, Any]],
+        default_features: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Build the input matrix from feature dicts in training order.
+
+        Args:
+            records: One dict of feature values per row
+            default_features: Feature order to use if the metadata has none
+
+        Returns:
+            2-D float matrix with one column per feature
+        """
+        features = self.feature_names or default_features
+        if not features:
+            raise ValueError("Feature order unknown: no metadata features and no default given")
+        return np.array(
+            [[record.get(name, 0) for name in features] for record in records],
+            dtype=np.float64
+        )
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Apply the scaler to a feature matrix.
+
+        Args:
+            X: 2-D feature matrix in training order
+
+        Returns:
+            Scaled matrix
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self._inv_scale is not None:
+            return (X - self._mean) * self._inv_scale if self._mean is not None else X * self._inv_scale
+        if self.scaler is not None:
+            return self.scaler.transform(X)
+        return X
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Scale and predict (-1 = anomaly, 1 = normal for outlier detectors)."""
+        return self.model.predict(self.transform(X))
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """Scale and return the model's raw anomaly scores (lower = more abnormal)."""
+        return self.model.score_samples(self.transform(X))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Scale and return the decision function (negative = anomaly)."""
+        return self.model.decision_function(self.transform(X))
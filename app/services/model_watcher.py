@@ -0,0 +1,170 @@
+"""
+Hot-swap of newly published model versions.
+
+A ModelWatcher polls the category manifest (rewritten by ModelManager on
+every save/delete). When the latest version of a loaded model changes it
+loads the new version in the background, validates its checksum, runs a
+smoke inference and only then swaps the loader's "latest" reference. A
+checksum or load failure may be a model still being copied, so the same
+manifest is checked again on the next poll, up to MAX_ATTEMPTS times,
+before the version is rejected.
+Requests already holding the previous model finish on it, so retraining no
+longer requires an API restart and the cold start that comes with it.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.model_loaders import _CachedModelLoader, run_smoke_inference
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """Watches one loader's category and swaps in new latest versions."""
+
+    MAX_HISTORY = 50
+
+    # Polls a version may fail its checksum or load before it is rejected
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, loader: _CachedModelLoader):
+        """
+        Initialize watcher.
+
+        Args:
+            loader: Model loader whose "latest" models are kept current
+        """
+        self.loader = loader
+        self.category = loader.category
+        self._manifest_mtime: Optional[float] = loader.model_manager.manifest_mtime(self.category)
+        # Versions that failed validation are not retried until republished
+        self._rejected: Set[Tuple[str, str]] = set()
+        self._attempts: Dict[Tuple[str, str], int] = {}
+        self.last_check: Optional[datetime] = None
+        self.history: List[Dict[str, Any]] = []
+
+    def _record(self, model_name: str, version: str, status: str, detail: str = "") -> None:
+        self.history.append({
+            "model_name": model_name,
+            "version": version,
+            "status": status,
+            "detail": detail,
+            "at": datetime.utcnow().isoformat(),
+        })
+        del self.history[:-self.MAX_HISTORY]
+
+    def _validate(self, model_name: str, version: str) -> Tuple[Optional[Any], bool]:
+        """
+        Load a version and return it only if it passes checksum and smoke tests.
+
+        Returns:
+            (model or None, whether a failure is final rather than worth retrying)
+        """
+        manager = self.loader.model_manager
+
+        # Same rule as ModelManager.load_model: no recorded checksum loads with a warning
+        checksum_valid = manager.check_model_checksum(model_name, self.category, version)
+        if checksum_valid is False:
+            return None, self._failed(model_name, version, "checksum mismatch")
+        if checksum_valid is None:
+            logger.warning(f"{model_name} v{version} has no checksum to verify, validating by smoke inference only")
+
+        model = self.loader.build(model_name, version)
+        if model is None:
+            return None, self._failed(model_name, version, "load failed")
+
+        try:
+            run_smoke_inference(model)
+        except Exception as e:
+            self._record(model_name, version, "rejected", f"smoke inference failed: {str(e)}")
+            return None, True
+
+        self._attempts.pop((model_name, version), None)
+        return model, False
+
+    def _failed(self, model_name: str, version: str, detail: str) -> bool:
+        """Count a checksum or load failure; True once the version has used up its attempts."""
+        key = (model_name, version)
+        self._attempts[key] = self._attempts.get(key, 0) + 1
+        if self._attempts[key] < self.MAX_ATTEMPTS:
+            self._record(model_name, version, "retrying", detail)
+            return False
+        del self._attempts[key]
+        self._record(model_name, version, "rejected", detail)
+        return True
+
+    def check(self) -> List[str]:
+        """
+        Check the manifest once and swap any changed latest versions (blocking).
+
+        Returns:
+            Names of the models that were swapped
+        """
+        self.last_check = datetime.utcnow()
+        manager = self.loader.model_manager
+        mtime = manager.manifest_mtime(self.category)
+        if mtime is None or mtime == self._manifest_mtime:
+            return []
+
+        manifest = manager.refresh_manifest(self.category)
+        swapped = []
+        pending = False
+        for model_name, entry in manifest.get("models", {}).items():
+            current = self.loader.get_loaded_version(model_name)
+            latest = entry.get("latest")
+            # Models never loaded pick up the new version on first use
+            if current is None or latest is None or latest == current:
+                continue
+            if (model_name, latest) in self._rejected:
+                continue
+
+            logger.info(f"New version of {model_name}: {current} -> {latest}, validating")
+            model, final = self._validate(model_name, latest)
+            if model is None:
+                if final:
+                    self._rejected.add((model_name, latest))
+                    logger.error(f"Keeping {model_name} v{current}: v{latest} failed validation")
+                else:
+                    pending = True
+                    logger.warning(f"Keeping {model_name} v{current}: v{latest} not valid yet, retrying")
+                continue
+
+            self.loader.swap_latest(model_name, model, latest)
+            self._record(model_name, latest, "swapped", f"from {current}")
+            swapped.append(model_name)
+
+        # Only a manifest fully handled (swapped or rejected) is skipped on later polls
+        if not pending:
+            self._manifest_mtime = mtime
+        return swapped
+
+    async def run(self, interval_seconds: float = 30) -> None:
+        """
+        Poll the manifest until cancelled.
+
+        Args:
+            interval_seconds: Time between manifest checks
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error(f"Model watcher check failed for {self.category}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get watcher statistics for monitoring.
+
+        Returns:
+            Dictionary with served versions and recent swap history
+        """
+        return {
+            "category": self.category,
+            "last_check": self.last_check.isoformat() if self.last_check else None,
+            "loaded_versions": dict(self.loader.loaded_versions),
+            "history": list(self.history),
+        }
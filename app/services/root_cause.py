@@ -0,0 +1,267 @@
+"""
+Combined root-cause analysis for an incident.
+
+Triage of one incident needs the network, hub antenna, satellite and link
+analyses that apply to it. Run one after another on a single session, the
+caller waits for the sum of them. Here every applicable analysis runs
+concurrently on a bounded thread pool, each with its own session from the
+connection pool, so the caller waits for the slowest one. The patterns of
+all analyses are ranked into root-cause candidates by confidence.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.correlation_engine import CorrelationAnalysis
+from app.services.topology_index import Topology
+
+logger = logging.getLogger(__name__)
+
+ROOT_CAUSE_SCOPES = ('network', 'hub_antenna', 'satellite', 'link')
+
+# (db, scope, scope_id) -> (analysis or None, cache metadata)
+ScopeAnalysis = Callable[[Session, str, Any], Tuple[Optional[CorrelationAnalysis], Dict[str, Any]]]
+
+
+@dataclass
+class ScopeOutcome:
+    """Outcome of one scope's analysis."""
+
+    scope: str
+    scope_id: Any
+    status: str  # 'completed', 'not_applicable', 'failed', 'timeout'
+    duration_ms: float = 0.0
+    analysis: Optional[CorrelationAnalysis] = None
+    cache: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'scope': self.scope,
+            'scope_id': self.scope_id,
+            'status': self.status,
+            'duration_ms': round(self.duration_ms, 1),
+            'analysis': self.analysis.to_dict() if self.analysis else None,
+            'cache': self.cache,
+            'error': self.error,
+        }
+
+
+@dataclass
+class RootCauseReport:
+    """Analyses of every applicable scope and their ranked root-cause candidates."""
+
+    incident: Dict[str, Any]
+    outcomes: List[ScopeOutcome]
+    candidates: List[Dict]
+    elapsed_ms: float
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'incident': self.incident,
+            'candidates': self.candidates,
+            'analyses': [outcome.to_dict() for outcome in self.outcomes],
+            'elapsed_ms': round(self.elapsed_ms, 1),
+            # What running the analyses one after another would have taken
+            'sequential_ms': round(sum(outcome.duration_ms for outcome in self.outcomes), 1),
+            'timestamp': self.timestamp.isoformat(),
+        }
+
+
+def plan_scopes(
+    topology: Topology,
+    link_id: Optional[int] = None,
+    network_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    satellite_name: Optional[str] = None
+) -> List[Tuple[str, Any]]:
+    """
+    Scopes whose analyses apply to an incident.
+
+    A link brings in its network, its site if that is a hub antenna, its
+    satellite (link_type) and the link itself; explicit scopes are added.
+
+    Args:
+        topology: Topology snapshot
+        link_id: Link the incident was reported on
+        network_id: Network to analyze
+        site_id: Hub antenna site to analyze
+        satellite_name: Satellite to analyze
+
+    Returns:
+        Unique (scope, scope_id) pairs in ROOT_CAUSE_SCOPES order
+    """
+    scopes = {scope: [] for scope in ROOT_CAUSE_SCOPES}
+    if link_id is not None:
+        for link in topology.links([link_id]):
+            scopes['network'].append(link.network_id)
+            if topology.is_hub(link.site_id):
+                scopes['hub_antenna'].append(link.site_id)
+            if link.link_type:
+                scopes['satellite'].append(link.link_type)
+        scopes['link'].append(link_id)
+    if network_id is not None:
+        scopes['network'].append(network_id)
+    if site_id is not None:
+        scopes['hub_antenna'].append(site_id)
+    if satellite_name:
+        scopes['satellite'].append(satellite_name)
+
+    return [
+        (scope, scope_id)
+        for scope in ROOT_CAUSE_SCOPES
+        for scope_id in dict.fromkeys(scopes[scope])
+    ]
+
+
+def rank_candidates(outcomes: List[ScopeOutcome]) -> List[Dict]:
+    """
+    Patterns of all analyses as root-cause candidates, most confident first.
+
+    Ties are broken by severity.
+    """
+    candidates = [
+        {'scope': outcome.scope, 'scope_id': outcome.scope_id, **pattern.to_dict()}
+        for outcome in outcomes if outcome.analysis is not None
+        for pattern in outcome.analysis.patterns_found
+    ]
+    candidates.sort(key=lambda c: (c['confidence'], c['severity']), reverse=True)
+    for rank, candidate in enumerate(candidates, start=1):
+        candidate['rank'] = rank
+    return candidates
+
+
+class RootCauseAnalyzer:
+    """Runs the analyses of an incident concurrently on a bounded thread pool."""
+
+    def __init__(self, max_workers: int = 4, timeout_seconds: float = 30.0):
+        """
+        Initialize analyzer.
+
+        Args:
+            max_workers: Concurrent analyses, and so sessions taken from the pool
+            timeout_seconds: Time to wait for all analyses of one incident
+        """
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers: int, timeout_seconds: float) -> None:
+        """Change pool size and timeout; the pool is recreated on next use."""
+        self.shutdown()
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_workers), thread_name_prefix="root-cause"
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the pool; running analyses finish, queued ones are dropped."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run_scope(
+        session_factory: Callable[[], Session],
+        analyze: ScopeAnalysis,
+        scope: str,
+        scope_id: Any
+    ) -> ScopeOutcome:
+        """Run one analysis on its own session."""
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            analysis, cache = analyze(db, scope, scope_id)
+            status = 'completed' if analysis is not None else 'not_applicable'
+            return ScopeOutcome(scope, scope_id, status, analysis=analysis, cache=cache,
+                                duration_ms=(time.perf_counter() - started) * 1000)
+        except Exception as e:
+            logger.error(f"Root-cause analysis of {scope} {scope_id} failed: {e}")
+            return ScopeOutcome(scope, scope_id, 'failed', error=str(e),
+                                duration_ms=(time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+
+    def run(
+        self,
+        scopes: List[Tuple[str, Any]],
+        session_factory: Callable[[], Session],
+        analyze: ScopeAnalysis,
+        incident: Optional[Dict[str, Any]] = None
+    ) -> RootCauseReport:
+        """
+        Run the analyses of every scope concurrently and rank their patterns.
+
+        Analyses still running after timeout_seconds are reported as
+        'timeout' and left to finish in the background.
+
+        Args:
+            scopes: (scope, scope_id) pairs, e.g. from plan_scopes
+            session_factory: Creates one database session per analysis (e.g. SessionLocal)
+            analyze: Runs one scope's analysis on a session
+            incident: Incident description echoed in the report
+
+        Returns:
+            RootCauseReport with per-scope outcomes and ranked candidates
+        """
+        started = time.perf_counter()
+        pool = self._pool()
+        futures = [
+            pool.submit(self._run_scope, session_factory, analyze, scope, scope_id)
+            for scope, scope_id in scopes
+        ]
+        wait(futures, timeout=self.timeout_seconds)
+
+        outcomes = []
+        for (scope, scope_id), future in zip(scopes, futures):
+            if future.done():
+                outcomes.append(future.result())
+            else:
+                future.cancel()
+                outcomes.append(ScopeOutcome(
+                    scope, scope_id, 'timeout', duration_ms=self.timeout_seconds * 1000,
+                    error=f"Not finished within {self.timeout_seconds}s"
+                ))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Root-cause analysis of {len(scopes)} scopes in {elapsed_ms:.0f} ms")
+        return RootCauseReport(
+            incident=incident or {},
+            outcomes=outcomes,
+            candidates=rank_candidates(outcomes),
+            elapsed_ms=elapsed_ms
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "timeout_seconds": self.timeout_seconds,
+            "running": self._executor is not None,
+        }
+
+
+# Global root-cause analyzer
+root_cause_analyzer = RootCauseAnalyzer()
+
+
+def get_root_cause_analyzer() -> RootCauseAnalyzer:
+    """Get the global root-cause analyzer."""
+    return root_cause_analyzer
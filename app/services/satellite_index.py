@@ -0,0 +1,123 @@
+"""
+In-memory satellite -> link index.
+
+Satellite analyses used to find a satellite's links with
+`link_type ILIKE '%name%'`, which cannot use a b-tree index and scans the
+links table on every call. This index maps normalized satellite names
+(link_type, trimmed and lower-cased) to their link IDs. It is derived from
+the link_type column of a Topology snapshot rather than its own links
+query, so it is rebuilt exactly when the topology index is (link writes
+through the ORM, or its REFRESH_SECONDS for writes from other processes)
+and every detector sees the same link -> satellite mapping.
+
+Lookups keep the substring semantics of the ILIKE; each distinct name is
+resolved once per topology snapshot and memoized, so repeated lookups are
+dictionary hits.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.topology_index import Topology, TopologyIndex, get_topology_index
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_satellite(name: Optional[str]) -> str:
+    """Normalized satellite key of a link_type or requested satellite name."""
+    return (name or '').strip().lower()
+
+
+class SatelliteLinkIndex:
+    """Satellite name -> link IDs of the current topology snapshot, served from memory."""
+
+    # Bound on memoized name lookups per topology snapshot
+    MAX_MEMOIZED = 1024
+
+    def __init__(self, topology: Optional[TopologyIndex] = None):
+        """
+        Args:
+            topology: Topology index the satellites are read from (default: the global index)
+        """
+        self.topology = topology or get_topology_index()
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Topology] = None
+        self._links: Dict[str, Tuple[int, ...]] = {}
+        self._names: Dict[str, str] = {}
+        self._matches: Dict[str, Tuple[int, ...]] = {}
+
+    def is_stale(self) -> bool:
+        return self.topology.is_stale()
+
+    def _sync(self, topology: Topology) -> None:
+        """Rebuild the satellite map if it was derived from another snapshot (caller holds the lock)."""
+        if topology is self._snapshot:
+            return
+        links: Dict[str, List[int]] = {}
+        names: Dict[str, str] = {}
+        for link_id, link_type in zip(topology.link_ids.tolist(), topology.link_type.tolist()):
+            key = normalize_satellite(link_type)
+            if not key:
+                continue
+            links.setdefault(key, []).append(link_id)
+            # Display the first spelling seen
+            names.setdefault(key, link_type.strip())
+
+        # Topology link IDs are sorted, so each tuple is too
+        self._links = {key: tuple(link_ids) for key, link_ids in links.items()}
+        self._names = names
+        self._matches = {}
+        self._snapshot = topology
+        logger.debug(f"Satellite index rebuilt from topology of {topology.built_at}: {len(links)} satellites")
+
+    def links_for(self, db: Optional[Session], satellite_name: str) -> List[int]:
+        """
+        Link IDs whose link_type contains the satellite name (case-insensitive).
+
+        Args:
+            db: Database session used to rebuild a stale topology, None to use it as is
+            satellite_name: Satellite name/identifier
+
+        Returns:
+            Sorted link IDs, empty if no link matches
+        """
+        topology = self.topology.get(db)
+
+        needle = normalize_satellite(satellite_name)
+        with self._lock:
+            self._sync(topology)
+            matches = self._matches.get(needle)
+            if matches is None:
+                matches = tuple(sorted(
+                    link_id
+                    for key, link_ids in self._links.items() if needle in key
+                    for link_id in link_ids
+                ))
+                if len(self._matches) >= self.MAX_MEMOIZED:
+                    self._matches.clear()
+                self._matches[needle] = matches
+        return list(matches)
+
+    def groups(self, topology: Optional[Topology] = None) -> Dict[str, Tuple[int, ...]]:
+        """
+        Link IDs of every satellite, keyed by display name.
+
+        Args:
+            topology: Snapshot to group (default: the topology index's current one)
+        """
+        topology = topology or self.topology.get()
+        with self._lock:
+            self._sync(topology)
+            return {self._names[key]: link_ids for key, link_ids in self._links.items()}
+
+
+# Global satellite index
+satellite_index = SatelliteLinkIndex()
+
+
+def get_satellite_index() -> SatelliteLinkIndex:
+    """Get the global satellite -> link index."""
+    return satellite_index
@@ -0,0 +1,102 @@
+"""
+Single-flight deduplication of concurrent expensive calls.
+
+When several callers ask for the same key at once (e.g. a cold model cache
+after a deploy), only the first one runs the work; the others wait for its
+result instead of training or unpickling their own copy. Sync and asyncio
+callers share the same in-flight futures, so they deduplicate together.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Per-key in-flight call registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return the in-flight future for key and whether the caller leads."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[..., Any], args, kwargs) -> None:
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._release(key, future)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn once per key among concurrent callers (blocking).
+
+        Args:
+            key: Deduplication key
+            fn: Function producing the value
+
+        Returns:
+            The value produced by the leading call
+        """
+        future, leader = self._claim(key)
+        if leader:
+            self._run(key, future, fn, args, kwargs)
+        else:
+            logger.debug(f"Waiting on in-flight call for {key}")
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn once per key among concurrent callers without blocking the loop.
+
+        Blocking functions run in the default executor; coroutine functions
+        are awaited directly by the leading caller.
+
+        Args:
+            key: Deduplication key
+            fn: Function or coroutine function producing the value
+
+        Returns:
+            The value produced by the leading call
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            logger.debug(f"Waiting on in-flight call for {key}")
+            return await asyncio.wrap_future(future)
+
+        if asyncio.iscoroutinefunction(fn):
+            try:
+                future.set_result(await fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._release(key, future)
+        else:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._run, key, future, fn, args, kwargs)
+
+        return await asyncio.wrap_future(future)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
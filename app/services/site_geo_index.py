@@ -0,0 +1,315 @@
+"""
+Geospatial index of site locations.
+
+Offshore weather and rain fade degrade sites that are close to each other,
+whatever network or hub they belong to. Sites are indexed by their latitude
+and longitude (from the sites table, with Entities.csv filling in sites the
+table has no coordinates for once a data directory is configured) in a KD-tree over unit
+vectors on the sphere: the great-circle distance d between two sites maps to
+the chord 2 * sin(d / 2R), so "within r km" is a Euclidean ball query on the
+tree, answered in roughly logarithmic time without comparing every pair of
+sites and without distortion near the poles or the antimeridian.
+
+Like the other in-memory indexes, it is rebuilt after sites are written
+through the ORM or after REFRESH_SECONDS, and every build is an immutable
+SiteLocations snapshot.
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Mean Earth radius
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """(n, 3) unit vectors of latitude/longitude pairs in degrees."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(radius_km: float) -> float:
+    """Chord between two unit vectors radius_km apart on the Earth's surface."""
+    return 2.0 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def great_circle_km(points: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Great-circle distance between unit vectors, row by row (broadcasts)."""
+    chord = np.linalg.norm(points - other, axis=-1)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+@dataclass(frozen=True)
+class SiteLocations:
+    """Immutable KD-tree snapshot of site locations."""
+
+    site_ids: np.ndarray   # (n,) int64, sorted
+    latitude: np.ndarray   # (n,) degrees
+    longitude: np.ndarray  # (n,) degrees
+    points: np.ndarray     # (n, 3) unit vectors
+    tree: "scipy.spatial.cKDTree"
+    built_at: datetime
+
+    @classmethod
+    def from_arrays(cls, site_ids: Sequence, latitude: Sequence, longitude: Sequence) -> 'SiteLocations':
+        """
+        Build from parallel arrays; sites without both coordinates are skipped.
+
+        Args:
+            site_ids: Site IDs
+            latitude: Latitudes in degrees (None/NaN when unknown)
+            longitude: Longitudes in degrees (None/NaN when unknown)
+        """
+        from scipy.spatial import cKDTree
+
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        lat = np.array([np.nan if v is None else float(v) for v in latitude], dtype=np.float64)
+        lon = np.array([np.nan if v is None else float(v) for v in longitude], dtype=np.float64)
+        located = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+
+        order = np.argsort(site_ids[located], kind='stable')
+        site_ids, lat, lon = site_ids[located][order], lat[located][order], lon[located][order]
+        points = to_unit_vectors(lat, lon)
+        return cls(site_ids, lat, lon, points, cKDTree(points), datetime.utcnow())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> 'SiteLocations':
+        """Build from rows or objects with site_id, latitude and longitude (e.g. Site)."""
+        rows = list(rows)
+        return cls.from_arrays(
+            [row.site_id for row in rows], [row.latitude for row in rows], [row.longitude for row in rows]
+        )
+
+    @classmethod
+    def from_entities(cls, entities: "pd.DataFrame") -> 'SiteLocations':
+        """Build from the Entities.csv frame (siteid, sitelatitude, sitelongitude; see DataLoader.get_site_locations)."""
+        sites = entities[['siteid', 'sitelatitude', 'sitelongitude']].drop_duplicates('siteid')
+        return cls.from_arrays(
+            sites['siteid'].to_numpy(), sites['sitelatitude'].to_numpy(), sites['sitelongitude'].to_numpy()
+        )
+
+    def __len__(self) -> int:
+        return len(self.site_ids)
+
+    def position(self, site_id: int) -> int:
+        """Position of a site, -1 if it has no known location."""
+        position = int(np.searchsorted(self.site_ids, site_id))
+        if position < len(self.site_ids) and self.site_ids[position] == site_id:
+            return position
+        return -1
+
+    def location(self, site_id: int) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of a site, None if unknown."""
+        position = self.position(site_id)
+        if position < 0:
+            return None
+        return float(self.latitude[position]), float(self.longitude[position])
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Sorted IDs of the sites within radius_km of a point."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        center = to_unit_vectors([latitude], [longitude])[0]
+        found = self.tree.query_ball_point(center, chord_length(radius_km))
+        return np.sort(self.site_ids[found])
+
+    def neighbors(self, site_id: int, radius_km: float) -> np.ndarray:
+        """Sorted IDs of the other sites within radius_km of a site."""
+        location = self.location(site_id)
+        if location is None:
+            return np.empty(0, dtype=np.int64)
+        found = self.within(*location, radius_km)
+        return found[found != site_id]
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5) -> List[Tuple[int, float]]:
+        """Up to k closest sites to a point, as (site ID, distance in km)."""
+        if not len(self):
+            return []
+        center = to_unit_vectors([latitude], [longitude])[0]
+        _, found = self.tree.query(center, k=min(k, len(self)))
+        found = np.atleast_1d(found)
+        distances = great_circle_km(self.points[found], center)
+        return [(int(site_id), round(float(km), 3)) for site_id, km in zip(self.site_ids[found], distances)]
+
+    def regions(self, site_ids: Sequence[int], radius_km: float, min_sites: int = 2) -> List[np.ndarray]:
+        """
+        Group sites chained together by distances of at most radius_km.
+
+        Only the given sites are indexed, so grouping the degraded sites of
+        one hour costs O(k log k) in their number k, not in the fleet size.
+
+        Args:
+            site_ids: Sites to group; sites without a location are ignored
+            radius_km: Maximum distance between neighbouring sites of a region
+            min_sites: Smallest region reported
+
+        Returns:
+            Sorted site ID arrays of every region, largest first
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import cKDTree
+
+        positions = self._located(site_ids)
+        if len(positions) < max(min_sites, 2):
+            return []
+
+        pairs = cKDTree(self.points[positions]).query_pairs(chord_length(radius_km), output_type='ndarray')
+        if not len(pairs):
+            return []
+        n = len(positions)
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        sizes = np.bincount(labels)
+        order = np.argsort(labels, kind='stable')
+        groups = np.split(order, np.cumsum(sizes)[:-1])
+        # Positions are in site ID order, so every group is sorted
+        return sorted(
+            (self.site_ids[positions[group]] for group in groups if len(group) >= max(min_sites, 2)),
+            key=len, reverse=True
+        )
+
+    def _located(self, site_ids: Sequence[int]) -> np.ndarray:
+        """Positions of the given sites that have a location."""
+        site_ids = np.unique(np.asarray(site_ids, dtype=np.int64))
+        if not len(self.site_ids):
+            return np.empty(0, dtype=np.int64)
+        positions = np.clip(np.searchsorted(self.site_ids, site_ids), 0, len(self.site_ids) - 1)
+        return positions[self.site_ids[positions] == site_ids]
+
+    def extent_km(self, site_ids: Sequence[int]) -> Tuple[float, float, float]:
+        """
+        Centroid and extent of a group of sites.
+
+        Returns:
+            (centroid latitude, centroid longitude, largest distance from the centroid in km)
+        """
+        points = self.points[self._located(site_ids)]
+        center = points.mean(axis=0)
+        center /= np.linalg.norm(center)
+        latitude = math.degrees(math.asin(float(np.clip(center[2], -1.0, 1.0))))
+        longitude = math.degrees(math.atan2(float(center[1]), float(center[0])))
+        return latitude, longitude, float(great_circle_km(points, center).max())
+
+
+class SiteGeoIndex:
+    """Keeps the current SiteLocations snapshot fresh."""
+
+    # Rebuild at most this long after the last build, for writes made outside this process
+    REFRESH_SECONDS = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locations: Optional[SiteLocations] = None
+        self._dirty = True
+        self._watching = False
+        self.data_dir: Optional[str] = None
+
+    def configure(self, data_dir: Optional[str]) -> None:
+        """
+        Also read site coordinates from Entities.csv.
+
+        Args:
+            data_dir: Data directory holding Entities.csv (None: sites table only)
+        """
+        self.data_dir = data_dir
+        self._dirty = True
+
+    def invalidate(self, *args) -> None:
+        """Mark the index for rebuild on the next lookup (mapper event signature)."""
+        self._dirty = True
+
+    def is_stale(self) -> bool:
+        return (
+            self._dirty
+            or self._locations is None
+            or datetime.utcnow() - self._locations.built_at > timedelta(seconds=self.REFRESH_SECONDS)
+        )
+
+    def load(self, locations: SiteLocations) -> SiteLocations:
+        """Install a snapshot, e.g. SiteLocations.from_entities for Entities.csv."""
+        with self._lock:
+            self._locations = locations
+            self._dirty = False
+        logger.info(f"Site geo index rebuilt: {len(locations)} located sites")
+        return locations
+
+    def refresh(self, db: Session) -> SiteLocations:
+        """Rebuild the snapshot from the sites table, then Entities.csv for the sites it lacks."""
+        from app.models.bcom_models import Site
+
+        self._watch_site_writes()
+        self._dirty = False
+        rows = db.query(Site.site_id, Site.latitude, Site.longitude).filter(
+            Site.latitude.isnot(None), Site.longitude.isnot(None)
+        ).all()
+        site_ids = [row.site_id for row in rows]
+        latitude = [row.latitude for row in rows]
+        longitude = [row.longitude for row in rows]
+
+        entities = self._entity_locations()
+        if entities is not None:
+            # Coordinates in the sites table take precedence
+            missing = ~np.isin(entities.site_ids, np.asarray(site_ids, dtype=np.int64))
+            site_ids += entities.site_ids[missing].tolist()
+            latitude += entities.latitude[missing].tolist()
+            longitude += entities.longitude[missing].tolist()
+
+        return self.load(SiteLocations.from_arrays(site_ids, latitude, longitude))
+
+    def _entity_locations(self) -> Optional[SiteLocations]:
+        """Site locations from Entities.csv, None if no data directory is configured or it cannot be read."""
+        if self.data_dir is None:
+            return None
+        from app.services.data_loader import get_data_loader
+
+        try:
+            return SiteLocations.from_entities(get_data_loader(self.data_dir).get_site_locations())
+        except Exception as e:
+            logger.warning(f"Site locations from Entities.csv unavailable: {str(e)}")
+            return None
+
+    def get(self, db: Optional[Session] = None) -> SiteLocations:
+        """
+        Current snapshot, rebuilt first if stale.
+
+        Args:
+            db: Database session used to rebuild a stale index, None to use it as is
+        """
+        if db is not None and self.is_stale():
+            return self.refresh(db)
+        with self._lock:
+            locations = self._locations
+        if locations is None:
+            raise RuntimeError("Site geo index has not been built yet")
+        return locations
+
+    def _watch_site_writes(self) -> None:
+        """Invalidate the index whenever a site is written through the ORM."""
+        if self._watching:
+            return
+        from sqlalchemy import event
+        from app.models.bcom_models import Site
+
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(Site, name, self.invalidate)
+        self._watching = True
+
+
+# Global site geo index
+site_geo_index = SiteGeoIndex()
+
+
+def get_site_geo_index() -> SiteGeoIndex:
+    """Get the global site geo index."""
+    return site_geo_index
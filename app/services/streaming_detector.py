@@ -0,0 +1,461 @@
+"""
+Online streaming anomaly scoring for BCom Offshore KPI and grade streams.
+
+Keeps constant-memory incremental statistics per entity (device, link or
+network) so each new data point is scored as it arrives instead of refitting
+a batch model over the full window:
+- Welford running mean/variance (long-term baseline), O(1) per point
+- EWMA mean/variance (short-term, drift-tracking baseline), O(1) per point
+- Rolling median/MAD over a fixed-size window of w points (robust to
+  outliers): the window is also kept sorted, so the median is a lookup and
+  the MAD a binary search over the deviations on either side of it,
+  O(log w); keeping it sorted costs a bisection plus a list insert/delete,
+  an O(w) memmove that is negligible at the default w = 64
+
+A pre-trained model can optionally be attached to confirm flagged points and
+to re-check the recent window periodically (register_model_confirmers wires
+in the anomaly model loader).
+"""
+
+import logging
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from datetime import datetime
+from statistics import NormalDist
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Consistency constant turning MAD into a standard-deviation estimate
+MAD_SCALE = 1.4826
+
+# Confirmer: feature dicts -> one flag per row (True = anomalous), or None
+# when no model is available
+Confirmer = Callable[[List[Dict[str, float]]], Optional[List[bool]]]
+
+
+def _median_abs_deviation(ordered: List[float], center: float) -> float:
+    """
+    Median of |v - center| over a sorted list, in O(log n).
+
+    The deviations left of the center, read right to left, and those right
+    of it, read left to right, are two ascending sequences; the middle
+    order statistics of their union are found by binary search.
+    """
+    split = bisect_left(ordered, center)
+    n_left, n_right = split, len(ordered) - split
+
+    def left(i: int) -> float:
+        return center - ordered[split - 1 - i]
+
+    def right(j: int) -> float:
+        return ordered[split + j] - center
+
+    def kth(k: int) -> float:
+        # Smallest count i taken from the left such that the k + 1 smallest
+        # deviations are the first i left and the first k + 1 - i right ones
+        lo, hi = max(0, k + 1 - n_right), min(k + 1, n_left)
+        while lo < hi:
+            i = (lo + hi) // 2
+            if right(k - i) > left(i):
+                lo = i + 1
+            else:
+                hi = i
+        j = k + 1 - lo
+        return max(left(lo - 1) if lo else -math.inf, right(j - 1) if j else -math.inf)
+
+    n = len(ordered)
+    return (kth((n - 1) // 2) + kth(n // 2)) / 2
+
+
+class FeatureStats:
+    """Incremental statistics for a single metric of a single entity."""
+
+    __slots__ = ("count", "mean", "m2", "ewma_mean", "ewma_var", "window", "ordered")
+
+    def __init__(self, window_size: int):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma_mean = 0.0
+        self.ewma_var = 0.0
+        self.window: Deque[float] = deque(maxlen=window_size)
+        # Same values as window, sorted
+        self.ordered: List[float] = []
+
+    @property
+    def variance(self) -> float:
+        """Welford sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def robust_center(self) -> Tuple[float, float]:
+        """Return (median, MAD) of the rolling window."""
+        ordered = self.ordered
+        n = len(ordered)
+        if not n:
+            return 0.0, 0.0
+        center = (ordered[(n - 1) // 2] + ordered[n // 2]) / 2
+        return center, _median_abs_deviation(ordered, center)
+
+    def z_scores(self, value: float) -> Dict[str, float]:
+        """Score a value against the current state without updating it."""
+        scores = {}
+
+        welford_std = math.sqrt(self.variance)
+        scores["welford"] = abs(value - self.mean) / welford_std if welford_std > 0 else 0.0
+
+        ewma_std = math.sqrt(self.ewma_var)
+        scores["ewma"] = abs(value - self.ewma_mean) / ewma_std if ewma_std > 0 else 0.0
+
+        # A window without spread carries no robust information, so fall back
+        # to the EWMA score rather than reporting zero
+        center, mad = self.robust_center()
+        robust_std = mad * MAD_SCALE
+        scores["robust"] = abs(value - center) / robust_std if robust_std > 0 else scores["ewma"]
+
+        return scores
+
+    def update(self, value: float, alpha: float) -> None:
+        """Fold a new value into the running statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if self.count == 1:
+            self.ewma_mean = value
+            self.ewma_var = 0.0
+        else:
+            diff = value - self.ewma_mean
+            increment = alpha * diff
+            self.ewma_mean += increment
+            self.ewma_var = (1 - alpha) * (self.ewma_var + diff * increment)
+
+        if len(self.window) == self.window.maxlen:
+            del self.ordered[bisect_left(self.ordered, self.window[0])]
+        self.window.append(value)
+        insort(self.ordered, value)
+
+
+class EntityStreamState:
+    """Streaming state for one (entity_type, entity_id) pair."""
+
+    __slots__ = ("features", "points_seen", "last_timestamp", "recent")
+
+    def __init__(self, window_size: int):
+        self.features: Dict[str, FeatureStats] = {}
+        self.points_seen = 0
+        self.last_timestamp: Optional[datetime] = None
+        # Recent feature vectors kept for periodic model confirmation
+        self.recent: Deque[Dict[str, float]] = deque(maxlen=window_size)
+
+
+class StreamingAnomalyDetector:
+    """
+    Scores KPI/grade points one at a time against per-entity running statistics.
+
+    Each point is scored before it is folded into the state, so an outlier does
+    not mask itself. Memory per entity is bounded by the window size and the
+    number of tracked entities is bounded by max_entities (least recently
+    updated entities are dropped first).
+    """
+
+    ENTITY_TYPES = ("device", "link", "network")
+
+    def __init__(
+        self,
+        window_size: int = 64,
+        ewma_alpha: float = 0.1,
+        min_points: int = 10,
+        max_entities: int = 50000,
+        confirm_interval: int = 0,
+    ):
+        """
+        Initialize streaming detector.
+
+        Args:
+            window_size: Number of points kept for rolling median/MAD
+            ewma_alpha: Smoothing factor for the EWMA baseline (0-1)
+            min_points: Points required before an entity can raise anomalies
+            max_entities: Maximum number of entities tracked at once
+            confirm_interval: Re-check the recent window with the confirmation
+                model every N points (0 disables periodic confirmation)
+        """
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.min_points = min_points
+        self.max_entities = max_entities
+        self.confirm_interval = confirm_interval
+        self._states: "OrderedDict[Tuple[str, str], EntityStreamState]" = OrderedDict()
+        self._confirmers: Dict[str, Confirmer] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, confirm_interval: int) -> None:
+        """
+        Update the periodic confirmation interval.
+
+        Args:
+            confirm_interval: Re-check the recent window with the confirmation
+                model every N points (0 disables periodic confirmation)
+        """
+        self.confirm_interval = confirm_interval
+
+    @staticmethod
+    def threshold_for_sensitivity(sensitivity: float) -> float:
+        """
+        Map sensitivity to a z-score threshold.
+
+        Follows the batch detectors, where (1 - sensitivity) is the expected
+        proportion of outliers: 0.95 -> ~1.96, 0.99 -> ~2.58.
+        """
+        sensitivity = min(max(sensitivity, 0.5), 0.9999)
+        return NormalDist().inv_cdf(1 - (1 - sensitivity) / 2)
+
+    def register_confirmer(self, entity_type: str, confirmer: Confirmer) -> None:
+        """
+        Attach a full-model confirmation callback for an entity type.
+
+        Args:
+            entity_type: 'device', 'link' or 'network'
+            confirmer: Callable taking a list of feature dicts and returning
+                one boolean per row (True = anomalous), or None when it has
+                no model to confirm with
+        """
+        self._confirmers[entity_type] = confirmer
+
+    def register_model_confirmers(self, loader: Any) -> None:
+        """
+        Confirm with the pre-trained detectors of an anomaly model loader.
+
+        The model is looked up on every confirmation, so hot-swapped versions
+        are picked up and entity types without a published model report no
+        confirmation.
+
+        Args:
+            loader: AnomalyDetectorModelLoader
+        """
+        loaders = {
+            "device": loader.load_device_detector,
+            "link": loader.load_link_detector,
+            "network": loader.load_network_detector,
+        }
+        for entity_type, load_model in loaders.items():
+            self.register_confirmer(entity_type, model_confirmer(load_model))
+
+    def _get_state(self, key: Tuple[str, str]) -> EntityStreamState:
+        state = self._states.get(key)
+        if state is None:
+            state = EntityStreamState(self.window_size)
+            self._states[key] = state
+            if len(self._states) > self.max_entities:
+                evicted_key, _ = self._states.popitem(last=False)
+                logger.debug(f"Dropped streaming state for {evicted_key}")
+        else:
+            self._states.move_to_end(key)
+        return state
+
+    def score_point(
+        self,
+        entity_type: str,
+        entity_id: Any,
+        metrics: Dict[str, float],
+        timestamp: Optional[datetime] = None,
+        sensitivity: float = 0.95,
+    ) -> Dict[str, Any]:
+        """
+        Score a single point and update the entity's running state.
+
+        Args:
+            entity_type: 'device', 'link' or 'network'
+            entity_id: Entity identifier
+            metrics: Metric name -> numeric value for this point
+            timestamp: Point timestamp (defaults to now)
+            sensitivity: Detection sensitivity (0.5-1.0)
+
+        Returns:
+            Dict with anomaly flag, score, per-metric z-scores and confirmation info
+        """
+        if entity_type not in self.ENTITY_TYPES:
+            raise ValueError(f"Unsupported entity type: {entity_type}")
+
+        threshold = self.threshold_for_sensitivity(sensitivity)
+        timestamp = timestamp or datetime.utcnow()
+        values = {
+            name: float(value)
+            for name, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+        }
+        if not values:
+            raise ValueError("No numeric metrics in data point")
+
+        key = (entity_type, str(entity_id))
+        with self._lock:
+            state = self._get_state(key)
+            warmed_up = state.points_seen >= self.min_points
+
+            metric_scores: Dict[str, Dict[str, float]] = {}
+            affected_metrics = []
+            point_score = 0.0
+            for name, value in values.items():
+                stats = state.features.get(name)
+                if stats is None:
+                    stats = FeatureStats(self.window_size)
+                    state.features[name] = stats
+
+                scores = stats.z_scores(value) if stats.count else {"welford": 0.0, "ewma": 0.0, "robust": 0.0}
+                metric_scores[name] = scores
+                # Require the short-term and robust baselines to agree, which
+                # suppresses alerts on a single noisy baseline
+                combined = min(scores["ewma"], scores["robust"])
+                if combined > threshold:
+                    affected_metrics.append(name)
+                point_score = max(point_score, combined)
+
+                stats.update(value, self.ewma_alpha)
+
+            state.points_seen += 1
+            state.last_timestamp = timestamp
+            state.recent.append(values)
+            points_seen = state.points_seen
+            recent = list(state.recent)
+
+        anomaly_detected = warmed_up and bool(affected_metrics)
+
+        confirmed = None
+        window_anomalies = None
+        confirmer = self._confirmers.get(entity_type)
+        if confirmer is not None:
+            try:
+                if anomaly_detected:
+                    flags = confirmer([values])
+                    confirmed = bool(flags[0]) if flags is not None else None
+                if self.confirm_interval and points_seen % self.confirm_interval == 0:
+                    flags = confirmer(recent)
+                    if flags is not None:
+                        window_anomalies = int(sum(bool(flag) for flag in flags))
+            except Exception as e:
+                logger.warning(f"Model confirmation failed for {key}: {str(e)}")
+
+        return {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "timestamp": timestamp,
+            "anomaly_detected": anomaly_detected,
+            "anomaly_score": float(point_score),
+            "threshold": float(threshold),
+            "affected_metrics": affected_metrics if anomaly_detected else [],
+            "metric_scores": metric_scores,
+            "points_seen": points_seen,
+            "warmed_up": warmed_up,
+            "model_confirmed": confirmed,
+            "window_model_anomalies": window_anomalies,
+        }
+
+    def get_entity_stats(self, entity_type: str, entity_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get the current running statistics for an entity.
+
+        Returns:
+            Dictionary of per-metric statistics or None if the entity is unknown
+        """
+        with self._lock:
+            state = self._states.get((entity_type, str(entity_id)))
+            if state is None:
+                return None
+
+            metrics = {}
+            for name, stats in state.features.items():
+                center, mad = stats.robust_center()
+                metrics[name] = {
+                    "count": stats.count,
+                    "mean": stats.mean,
+                    "std": math.sqrt(stats.variance),
+                    "ewma_mean": stats.ewma_mean,
+                    "ewma_std": math.sqrt(stats.ewma_var),
+                    "median": center,
+                    "mad": mad,
+                }
+
+            return {
+                "entity_type": entity_type,
+                "entity_id": str(entity_id),
+                "points_seen": state.points_seen,
+                "last_timestamp": state.last_timestamp.isoformat() if state.last_timestamp else None,
+                "metrics": metrics,
+            }
+
+    def reset(self, entity_type: Optional[str] = None, entity_id: Any = None) -> int:
+        """
+        Drop streaming state.
+
+        Args:
+            entity_type: Restrict to one entity type (None = all)
+            entity_id: Restrict to one entity (requires entity_type)
+
+        Returns:
+            Number of entity states removed
+        """
+        with self._lock:
+            if entity_type is None:
+                removed = len(self._states)
+                self._states.clear()
+                return removed
+
+            if entity_id is not None:
+                return 1 if self._states.pop((entity_type, str(entity_id)), None) else 0
+
+            keys = [key for key in self._states if key[0] == entity_type]
+            for key in keys:
+                del self._states[key]
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get detector statistics for monitoring.
+
+        Returns:
+            Dictionary with tracked entity counts per type
+        """
+        with self._lock:
+            by_type: Dict[str, int] = {}
+            for entity_type, _ in self._states:
+                by_type[entity_type] = by_type.get(entity_type, 0) + 1
+            return {
+                "tracked_entities": len(self._states),
+                "max_entities": self.max_entities,
+                "window_size": self.window_size,
+                "ewma_alpha": self.ewma_alpha,
+                "min_points": self.min_points,
+                "by_type": by_type,
+            }
+
+
+def model_confirmer(load_model: Callable[[], Optional[Any]]) -> Confirmer:
+    """
+    Confirmer backed by a pre-trained ModelPipeline.
+
+    Args:
+        load_model: Returns the current pipeline (e.g. a loader's
+            load_link_detector), or None if no model is published
+
+    Returns:
+        Confirmer flagging the rows the model predicts as outliers
+    """
+    def confirm(rows: List[Dict[str, float]]) -> Optional[List[bool]]:
+        model = load_model()
+        if model is None or not hasattr(model, "feature_matrix"):
+            return None
+        return (model.predict(model.feature_matrix(rows)) == -1).tolist()
+
+    return confirm
+
+
+# Global streaming detector instance
+streaming_detector = StreamingAnomalyDetector()
+
+
+def get_streaming_detector() -> StreamingAnomalyDetector:
+    """Get the global streaming detector instance."""
+    return streaming_detector
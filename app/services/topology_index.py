@@ -0,0 +1,367 @@
+"""
+In-memory topology index of customer -> network -> site -> link -> device.
+
+Entities are numbered densely per level (by ascending ID) and each
+parent -> children relation is stored CSR-style: an indptr array of length
+n_parents + 1 and one flat array of child positions, so "all links under X",
+"siblings of link Y" and shared-hub lookups are array slices instead of ORM
+relationship queries.
+
+The index is built with one column query per entity table and rebuilt after
+entities are written through the ORM, or after REFRESH_SECONDS for writes
+from other processes (e.g. scripts/ingest_simple.py). Each build produces an
+immutable Topology snapshot, so readers never see a half-built index.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGY_LEVELS = ('customer', 'network', 'site', 'link')
+
+
+class Adjacency(NamedTuple):
+    """CSR adjacency: children of parent i are indices[indptr[i]:indptr[i + 1]]."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @classmethod
+    def from_parents(cls, parent: np.ndarray, n_parents: int) -> 'Adjacency':
+        """Build from each child's parent position (-1 for an unknown parent)."""
+        valid = np.flatnonzero(parent >= 0)
+        # Stable sort keeps children in ascending position (and so ID) order
+        indices = valid[np.argsort(parent[valid], kind='stable')]
+        counts = np.bincount(parent[valid], minlength=n_parents)
+        indptr = np.zeros(n_parents + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(indptr, indices)
+
+    def children(self, position: int) -> np.ndarray:
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+class LinkRow(NamedTuple):
+    """Directory entry of one link."""
+
+    link_id: int
+    network_id: int
+    site_id: int
+    link_type: str
+
+
+def _positions(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Positions of values in the sorted ids array, -1 where absent."""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(ids):
+        return np.full(len(values), -1, dtype=np.int64)
+    positions = np.clip(np.searchsorted(ids, values), 0, len(ids) - 1)
+    return np.where(ids[positions] == values, positions, -1)
+
+
+def _sorted_ids(rows: Sequence, attr: str) -> np.ndarray:
+    return np.sort(np.array([getattr(row, attr) for row in rows], dtype=np.int64))
+
+
+@dataclass(frozen=True)
+class Topology:
+    """Immutable snapshot of the entity hierarchy."""
+
+    customer_ids: np.ndarray
+    network_ids: np.ndarray
+    site_ids: np.ndarray
+    link_ids: np.ndarray
+    device_ids: np.ndarray
+
+    site_is_hub: np.ndarray    # bool per site
+    link_network: np.ndarray   # network position per link
+    link_site: np.ndarray      # site position per link
+    link_type: np.ndarray      # link_type per link ('' when missing)
+    device_link: np.ndarray    # link position per device
+
+    customer_networks: Adjacency
+    network_links: Adjacency
+    site_links: Adjacency
+    link_devices: Adjacency
+
+    built_at: datetime
+
+    @classmethod
+    def build(cls, customers: Sequence, networks: Sequence, sites: Sequence,
+              links: Sequence, devices: Sequence) -> 'Topology':
+        """
+        Build a snapshot from entity rows.
+
+        Args:
+            customers: Rows with customer_id
+            networks: Rows with network_id, customer_id
+            sites: Rows with site_id, site_type
+            links: Rows with link_id, network_id, site_id, link_type
+            devices: Rows with device_id, link_id
+        """
+        customer_ids = _sorted_ids(customers, 'customer_id')
+        networks = sorted(networks, key=lambda row: row.network_id)
+        sites = sorted(sites, key=lambda row: row.site_id)
+        links = sorted(links, key=lambda row: row.link_id)
+        devices = sorted(devices, key=lambda row: row.device_id)
+
+        network_ids = np.array([row.network_id for row in networks], dtype=np.int64)
+        site_ids = np.array([row.site_id for row in sites], dtype=np.int64)
+        link_ids = np.array([row.link_id for row in links], dtype=np.int64)
+        device_ids = np.array([row.device_id for row in devices], dtype=np.int64)
+
+        network_customer = _positions(customer_ids, [row.customer_id for row in networks])
+        link_network = _positions(network_ids, [row.network_id for row in links])
+        link_site = _positions(site_ids, [row.site_id for row in links])
+        device_link = _positions(link_ids, [row.link_id for row in devices])
+
+        return cls(
+            customer_ids=customer_ids,
+            network_ids=network_ids,
+            site_ids=site_ids,
+            link_ids=link_ids,
+            device_ids=device_ids,
+            site_is_hub=np.array([('Hub' in (row.site_type or '')) for row in sites], dtype=bool),
+            link_network=link_network,
+            link_site=link_site,
+            link_type=np.array([row.link_type or '' for row in links], dtype=object),
+            device_link=device_link,
+            customer_networks=Adjacency.from_parents(network_customer, len(customer_ids)),
+            network_links=Adjacency.from_parents(link_network, len(network_ids)),
+            site_links=Adjacency.from_parents(link_site, len(site_ids)),
+            link_devices=Adjacency.from_parents(device_link, len(link_ids)),
+            built_at=datetime.utcnow(),
+        )
+
+    # ---- Point lookups
+
+    def _position(self, ids: np.ndarray, entity_id: int) -> int:
+        return int(_positions(ids, [entity_id])[0])
+
+    def has(self, level: str, entity_id: int) -> bool:
+        return self._position(self._ids(level), entity_id) >= 0
+
+    def _ids(self, level: str) -> np.ndarray:
+        if level not in TOPOLOGY_LEVELS:
+            raise ValueError(f"Unknown topology level '{level}', expected {TOPOLOGY_LEVELS}")
+        return getattr(self, f"{level}_ids")
+
+    def is_hub(self, site_id: int) -> bool:
+        position = self._position(self.site_ids, site_id)
+        return position >= 0 and bool(self.site_is_hub[position])
+
+    # ---- Subtree and sibling lookups
+
+    def links_under(self, level: str, entity_id: int) -> np.ndarray:
+        """
+        Link IDs in the subtree of an entity.
+
+        Args:
+            level: 'customer', 'network', 'site' or 'link'
+            entity_id: ID of the entity
+
+        Returns:
+            Sorted link IDs, empty for an unknown entity
+        """
+        position = self._position(self._ids(level), entity_id)
+        if position < 0:
+            return np.empty(0, dtype=np.int64)
+        if level == 'link':
+            return self.link_ids[[position]]
+        if level == 'site':
+            return self.link_ids[self.site_links.children(position)]
+        if level == 'network':
+            return self.link_ids[self.network_links.children(position)]
+        networks = self.customer_networks.children(position)
+        positions = [self.network_links.children(n) for n in networks]
+        return np.sort(self.link_ids[np.concatenate(positions)]) if positions else np.empty(0, dtype=np.int64)
+
+    def sibling_links(self, link_id: int, via: str = 'site') -> np.ndarray:
+        """
+        Other links sharing a site (or network) with a link.
+
+        Args:
+            link_id: Link ID
+            via: 'site' or 'network'
+
+        Returns:
+            Sorted sibling link IDs, excluding the link itself
+        """
+        position = self._position(self.link_ids, link_id)
+        if position < 0:
+            return np.empty(0, dtype=np.int64)
+        if via == 'site':
+            siblings = self.site_links.children(self.link_site[position])
+        elif via == 'network':
+            siblings = self.network_links.children(self.link_network[position])
+        else:
+            raise ValueError(f"Unknown sibling relation '{via}', expected 'site' or 'network'")
+        return self.link_ids[siblings[siblings != position]]
+
+    def shared_hubs(self, link_ids: Sequence[int]) -> Dict[int, List[int]]:
+        """
+        Hub sites shared by two or more of the given links.
+
+        Returns:
+            Hub site ID -> sorted link IDs on it
+        """
+        positions = _positions(self.link_ids, link_ids)
+        positions = np.unique(positions[positions >= 0])
+        sites = self.link_site[positions]
+        on_hub = (sites >= 0) & self.site_is_hub[np.maximum(sites, 0)]
+        hubs: Dict[int, List[int]] = {}
+        for site, link in zip(sites[on_hub].tolist(), self.link_ids[positions[on_hub]].tolist()):
+            hubs.setdefault(int(self.site_ids[site]), []).append(link)
+        return {site_id: links for site_id, links in hubs.items() if len(links) >= 2}
+
+    def devices_of(self, link_id: int) -> np.ndarray:
+        """Device IDs on a link."""
+        position = self._position(self.link_ids, link_id)
+        if position < 0:
+            return np.empty(0, dtype=np.int64)
+        return self.device_ids[self.link_devices.children(position)]
+
+    # ---- Vectorized link attributes
+
+    def link_positions(self, link_ids: np.ndarray) -> np.ndarray:
+        """Positions of links in link_ids, -1 for unknown links."""
+        return _positions(self.link_ids, link_ids)
+
+    def network_of(self, link_ids: np.ndarray) -> np.ndarray:
+        """Network ID of every link (-1 for unknown links)."""
+        return self._parent_ids(link_ids, self.link_network, self.network_ids)
+
+    def site_of(self, link_ids: np.ndarray) -> np.ndarray:
+        """Site ID of every link (-1 for unknown links)."""
+        return self._parent_ids(link_ids, self.link_site, self.site_ids)
+
+    def _parent_ids(self, link_ids: np.ndarray, parent: np.ndarray, parent_ids: np.ndarray) -> np.ndarray:
+        positions = self.link_positions(link_ids)
+        parents = np.where(positions >= 0, parent[np.maximum(positions, 0)], -1)
+        return np.where(parents >= 0, parent_ids[np.maximum(parents, 0)], -1) if len(parent_ids) else parents
+
+    def hub_site_ids(self) -> np.ndarray:
+        """IDs of every hub site."""
+        return self.site_ids[self.site_is_hub]
+
+    def links(self, link_ids: Optional[Sequence[int]] = None) -> List[LinkRow]:
+        """
+        Directory entries of links, in link ID order.
+
+        Args:
+            link_ids: Links to look up (default: every link); unknown links are skipped
+        """
+        if link_ids is None:
+            positions = np.arange(len(self.link_ids))
+        else:
+            positions = np.unique(self.link_positions(link_ids))
+            positions = positions[positions >= 0]
+        link_ids = self.link_ids[positions]
+        return [
+            LinkRow(*row) for row in zip(
+                link_ids.tolist(),
+                self.network_of(link_ids).tolist(),
+                self.site_of(link_ids).tolist(),
+                self.link_type[positions].tolist(),
+            )
+        ]
+
+    def get_stats(self) -> Dict:
+        return {
+            "customers": len(self.customer_ids),
+            "networks": len(self.network_ids),
+            "sites": len(self.site_ids),
+            "hub_sites": int(self.site_is_hub.sum()),
+            "links": len(self.link_ids),
+            "devices": len(self.device_ids),
+            "built_at": self.built_at.isoformat(),
+        }
+
+
+class TopologyIndex:
+    """Keeps the current Topology snapshot fresh."""
+
+    # Rebuild at most this long after the last build, for writes made outside this process
+    REFRESH_SECONDS = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topology: Optional[Topology] = None
+        self._dirty = True
+        self._watching = False
+
+    def invalidate(self, *args) -> None:
+        """Mark the index for rebuild on the next lookup (mapper event signature)."""
+        self._dirty = True
+
+    def is_stale(self) -> bool:
+        return (
+            self._dirty
+            or self._topology is None
+            or datetime.utcnow() - self._topology.built_at > timedelta(seconds=self.REFRESH_SECONDS)
+        )
+
+    def refresh(self, db: Session) -> Topology:
+        """Rebuild the snapshot from the entity tables."""
+        from app.models.bcom_models import Customer, Device, Link, Network, Site
+
+        self._watch_entity_writes()
+        # Clear first so writes during the build mark the new snapshot stale
+        self._dirty = False
+        topology = Topology.build(
+            db.query(Customer.customer_id).all(),
+            db.query(Network.network_id, Network.customer_id).all(),
+            db.query(Site.site_id, Site.site_type).all(),
+            db.query(Link.link_id, Link.network_id, Link.site_id, Link.link_type).all(),
+            db.query(Device.device_id, Device.link_id).all(),
+        )
+        with self._lock:
+            self._topology = topology
+        logger.info(f"Topology index rebuilt: {topology.get_stats()}")
+        return topology
+
+    def get(self, db: Optional[Session] = None) -> Topology:
+        """
+        Current snapshot, rebuilt first if stale.
+
+        Args:
+            db: Database session used to rebuild a stale index, None to use it as is
+        """
+        if db is not None and self.is_stale():
+            return self.refresh(db)
+        with self._lock:
+            topology = self._topology
+        if topology is None:
+            raise RuntimeError("Topology index has not been built yet")
+        return topology
+
+    def _watch_entity_writes(self) -> None:
+        """Invalidate the index whenever an entity is written through the ORM."""
+        if self._watching:
+            return
+        from sqlalchemy import event
+        from app.models.bcom_models import Customer, Device, Link, Network, Site
+
+        for entity in (Customer, Network, Site, Link, Device):
+            for name in ("after_insert", "after_update", "after_delete"):
+                event.listen(entity, name, self.invalidate)
+        self._watching = True
+
+
+# Global topology index
+topology_index = TopologyIndex()
+
+
+def get_topology_index() -> TopologyIndex:
+    """Get the global topology index."""
+    return topology_index
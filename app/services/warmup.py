@@ -0,0 +1,178 @@
+"""
+Startup warm-up of production models and reference data.
+
+Imports the scientific stack (deferred at API import to keep startup fast),
+verifies the checksums of the latest model versions in parallel, loads
+them, builds the DataLoader indexes and runs one dummy inference per model, so the first real
+requests do not pay for module imports, unpickling, sklearn's lazy imports or CSV parsing.
+Progress is tracked in a WarmupState that backs the /ready endpoint; a worker
+reports not-ready until warm-up has finished, which keeps cold workers out of
+the load balancer during rolling deploys.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.data_loader import get_data_loader
+from app.services.model_loaders import _CachedModelLoader, run_smoke_inference
+
+logger = logging.getLogger(__name__)
+
+# Modules kept out of the API's import path; imported here instead of by the
+# first request that needs them
+HEAVY_MODULES = (
+    "pandas",
+    "polars",
+    "sklearn.ensemble",
+    "app.services.anomaly_detector",
+    "app.services.recommendation_engine",
+)
+
+
+def import_heavy_modules(modules: Sequence[str] = HEAVY_MODULES) -> Dict[str, str]:
+    """
+    Import deferred modules (blocking).
+
+    Args:
+        modules: Module names to import
+
+    Returns:
+        Dictionary of module name to error message for failed imports
+    """
+    errors = {}
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            errors[name] = str(e)
+            logger.error(f"Warm-up import of {name} failed: {str(e)}")
+    return errors
+
+
+class WarmupState:
+    """Progress and outcome of the startup warm-up."""
+
+    PENDING = "pending"
+    WARMING = "warming"
+    READY = "ready"
+
+    def __init__(self):
+        self.status = self.PENDING
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.duration_ms: Optional[float] = None
+        self.models: Dict[str, str] = {}
+        self.checksums_verified = 0
+        self.data_indexes: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status == self.READY
+
+    def mark_ready(self) -> None:
+        """Mark the worker ready without warming (warm-up disabled)."""
+        self.status = self.READY
+        self.finished_at = datetime.utcnow()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the state for the readiness endpoint."""
+        return {
+            "status": self.status,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": self.duration_ms,
+            "models": self.models,
+            "checksums_verified": self.checksums_verified,
+            "data_indexes": self.data_indexes,
+            "errors": self.errors,
+        }
+
+
+async def warm_up(
+    state: WarmupState,
+    loaders: Sequence[_CachedModelLoader],
+    data_dir: Optional[str] = None
+) -> WarmupState:
+    """
+    Preload models and data indexes, then mark the state ready.
+
+    Failures are recorded per model rather than aborting: a model that cannot
+    load would fail its requests whether or not the worker is in rotation, so
+    it should not hold the whole worker out of the load balancer.
+
+    Args:
+        state: State object to update
+        loaders: Model loaders whose latest models should be preloaded
+        data_dir: Data directory for the DataLoader, None to skip
+
+    Returns:
+        The updated state
+    """
+    state.status = WarmupState.WARMING
+    state.started_at = datetime.utcnow()
+    started = time.perf_counter()
+
+    for name, error in (await asyncio.to_thread(import_heavy_modules)).items():
+        state.errors[f"import/{name}"] = error
+
+    # Verify the latest versions in parallel first; the digests are cached,
+    # so the loads below (and any verify-on-load) do not hash them again
+    managers: Dict[int, Tuple[Any, List[str]]] = {}
+    for loader in loaders:
+        managers.setdefault(id(loader.model_manager), (loader.model_manager, []))[1].append(loader.category)
+    for manager, categories in managers.values():
+        try:
+            results = await asyncio.to_thread(manager.validate_models, categories, True)
+        except Exception as e:
+            state.errors["checksums"] = str(e)
+            logger.error(f"Warm-up checksum validation failed: {str(e)}")
+            continue
+        state.checksums_verified += len(results)
+        for key, valid in results.items():
+            if not valid:
+                state.errors[key] = "checksum mismatch"
+
+    for loader in loaders:
+        for model_name in loader.list_available_models():
+            key = f"{loader.category}/{model_name}"
+            try:
+                model = await loader.load_async(model_name)
+                if model is None:
+                    state.errors[key] = "model could not be loaded"
+                    continue
+                exercised = await asyncio.to_thread(run_smoke_inference, model)
+                state.models[key] = "warm" if exercised else "loaded"
+            except Exception as e:
+                state.errors[key] = str(e)
+                logger.error(f"Warm-up failed for {key}: {str(e)}")
+
+    if data_dir is not None:
+        try:
+            data_loader = get_data_loader(data_dir)
+            state.data_indexes = await asyncio.to_thread(data_loader.build_indexes)
+        except Exception as e:
+            state.errors["data_loader"] = str(e)
+            logger.error(f"Warm-up failed for DataLoader indexes: {str(e)}")
+
+    state.duration_ms = (time.perf_counter() - started) * 1000.0
+    state.status = WarmupState.READY
+    state.finished_at = datetime.utcnow()
+    logger.info(
+        f"Warm-up finished in {state.duration_ms:.0f} ms: "
+        f"{len(state.models)} models, {len(state.errors)} errors"
+    )
+    return state
+
+
+# Global warm-up state
+warmup_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """Get the global warm-up state."""
+    return warmup_state
@@ -0,0 +1,28 @@
+-- Degradation patterns stored by fleet-wide correlation sweeps
+-- PostgreSQL v18
+
+-- ==================== CORRELATION PATTERNS ====================
+
+CREATE TABLE IF NOT EXISTS degradation_patterns (
+    id BIGSERIAL PRIMARY KEY,
+    sweep_id VARCHAR(64) NOT NULL, -- Sweep job that produced the pattern
+    scope VARCHAR(50) NOT NULL, -- 'network', 'hub_antenna', 'satellite', 'link'
+    scope_key VARCHAR(255) NOT NULL, -- network_id, site_id, satellite name or link_id
+    pattern_id VARCHAR(255) NOT NULL,
+    pattern_type VARCHAR(100) NOT NULL, -- 'network_equipment_failure', 'antenna_alignment', etc.
+    severity FLOAT,
+    confidence FLOAT,
+    root_cause TEXT,
+    affected_items JSONB, -- link_ids / site_ids
+    supporting_metrics JSONB,
+    timestamp TIMESTAMP NOT NULL,
+    hours_duration INTEGER,
+    devices_affected_count INTEGER,
+    links_affected_count INTEGER,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_degradation_patterns_sweep ON degradation_patterns(sweep_id);
+CREATE INDEX IF NOT EXISTS idx_degradation_patterns_scope ON degradation_patterns(scope, scope_key);
+CREATE INDEX IF NOT EXISTS idx_degradation_patterns_type ON degradation_patterns(pattern_type);
+CREATE INDEX IF NOT EXISTS idx_degradation_patterns_timestamp ON degradation_patterns(timestamp DESC);
@@ -0,0 +1,15 @@
+-- Satellite lookups on links.link_type
+-- PostgreSQL v18
+-- The API serves satellite -> link lookups from memory; these indexes keep
+-- the database-side lookups (index rebuilds, ad-hoc ILIKE queries) off a
+-- sequential scan of links
+
+-- ==================== SATELLITE LOOKUPS ====================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Substring matches: link_type ILIKE '%name%'
+CREATE INDEX IF NOT EXISTS idx_links_link_type_trgm ON links USING GIN (link_type gin_trgm_ops);
+
+-- Exact matches on the normalized satellite name
+CREATE INDEX IF NOT EXISTS idx_links_satellite ON links (LOWER(BTRIM(link_type))) WHERE link_type IS NOT NULL;
@@ -0,0 +1,146 @@
+"""
+API Import-Time Budget Check
+
+Imports app.main in a fresh interpreter under `python -X importtime` and
+fails if the total exceeds the budget (default 1000 ms, the API's target
+for being importable within a second of process start) or if a deferred
+module (sklearn, pandas, polars, scipy, joblib) is imported eagerly again.
+
+It also reports the dependency floor: the time a fresh interpreter takes
+to import only the third-party modules app.main uses (fastapi, sqlalchemy,
+psycopg, pydantic, slowapi, numpy, ...), and how far app.main is above it.
+The 1000 ms budget is the target, not what every host achieves: in the development
+containers the floor alone measured 1.1-1.3 s and app.main 1.7-2.1 s in
+total, of which about 0.3 s is the app's own modules (ORM mapping of the
+models and building the API routes). The budget is not raised to match;
+on such hosts pass --budget-ms explicitly and watch the time over the
+floor, which is the part changes to this repo move.
+
+Usage:
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --budget-ms 1500 --top 15
+
+Run from the project root with DATABASE_URL and SECRET_KEY set (as for the API).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules that must only be imported by warm-up or first use
+DEFERRED_MODULES = ("sklearn", "pandas", "polars", "scipy", "joblib")
+
+
+def measure(module: str = "app.main", code: Optional[str] = None) -> Tuple[float, Dict[str, int], List[str]]:
+    """
+    Import a module under -X importtime.
+
+    Args:
+        module: Module to import
+        code: Code to run instead of importing module
+
+    Returns:
+        Tuple of (total milliseconds, largest cumulative microseconds of
+        each top-level package imported directly or indirectly, every
+        module name in import order)
+    """
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code or f"import {module}"],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr or f"import {module} failed")
+
+    total_us = 0
+    packages: Dict[str, int] = {}
+    modules: List[str] = []
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header row or unrelated output
+        name = parts[2][1:]
+        package = name.strip().split(".")[0]
+        modules.append(name.strip())
+        packages[package] = max(packages.get(package, 0), int(parts[1]))
+        # Entries at the outermost level already include every import they triggered
+        if not name.startswith(" "):
+            total_us += int(parts[1])
+
+    return total_us / 1000.0, packages, modules
+
+
+def dependency_floor(modules: List[str]) -> float:
+    """
+    Import time of the third-party modules among those app.main imported.
+
+    Args:
+        modules: Module names reported by measure()
+
+    Returns:
+        Total milliseconds of importing them in a fresh interpreter
+    """
+    third_party = [
+        name for name in dict.fromkeys(modules)
+        if not name.startswith(("app.", "_")) and name != "app"
+        and name.split(".")[0] not in sys.stdlib_module_names
+    ]
+    # Packages probe for optional modules, which show up even when missing
+    code = (
+        "import importlib\n"
+        f"for name in {third_party!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception:\n"
+        "        pass\n"
+    )
+    floor_ms, _, _ = measure(code=code)
+    return floor_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the API's import-time budget")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=1000,
+        help="Maximum total import time in milliseconds (default: 1000)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of slowest packages to print (default: 10)"
+    )
+
+    args = parser.parse_args()
+    total_ms, packages, modules = measure()
+
+    for package, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{us / 1000.0:9.1f} ms  {package}")
+    floor_ms = dependency_floor(modules)
+    print(f"{floor_ms:9.1f} ms  third-party dependency floor")
+    print(f"{total_ms - floor_ms:9.1f} ms  over the dependency floor")
+    print(f"{total_ms:9.1f} ms  total (budget {args.budget_ms:.0f} ms)")
+
+    eager = [name for name in DEFERRED_MODULES if name in packages]
+    if eager:
+        print(f"❌ Deferred modules imported eagerly: {', '.join(eager)}")
+        return 1
+    if total_ms > args.budget_ms:
+        if floor_ms > args.budget_ms:
+            print("❌ Import time over budget (the dependency floor alone exceeds it on this host)")
+        else:
+            print("❌ Import time over budget")
+        return 1
+    print("✅ Import time within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
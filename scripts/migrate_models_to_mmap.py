@@ -0,0 +1,113 @@
+"""
+Model Storage Migration
+
+Converts existing model.pkl files to the memory-mappable joblib format
+(model.joblib) in place, updating metadata checksums and category manifests.
+
+Usage:
+    python -m scripts.migrate_models_to_mmap
+    python -m scripts.migrate_models_to_mmap --category anomaly_detection
+    python -m scripts.migrate_models_to_mmap --dry-run
+    python -m scripts.migrate_models_to_mmap --to pickle   # roll back
+
+Safe to run while the API is serving: each version's new file is written
+before the old one is removed, so loads never see a missing model.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.model_management import MODEL_FILES, ModelManager, find_model_file
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def migrate(models_dir: str, storage_format: str, categories=None, dry_run: bool = False) -> int:
+    """
+    Convert every model version to the target storage format.
+
+    Args:
+        models_dir: Root directory containing model categories
+        storage_format: Target format ('joblib' or 'pickle')
+        categories: Categories to migrate, None for all
+        dry_run: Only report what would be converted
+
+    Returns:
+        Number of failed conversions
+    """
+    manager = ModelManager(models_dir)
+    if categories is None:
+        categories = sorted(p.name for p in manager.models_dir.iterdir() if p.is_dir())
+
+    converted = 0
+    failed = 0
+    for category in categories:
+        # Pick up version directories that were copied in by hand
+        manifest = manager.rebuild_manifest(category)
+        for model_name, model in sorted(manifest.get("models", {}).items()):
+            for version, entry in sorted(model["versions"].items()):
+                model_dir = manager.models_dir / category / entry["directory"]
+                _, current_format = find_model_file(model_dir)
+                if current_format == storage_format:
+                    continue
+
+                label = f"{category}/{model_name} v{version}: {current_format} -> {storage_format}"
+                if dry_run:
+                    logger.info(f"Would convert {label}")
+                    continue
+
+                if manager.convert_model_format(model_name, category, version, storage_format):
+                    converted += 1
+                    logger.info(f"✅ Converted {label}")
+                else:
+                    failed += 1
+                    logger.error(f"❌ Failed to convert {label}")
+
+    logger.info(f"Converted {converted} model(s), {failed} failure(s)")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert stored models to the memory-mappable joblib format"
+    )
+    parser.add_argument(
+        "--models-dir",
+        default="ml_models",
+        help="Models directory (default: ml_models)"
+    )
+    parser.add_argument(
+        "--category",
+        action="append",
+        help="Category to migrate (repeatable, default: all)"
+    )
+    parser.add_argument(
+        "--to",
+        dest="storage_format",
+        choices=sorted(MODEL_FILES),
+        default="joblib",
+        help="Target storage format (default: joblib)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the conversions without performing them"
+    )
+
+    args = parser.parse_args()
+    failed = migrate(args.models_dir, args.storage_format, args.category, args.dry_run)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
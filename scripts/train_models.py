@@ -53,16 +53,18 @@ logger = logging.getLogger(__name__)
 class ModelTrainer:
     """Trains ML models for anomaly detection."""
 
-    def __init__(self, models_dir: str = "ml_models", version: str = "1.0.0"):
+    def __init__(self, models_dir: str = "ml_models", version: str = "1.0.0", storage_format: str = "pickle"):
         """
         Initialize trainer.
 
         Args:
             models_dir: Directory to save trained models
             version: Model version (e.g., '1.0.0')
+            storage_format: Model file format ('pickle' or memory-mappable 'joblib')
         """
         self.models_dir = models_dir
         self.version = version
+        self.storage_format = storage_format
         self.model_manager = ModelManager(models_dir)
         self.session = SessionLocal()
         
@@ -411,7 +413,8 @@ class ModelTrainer:
                 model_name="isolation_forest_network",
                 category="anomaly_detection",
                 version=self.version,
-                metadata=metadata
+                metadata=metadata,
+                storage_format=self.storage_format
             )
             
             if success:
@@ -488,7 +491,8 @@ class ModelTrainer:
                 model_name="isolation_forest_site",
                 category="anomaly_detection",
                 version=self.version,
-                metadata=metadata
+                metadata=metadata,
+                storage_format=self.storage_format
             )
             
             if success:
@@ -565,7 +569,8 @@ class ModelTrainer:
                 model_name="isolation_forest_link",
                 category="anomaly_detection",
                 version=self.version,
-                metadata=metadata
+                metadata=metadata,
+                storage_format=self.storage_format
             )
             
             if success:
@@ -650,6 +655,12 @@ def main():
         default="ml_models",
         help="Directory to save models (default: ml_models)"
     )
+    parser.add_argument(
+        "--storage-format",
+        choices=["pickle", "joblib"],
+        default="pickle",
+        help="Model file format; joblib is memory-mapped on load (default: pickle)"
+    )
     
     args = parser.parse_args()
     
@@ -665,7 +676,8 @@ def main():
     # Create trainer
     trainer = ModelTrainer(
         models_dir=args.models_dir,
-        version=args.version
+        version=args.version,
+        storage_format=args.storage_format
     )
     
     try:
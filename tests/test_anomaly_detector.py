@@ -0,0 +1,155 @@
+"""
+Tests for batch anomaly detection modes.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import model_cache as model_cache_module
+from app.services.anomaly_detector import AnomalyDetector, AUTO_FAST_MODE_MIN_ROWS
+from app.services.model_cache import ModelCache
+
+
+def _link_rows(count: int, outliers: int = 5):
+    rng = np.random.default_rng(0)
+    rows = [
+        {
+            'throughput': float(rng.normal(100, 5)),
+            'utilization': float(rng.normal(50, 3)),
+            'errors': float(rng.normal(2, 0.5)),
+            'discards': float(rng.normal(1, 0.2)),
+        }
+        for _ in range(count)
+    ]
+    for idx in range(outliers):
+        rows[idx * (count // outliers)].update({'throughput': 1000.0, 'errors': 80.0})
+    return rows
+
+
+class TestDetectionModes:
+    """Test suite for full/fast/auto detection modes."""
+
+    def test_resolve_detection_mode(self):
+        """Auto mode switches to fast for large payloads."""
+        detector = AnomalyDetector(cache_enabled=False)
+
+        assert detector.resolve_detection_mode(50, "full") == "full"
+        assert detector.resolve_detection_mode(50, "fast") == "fast"
+        assert detector.resolve_detection_mode(50, "auto") == "full"
+        assert detector.resolve_detection_mode(AUTO_FAST_MODE_MIN_ROWS - 1, "auto") == "full"
+        assert detector.resolve_detection_mode(AUTO_FAST_MODE_MIN_ROWS, "auto") == "fast"
+        # A tighter budget subsamples, and so switches to fast, sooner
+        assert detector.resolve_detection_mode(1000, "auto", latency_budget_ms=20) == "fast"
+        with pytest.raises(ValueError):
+            detector.resolve_detection_mode(50, "turbo")
+
+    def test_fit_sample_size_follows_budget(self):
+        """Subsample size grows with the latency budget and is capped by row count."""
+        detector = AnomalyDetector(cache_enabled=False)
+
+        small = detector._fit_sample_size(100000, latency_budget_ms=20)
+        large = detector._fit_sample_size(100000, latency_budget_ms=2000)
+        assert small < large
+        assert detector._fit_sample_size(100, latency_budget_ms=2000) == 100
+
+    def test_auto_mode_subsamples_default_budget_payload(self, monkeypatch):
+        """Whenever auto picks fast mode under the default budget, the forest is fit on fewer rows."""
+        from sklearn.ensemble import IsolationForest
+
+        from app.services import anomaly_detector as anomaly_detector_module
+
+        fitted_rows = []
+
+        class RecordingForest(IsolationForest):
+            def fit(self, X, y=None, sample_weight=None):
+                fitted_rows.append(len(X))
+                return super().fit(X, y, sample_weight)
+
+        monkeypatch.setattr(anomaly_detector_module, "IsolationForest", RecordingForest)
+        detector = AnomalyDetector(cache_enabled=False)
+        detector.detect_link_anomalies(_link_rows(AUTO_FAST_MODE_MIN_ROWS), mode="auto")
+
+        assert fitted_rows == [detector._fit_sample_size(AUTO_FAST_MODE_MIN_ROWS)]
+        assert fitted_rows[0] < AUTO_FAST_MODE_MIN_ROWS
+
+    def test_stratified_sample_covers_window(self):
+        """Stratified sample spans the whole payload without duplicates."""
+        detector = AnomalyDetector(cache_enabled=False)
+        idx = detector._stratified_sample(10000, 100)
+
+        assert len(idx) == 100
+        assert len(set(idx.tolist())) == 100
+        assert idx.min() < 100
+        assert idx.max() >= 9900
+
+    def test_fast_mode_scores_every_row(self):
+        """Fast mode fits on a subsample but still finds the injected outliers."""
+        detector = AnomalyDetector(cache_enabled=False)
+        rows = _link_rows(5000)
+
+        anomalies = detector.detect_link_anomalies(rows, sensitivity=0.99, mode="fast", latency_budget_ms=20)
+        flagged = {a['index'] for a in anomalies}
+
+        assert {0, 1000, 2000, 3000, 4000} <= flagged
+        assert all(a['index'] < len(rows) for a in anomalies)
+
+    def test_full_mode_matches_previous_behaviour(self):
+        """Full mode flags the same rows as fit_predict."""
+        from sklearn.ensemble import IsolationForest
+
+        detector = AnomalyDetector(cache_enabled=False)
+        rows = _link_rows(300)
+        anomalies = detector.detect_link_anomalies(rows, sensitivity=0.95, mode="full")
+
+        X_scaled = detector.scaler.transform(np.array([list(r.values()) for r in rows]))
+        expected = IsolationForest(contamination=0.05, random_state=42, n_estimators=100).fit_predict(X_scaled)
+        assert {a['index'] for a in anomalies} == set(np.where(expected == -1)[0].tolist())
+
+
+class TestDetectorCaching:
+    """Detect paths train through the model cache."""
+
+    def test_identical_payloads_share_one_detector(self, monkeypatch):
+        """A repeated payload is scored by the cached detector, with the same result."""
+        cache = ModelCache()
+        monkeypatch.setattr(model_cache_module, "model_cache", cache)
+        detector = AnomalyDetector()
+        rows = _link_rows(300)
+
+        first = {a['index'] for a in detector.detect_link_anomalies(rows, sensitivity=0.95)}
+        second = {a['index'] for a in detector.detect_link_anomalies(rows, sensitivity=0.95)}
+        uncached = AnomalyDetector(cache_enabled=False).detect_link_anomalies(rows, sensitivity=0.95)
+
+        assert first == second == {a['index'] for a in uncached}
+        stats = cache.get_stats()
+        assert (stats["size"], stats["total_hits"]) == (1, 1)
+
+        detector.detect_link_anomalies(rows, sensitivity=0.9)
+        detector.detect_link_anomalies(_link_rows(301), sensitivity=0.95)
+        assert cache.get_stats()["size"] == 3
+
+    def test_sweep_extends_hot_detector(self, monkeypatch):
+        """Payload-keyed detectors are kept, not refit, and do not hold the payload."""
+        cache = ModelCache(ttl_minutes=1)
+        monkeypatch.setattr(model_cache_module, "model_cache", cache)
+        detector = AnomalyDetector()
+        rows = _link_rows(300)
+        for _ in range(4):
+            detector.detect_link_anomalies(rows)
+        cached = cache.get_stats()["models"][0]
+        (item,) = cache._cache.values()
+        model = item["model"]
+        assert item["factory"] is None
+
+        assert asyncio.run(cache.sweep(refresh_ahead_minutes=5, refresh_min_hits=3)) == \
+            {"expired": 0, "refreshed": 1, "failed": 0}
+        refreshed = cache.get_stats()["models"][0]
+        assert refreshed["key"] == cached["key"]
+        assert refreshed["expires_at"] > cached["expires_at"]
+        assert next(iter(cache._cache.values()))["model"] is model
+
+        # No traffic since the refresh: left to expire
+        assert asyncio.run(cache.sweep(refresh_ahead_minutes=5, refresh_min_hits=3))["refreshed"] == 0
+
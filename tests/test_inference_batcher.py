@@ -0,0 +1,87 @@
+"""
+Tests for dynamic micro-batching of inference requests.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.inference_batcher import InferenceBatcher, InferenceBatcherRegistry
+
+
+class TestInferenceBatcher:
+    """Test suite for the inference batcher."""
+
+    def test_concurrent_requests_share_one_batch(self):
+        """Requests arriving within the wait window are scored together."""
+        calls = []
+
+        def score(X):
+            calls.append(len(X))
+            return X[:, 0] * 2
+
+        async def run():
+            batcher = InferenceBatcher(score, max_wait_ms=20, max_batch_rows=1000)
+            inputs = [np.full((n, 3), float(n)) for n in (1, 2, 3)]
+            results = await asyncio.gather(*(batcher.submit(X) for X in inputs))
+            return batcher, inputs, results
+
+        batcher, inputs, results = asyncio.run(run())
+
+        assert calls == [6]
+        for X, result in zip(inputs, results):
+            assert np.array_equal(result, X[:, 0] * 2)
+        assert batcher.get_stats()["avg_requests_per_batch"] == 3
+
+    def test_flushes_when_row_limit_reached(self):
+        """A full batch is flushed without waiting for the timer."""
+        calls = []
+
+        def score(X):
+            calls.append(len(X))
+            return np.zeros(len(X))
+
+        async def run():
+            batcher = InferenceBatcher(score, max_wait_ms=10000, max_batch_rows=4)
+            return await asyncio.wait_for(
+                asyncio.gather(batcher.submit(np.ones((2, 1))), batcher.submit(np.ones((2, 1)))),
+                timeout=1
+            )
+
+        asyncio.run(run())
+        assert calls == [4]
+
+    def test_errors_propagate_to_every_caller(self):
+        """A failing batch raises in each awaiting handler."""
+        def score(X):
+            raise RuntimeError("model exploded")
+
+        async def run():
+            batcher = InferenceBatcher(score, max_wait_ms=1)
+            return await asyncio.gather(
+                batcher.submit(np.ones((1, 2))),
+                batcher.submit(np.ones((1, 2))),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_registry_rebinds_on_new_model(self):
+        """Registry keeps one batcher per key and follows model reloads."""
+        registry = InferenceBatcherRegistry(max_wait_ms=1)
+
+        def old(X):
+            return np.zeros(len(X))
+
+        def new(X):
+            return np.ones(len(X))
+
+        first = registry.get("device_detector", old)
+        second = registry.get("device_detector", new)
+
+        assert first is second
+        assert second.score_fn is new
+        assert asyncio.run(second.submit(np.ones((2, 2)))).tolist() == [1.0, 1.0]
+        assert "device_detector" in registry.get_stats()
@@ -0,0 +1,218 @@
+"""
+Tests for ModelManager versioning and the per-category manifest.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from app.services.model_loaders import create_model_metadata
+from app.services.model_management import (
+    DEFAULT_FILE_MODE,
+    MANIFEST_FILE,
+    DigestCache,
+    ModelManager,
+    digest_cache,
+    version_sort_key,
+)
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "ml_models"
+CATEGORY = "anomaly_detection"
+
+
+def _save(manager: ModelManager, version: str, model_name: str = "isolation_forest_test"):
+    metadata = create_model_metadata(model_name, "isolation_forest")
+    metadata.version = version
+    return manager.save_model(IsolationForest(n_estimators=2), model_name, CATEGORY, version, metadata)
+
+
+class TestModelManifest:
+    """Test suite for manifest-backed version resolution."""
+
+    def test_version_sort_key_is_semantic(self):
+        """Versions order numerically and pre-releases sort before releases."""
+        versions = ["10.0.0", "9.0.0", "2.0.0", "2.0.0-rc1", "1.10.0", "1.9.0"]
+        assert sorted(versions, key=version_sort_key) == [
+            "1.9.0", "1.10.0", "2.0.0-rc1", "2.0.0", "9.0.0", "10.0.0"
+        ]
+
+    def test_latest_uses_semantic_order(self, tmp_path):
+        """v10.0.0 is newer than v9.0.0."""
+        manager = ModelManager(str(tmp_path))
+        _save(manager, "9.0.0")
+        _save(manager, "10.0.0")
+
+        model, metadata, version = manager.load_latest_model("isolation_forest_test", CATEGORY)
+        assert version == "10.0.0"
+        assert model is not None
+        assert manager.list_models(CATEGORY) == {"isolation_forest_test": ["9.0.0", "10.0.0"]}
+
+    def test_save_and_delete_maintain_manifest(self, tmp_path):
+        """The manifest on disk tracks checksums, sizes and the latest version."""
+        manager = ModelManager(str(tmp_path))
+        _save(manager, "1.0.0")
+        _save(manager, "2.0.0")
+        manager.delete_model("isolation_forest_test", CATEGORY, "2.0.0")
+
+        with open(tmp_path / CATEGORY / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        model = manifest["models"]["isolation_forest_test"]
+        assert model["latest"] == "1.0.0"
+        assert list(model["versions"]) == ["1.0.0"]
+        entry = model["versions"]["1.0.0"]
+        assert entry["size_bytes"] > 0
+        assert entry["checksum"] == manager.get_model_info("isolation_forest_test", CATEGORY, "1.0.0")["checksum"]
+
+        # A fresh process reads the same manifest
+        assert ModelManager(str(tmp_path)).get_latest_version("isolation_forest_test", CATEGORY) == "1.0.0"
+
+    def test_concurrent_publishers_keep_each_others_versions(self, tmp_path):
+        """A process with a stale manifest does not drop versions another process published."""
+        first, second = ModelManager(str(tmp_path)), ModelManager(str(tmp_path))
+        _save(first, "1.0.0")
+        assert second.get_latest_version("isolation_forest_test", CATEGORY) == "1.0.0"
+
+        _save(first, "2.0.0")
+        _save(second, "3.0.0")
+
+        with open(tmp_path / CATEGORY / MANIFEST_FILE) as f:
+            versions = json.load(f)["models"]["isolation_forest_test"]["versions"]
+        assert sorted(versions) == ["1.0.0", "2.0.0", "3.0.0"]
+
+    def test_published_files_respect_umask(self, tmp_path):
+        """The manifest is not left 0600 by its temporary file."""
+        manager = ModelManager(str(tmp_path))
+        _save(manager, "1.0.0")
+
+        mode = (tmp_path / CATEGORY / MANIFEST_FILE).stat().st_mode & 0o777
+        assert mode == DEFAULT_FILE_MODE
+
+    def test_latest_lookup_does_not_rescan(self, tmp_path):
+        """Once loaded, the manifest is the source of truth until refreshed."""
+        models_dir = tmp_path / "ml_models"
+        shutil.copytree(MODELS_DIR, models_dir)
+        (models_dir / CATEGORY / MANIFEST_FILE).unlink(missing_ok=True)
+        manager = ModelManager(str(models_dir))
+
+        # Missing manifest is rebuilt from the directory tree
+        assert manager.get_latest_version("isolation_forest_network", CATEGORY) == "2.0.0"
+
+        src = models_dir / CATEGORY / "isolation_forest_network_v2.0.0"
+        shutil.copytree(src, models_dir / CATEGORY / "isolation_forest_network_v3.0.0")
+        assert manager.get_latest_version("isolation_forest_network", CATEGORY) == "2.0.0"
+
+        manager.rebuild_manifest(CATEGORY)
+        assert manager.get_latest_version("isolation_forest_network", CATEGORY) == "3.0.0"
+        assert (models_dir / CATEGORY / MANIFEST_FILE).read_text().endswith("}\n")
+
+
+class TestModelStorageFormat:
+    """Test suite for the memory-mapped joblib storage format."""
+
+    def test_joblib_format_is_memory_mapped(self, tmp_path):
+        """Models saved as joblib load with their arrays backed by the file."""
+        manager = ModelManager(str(tmp_path))
+        model = IsolationForest(n_estimators=5, random_state=0).fit(np.random.RandomState(0).rand(50, 3))
+        metadata = create_model_metadata("isolation_forest_test", "isolation_forest")
+        success, path = manager.save_model(model, "isolation_forest_test", CATEGORY, "1.0.0", metadata, "joblib")
+
+        assert success and path.endswith("model.joblib")
+        assert Path(path).stat().st_mode & 0o777 == DEFAULT_FILE_MODE
+        loaded, _ = manager.load_model("isolation_forest_test", CATEGORY, "1.0.0")
+        assert isinstance(loaded.estimators_features_[0], np.memmap)
+        assert np.array_equal(loaded.predict(np.zeros((2, 3))), model.predict(np.zeros((2, 3))))
+        assert manager.validate_model_checksum("isolation_forest_test", CATEGORY, "1.0.0")
+
+    def test_convert_existing_pickle_in_place(self, tmp_path):
+        """The migration converts model.pkl directories and keeps them valid."""
+        from scripts.migrate_models_to_mmap import migrate
+
+        models_dir = tmp_path / "ml_models"
+        shutil.copytree(MODELS_DIR, models_dir)
+
+        assert migrate(str(models_dir), "joblib") == 0
+
+        version_dir = models_dir / CATEGORY / "isolation_forest_network_v2.0.0"
+        assert (version_dir / "model.joblib").exists()
+        assert not (version_dir / "model.pkl").exists()
+
+        manager = ModelManager(str(models_dir))
+        assert manager.validate_model_checksum("isolation_forest_network", CATEGORY, "2.0.0")
+        entry = manager.get_manifest(CATEGORY)["models"]["isolation_forest_network"]["versions"]["2.0.0"]
+        assert entry["storage_format"] == "joblib"
+        model, _, version = manager.load_latest_model("isolation_forest_network", CATEGORY)
+        assert version == "2.0.0"
+        assert model.predict(np.zeros((1, 8))).shape == (1,)
+
+
+class TestModelChecksums:
+    """Test suite for streaming, cached checksum validation."""
+
+    def test_algorithm_prefix_and_md5_compatibility(self, tmp_path):
+        """Non-MD5 checksums are prefixed; existing bare MD5 checksums still validate."""
+        manager = ModelManager(str(tmp_path), checksum_algorithm="blake2b")
+        _save(manager, "1.0.0")
+        checksum = manager.get_model_info("isolation_forest_test", CATEGORY, "1.0.0")["checksum"]
+        assert checksum.startswith("blake2b:")
+        assert manager.validate_model_checksum("isolation_forest_test", CATEGORY, "1.0.0")
+
+        legacy = ModelManager(str(MODELS_DIR))
+        assert legacy.validate_model_checksum("isolation_forest_network", CATEGORY, "2.0.0")
+
+    def test_digest_cached_until_file_changes(self, tmp_path):
+        """An unchanged file is hashed once; a rewritten file is hashed again."""
+        path = tmp_path / "model.pkl"
+        path.write_bytes(b"x" * 3_000_000)
+        cache = DigestCache()
+
+        first = cache.get(path, "sha256")
+        assert cache.get(path, "sha256") == first
+        assert cache.get_stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+        path.write_bytes(b"y" * 10)
+        assert cache.get(path, "sha256") != first
+        assert cache.get_stats()["misses"] == 2
+
+    def test_verify_on_load_rejects_tampered_model(self, tmp_path):
+        """With verify_on_load, a model whose bytes changed is not loaded."""
+        manager = ModelManager(str(tmp_path), verify_on_load=True)
+        _, path = _save(manager, "1.0.0")
+        assert manager.load_model("isolation_forest_test", CATEGORY, "1.0.0")[0] is not None
+
+        with open(path, "ab") as f:
+            f.write(b"tampered")
+        assert manager.load_model("isolation_forest_test", CATEGORY, "1.0.0") == (None, None)
+
+    def test_verify_on_load_accepts_model_without_checksum(self, tmp_path):
+        """Models saved before checksums were recorded still load, unverified."""
+        manager = ModelManager(str(tmp_path), verify_on_load=True)
+        _, path = _save(manager, "1.0.0")
+        metadata_path = Path(path).parent / "metadata.json"
+        metadata = json.loads(metadata_path.read_text())
+        del metadata["checksum"]
+        metadata_path.write_text(json.dumps(metadata))
+
+        assert not manager.validate_model_checksum("isolation_forest_test", CATEGORY, "1.0.0")
+        assert manager.load_model("isolation_forest_test", CATEGORY, "1.0.0")[0] is not None
+
+        metadata_path.unlink()
+        assert manager.load_model("isolation_forest_test", CATEGORY, "1.0.0")[0] is not None
+
+    def test_validate_models_in_parallel(self, tmp_path):
+        """Every version is validated and reported by key."""
+        models_dir = tmp_path / "ml_models"
+        shutil.copytree(MODELS_DIR, models_dir)
+        manager = ModelManager(str(models_dir))
+
+        results = manager.validate_models(max_workers=4)
+        assert len(results) == 4
+        assert all(results.values())
+        assert list(manager.validate_models(latest_only=True)) == [
+            "anomaly_detection/isolation_forest_link/1.0.0",
+            "anomaly_detection/isolation_forest_network/2.0.0",
+            "anomaly_detection/isolation_forest_site/1.0.0",
+        ]
+        assert digest_cache.get_stats()["hits"] >= 3
@@ -0,0 +1,59 @@
+"""
+Tests for fused scaler + model inference pipelines.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from app.services.model_loaders import AnomalyDetectorModelLoader
+from app.services.model_management import ModelManager
+from app.services.model_pipeline import ModelPipeline
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "ml_models"
+
+
+class TestModelPipeline:
+    """Test suite for ModelPipeline."""
+
+    def _fitted(self):
+        rng = np.random.RandomState(0)
+        X = rng.normal(loc=[10.0, -5.0, 100.0], scale=[1.0, 3.0, 20.0], size=(200, 3))
+        scaler = StandardScaler().fit(X)
+        model = IsolationForest(n_estimators=10, random_state=0).fit(scaler.transform(X))
+        return X, scaler, model
+
+    def test_fused_scaling_matches_scaler(self):
+        """The precomputed affine transform equals StandardScaler.transform."""
+        X, scaler, model = self._fitted()
+        pipeline = ModelPipeline(model, scaler=scaler)
+
+        assert np.allclose(pipeline.transform(X), scaler.transform(X))
+        assert np.array_equal(pipeline.predict(X), model.predict(scaler.transform(X)))
+        assert np.allclose(pipeline.score_samples(X), model.score_samples(scaler.transform(X)))
+
+    def test_feature_matrix_uses_training_order(self):
+        """Feature dicts are laid out in metadata order, not dict order."""
+        _, scaler, model = self._fitted()
+        pipeline = ModelPipeline(model, scaler=scaler, feature_names=["a", "b", "c"])
+
+        X = pipeline.feature_matrix([{"c": 3, "a": 1, "b": 2}, {"b": 5}])
+        assert X.tolist() == [[1.0, 2.0, 3.0], [0.0, 5.0, 0.0]]
+
+        # Default order only applies when the metadata has none
+        assert ModelPipeline(model).feature_matrix([{"x": 1, "y": 2}], ["y", "x"]).tolist() == [[2.0, 1.0]]
+
+    def test_loader_returns_pipeline_with_scaler(self):
+        """Loaded detectors carry their scaler, feature order and version."""
+        loader = AnomalyDetectorModelLoader(ModelManager(str(MODELS_DIR)))
+        pipeline = loader.load_network_detector()
+
+        assert isinstance(pipeline, ModelPipeline)
+        assert pipeline.version == "2.0.0"
+        assert pipeline.scaler is not None
+        assert pipeline.feature_names[0] == "availability"
+        assert pipeline.n_features_in_ == len(pipeline.feature_names)
+        assert pipeline.predict(np.zeros((2, pipeline.n_features_in_))).shape == (2,)
+        assert loader.load_device_detector() is None
@@ -0,0 +1,123 @@
+"""
+Tests for hot-swapping newly published model versions.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from app.services.model_loaders import AnomalyDetectorModelLoader, create_model_metadata
+from app.services.model_management import ModelManager
+from app.services.model_watcher import ModelWatcher
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "ml_models"
+CATEGORY = "anomaly_detection"
+
+
+def _publish(models_dir: Path, version: str, n_features: int = 8) -> Path:
+    """Publish a network model from a separate manager, like the trainer does."""
+    model = IsolationForest(n_estimators=5, random_state=0).fit(np.random.RandomState(0).rand(50, n_features))
+    metadata = create_model_metadata("isolation_forest_network", "isolation_forest")
+    metadata.version = version
+    _, path = ModelManager(str(models_dir)).save_model(
+        model, "isolation_forest_network", CATEGORY, version, metadata
+    )
+    return Path(path)
+
+
+class TestModelWatcher:
+    """Test suite for ModelWatcher."""
+
+    def _setup(self, tmp_path):
+        models_dir = tmp_path / "ml_models"
+        shutil.copytree(MODELS_DIR, models_dir)
+        loader = AnomalyDetectorModelLoader(ModelManager(str(models_dir)))
+        return models_dir, loader
+
+    def test_swaps_in_new_latest_version(self, tmp_path):
+        """A newly published version replaces the served model."""
+        models_dir, loader = self._setup(tmp_path)
+        old_model = loader.load_network_detector()
+        watcher = ModelWatcher(loader)
+        assert loader.get_loaded_version("isolation_forest_network") == "2.0.0"
+
+        _publish(models_dir, "3.0.0")
+
+        assert watcher.check() == ["isolation_forest_network"]
+        new_model = loader.load_network_detector()
+        assert new_model is not old_model
+        assert loader.get_loaded_version("isolation_forest_network") == "3.0.0"
+        assert watcher.get_stats()["history"][-1]["status"] == "swapped"
+
+        # Nothing changed since the last check
+        assert watcher.check() == []
+
+    def test_rejects_version_with_bad_checksum(self, tmp_path):
+        """A corrupted upload keeps the previous version in service."""
+        models_dir, loader = self._setup(tmp_path)
+        old_model = loader.load_network_detector()
+        watcher = ModelWatcher(loader)
+
+        model_path = _publish(models_dir, "3.0.0")
+        with open(model_path, "ab") as f:
+            f.write(b"truncated-upload")
+
+        for status in ["retrying"] * (ModelWatcher.MAX_ATTEMPTS - 1) + ["rejected"]:
+            assert watcher.check() == []
+            assert watcher.get_stats()["history"][-1]["status"] == status
+        assert loader.load_network_detector() is old_model
+        assert watcher.get_stats()["history"][-1]["detail"] == "checksum mismatch"
+
+        # Rejected: not validated again until republished
+        assert watcher.check() == []
+        assert len(watcher.get_stats()["history"]) == ModelWatcher.MAX_ATTEMPTS
+
+    def test_swaps_version_without_checksum(self, tmp_path):
+        """A version with no recorded checksum is accepted, as the loader does."""
+        models_dir, loader = self._setup(tmp_path)
+        loader.load_network_detector()
+        watcher = ModelWatcher(loader)
+
+        metadata_path = _publish(models_dir, "3.0.0").parent / "metadata.json"
+        metadata = json.loads(metadata_path.read_text())
+        del metadata["checksum"]
+        metadata_path.write_text(json.dumps(metadata))
+
+        assert watcher.check() == ["isolation_forest_network"]
+        assert loader.get_loaded_version("isolation_forest_network") == "3.0.0"
+
+    def test_retries_version_still_being_copied(self, tmp_path):
+        """A model that fails validation mid-copy is swapped in once complete, without a new manifest write."""
+        models_dir, loader = self._setup(tmp_path)
+        loader.load_network_detector()
+        watcher = ModelWatcher(loader)
+
+        model_path = _publish(models_dir, "3.0.0")
+        complete = model_path.read_bytes()
+        model_path.write_bytes(complete[:len(complete) // 2])
+
+        assert watcher.check() == []
+        assert watcher.get_stats()["history"][-1]["status"] == "retrying"
+
+        model_path.write_bytes(complete)
+        assert watcher.check() == ["isolation_forest_network"]
+        assert loader.get_loaded_version("isolation_forest_network") == "3.0.0"
+
+    def test_rejects_version_failing_smoke_inference(self, tmp_path):
+        """A model that cannot predict is not swapped in."""
+        models_dir, loader = self._setup(tmp_path)
+        old_model = loader.load_network_detector()
+        watcher = ModelWatcher(loader)
+
+        _publish(models_dir, "3.0.0")
+        # Unfitted forest: predict() raises
+        broken = IsolationForest()
+        broken.n_features_in_ = 8
+        loader.model_manager.load_model = lambda *args: (broken, None)
+
+        assert watcher.check() == []
+        assert loader.load_network_detector() is old_model
+        assert watcher.get_stats()["history"][-1]["status"] == "rejected"
@@ -10,6 +10,7 @@ import time
 from app.main import app
 from app.services.model_cache import ModelCache, get_model_cache
 from app.services.anomaly_detector import AnomalyDetector
+from app.services.model_management import DEFAULT_FILE_MODE
 
 client = TestClient(app)
 
@@ -170,6 +171,134 @@ class TestModelCaching:
         
         assert cache.get_stats()["size"] == 0
 
+    def test_model_cache_evicts_least_recently_used(self):
+        """Test that a recently read entry survives eviction over an older one."""
+        cache = ModelCache(max_cache_size=2)
+        detector1 = AnomalyDetector(cache_enabled=False)
+        detector2 = AnomalyDetector(cache_enabled=False)
+        detector3 = AnomalyDetector(cache_enabled=False)
+
+        cache.set("network", 5, 100, detector1)
+        cache.set("site", 6, 100, detector2)
+        cache.get("network", 5, 100)
+        cache.set("link", 4, 100, detector3)
+
+        assert cache.get("network", 5, 100) is detector1
+        assert cache.get("site", 6, 100) is None
+        assert cache.get("link", 4, 100) is detector3
+
+    def test_model_cache_byte_budget(self):
+        """Test that eviction keeps the estimated size within max_bytes."""
+        detector = AnomalyDetector(cache_enabled=False)
+        entry_size = ModelCache._estimate_size(detector)
+        cache = ModelCache(max_cache_size=100, max_bytes=entry_size * 2)
+
+        cache.set("network", 5, 100, detector)
+        cache.set("site", 6, 100, detector)
+        cache.set("link", 4, 100, detector)
+
+        stats = cache.get_stats()
+        assert stats["size"] == 2
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert cache.get("network", 5, 100) is None
+
+    def test_model_cache_rejects_oversized_model(self):
+        """Test that a model larger than the whole budget is not cached."""
+        cache = ModelCache(max_bytes=1)
+        cache.set("network", 5, 100, AnomalyDetector(cache_enabled=False))
+
+        assert cache.get_stats()["size"] == 0
+
+    def test_model_cache_expired_entries_removed(self):
+        """Test that expired entries are dropped by cleanup and on read."""
+        cache = ModelCache(ttl_minutes=0)
+        detector = AnomalyDetector(cache_enabled=False)
+
+        cache.set("network", 5, 100, detector)
+        time.sleep(0.01)
+        # Inserting purges the already expired entry
+        cache.set("site", 6, 100, detector)
+        assert cache.get_stats()["size"] == 1
+        time.sleep(0.01)
+
+        assert cache.cleanup_expired() == 1
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_model_cache_disk_tier(self, tmp_path):
+        """Test that a memory miss is served from the disk tier."""
+        import numpy as np
+
+        writer = ModelCache(disk_dir=str(tmp_path))
+        detector = AnomalyDetector(cache_enabled=False)
+        detector.scaler.fit(np.arange(20, dtype=float).reshape(10, 2))
+        writer.set("network", 2, 10, detector)
+        writer.flush()
+        assert (next(tmp_path.glob("*.joblib")).stat().st_mode & 0o777) == DEFAULT_FILE_MODE
+
+        # A fresh cache (another worker or a restart) sharing the directory
+        reader = ModelCache(disk_dir=str(tmp_path))
+        cached = reader.get("network", 2, 10)
+
+        assert cached is not None
+        assert isinstance(cached.scaler.mean_, np.memmap)
+        assert np.allclose(cached.scaler.mean_, detector.scaler.mean_)
+        assert reader.get_stats()["size"] == 1
+        assert reader.get_stats()["disk"]["files"] == 1
+
+    def test_model_cache_disk_tier_expiry(self, tmp_path):
+        """Test that disk entries follow the cache TTL."""
+        cache = ModelCache(ttl_minutes=0, disk_dir=str(tmp_path))
+        cache.set("network", 5, 100, AnomalyDetector(cache_enabled=False))
+        cache.flush()
+        time.sleep(0.01)
+
+        assert ModelCache(ttl_minutes=0, disk_dir=str(tmp_path)).get("network", 5, 100) is None
+        assert cache.get_stats()["disk"]["files"] == 0
+
+    def test_model_cache_refresh_ahead(self):
+        """Test that hot entries are retrained before they expire."""
+        import asyncio
+
+        cache = ModelCache(ttl_minutes=1)
+        trained = []
+
+        def factory():
+            trained.append(1)
+            return AnomalyDetector(cache_enabled=False)
+
+        first = cache.get_or_create("network", 5, 100, factory)
+        for _ in range(3):
+            cache.get("network", 5, 100)
+
+        # Cold entries and entries outside the window are left alone
+        cache.set("site", 6, 100, AnomalyDetector(cache_enabled=False), factory=factory)
+        assert asyncio.run(cache.sweep(refresh_ahead_minutes=0.5, refresh_min_hits=3))["refreshed"] == 0
+
+        result = asyncio.run(cache.sweep(refresh_ahead_minutes=2, refresh_min_hits=3))
+        assert result == {"expired": 0, "refreshed": 1, "failed": 0}
+        assert len(trained) == 2
+
+        refreshed = cache.get("network", 5, 100)
+        assert refreshed is not first
+        # Hits restart at the refresh, so only continued use refreshes again
+        stats = {m["key"]: m for m in cache.get_stats()["models"]}
+        assert stats[cache._generate_cache_key("network", 5, 100)]["hits"] == 1
+        assert asyncio.run(cache.sweep(refresh_ahead_minutes=2, refresh_min_hits=3))["refreshed"] == 0
+        assert len(trained) == 2
+
+    def test_model_cache_sweep_removes_expired(self):
+        """Test that a sweep drops expired entries without refreshing them."""
+        import asyncio
+
+        cache = ModelCache(ttl_minutes=0)
+        cache.get_or_create("network", 5, 100, lambda: AnomalyDetector(cache_enabled=False))
+        time.sleep(0.01)
+
+        result = asyncio.run(cache.sweep(refresh_ahead_minutes=5, refresh_min_hits=0))
+        assert result["expired"] == 1
+        assert result["refreshed"] == 0
+        assert cache.get_stats()["size"] == 0
+
     def test_global_model_cache_instance(self):
         """Test global model cache instance."""
         cache = get_model_cache()
@@ -0,0 +1,139 @@
+"""
+Tests for single-flight deduplication of model training and loading.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.anomaly_detector import AnomalyDetector
+from app.services.model_cache import ModelCache
+from app.services.model_loaders import AnomalyDetectorModelLoader
+from app.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    def test_concurrent_sync_callers_share_one_call(self):
+        """Only the first of many concurrent callers runs the function."""
+        flight = SingleFlight()
+        calls = []
+        start = threading.Event()
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "model"
+
+        def caller():
+            start.wait()
+            return flight.do("key", work)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(caller) for _ in range(8)]
+            start.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["model"] * 8
+        assert len(calls) == 1
+        assert flight.in_flight() == 0
+
+    def test_async_callers_share_one_call(self):
+        """Async callers deduplicate blocking work run in the executor."""
+        flight = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        async def run():
+            return await asyncio.gather(*(flight.do_async("key", work) for _ in range(5)))
+
+        assert asyncio.run(run()) == [42] * 5
+        assert len(calls) == 1
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        """A failed call raises for all waiters and the next call retries."""
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("load failed")
+
+        with pytest.raises(RuntimeError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: "ok") == "ok"
+
+
+class TestSingleFlightIntegration:
+    """Single-flight behaviour of ModelCache and the model loaders."""
+
+    def test_model_cache_trains_once_per_key(self):
+        """Concurrent misses in ModelCache.get_or_create train one model."""
+        cache = ModelCache()
+        trained = []
+
+        def factory():
+            trained.append(1)
+            time.sleep(0.05)
+            return AnomalyDetector(cache_enabled=False)
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda _: cache.get_or_create("network", 5, 100, factory), range(6)))
+
+        assert len(trained) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_detect_requests_train_once(self, monkeypatch):
+        """Concurrent detect calls with the same payload fit one detector."""
+        from app.services import model_cache as model_cache_module
+
+        monkeypatch.setattr(model_cache_module, "model_cache", ModelCache())
+        trained = []
+        train = AnomalyDetector._train
+
+        def slow_train(self, *args):
+            trained.append(1)
+            time.sleep(0.05)
+            return train(self, *args)
+
+        monkeypatch.setattr(AnomalyDetector, "_train", slow_train)
+        rows = [{'throughput': float(i % 7), 'utilization': float(i % 5), 'errors': 0.0, 'discards': 0.0}
+                for i in range(50)]
+        detector = AnomalyDetector()
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda _: detector.detect_link_anomalies(rows), range(6)))
+
+        assert len(trained) == 1
+        assert all([a['index'] for a in r] == [a['index'] for a in results[0]] for r in results)
+
+    def test_loader_unpickles_once(self):
+        """Concurrent loads of the same model hit the disk once."""
+        loads = []
+
+        class FakeManager:
+            def load_latest_model(self, model_name, category):
+                loads.append(model_name)
+                time.sleep(0.05)
+                return object(), None, "1.0.0"
+
+            def load_scaler(self, model_name, category, version):
+                return None
+
+        loader = AnomalyDetectorModelLoader(FakeManager())
+
+        async def run():
+            return await asyncio.gather(
+                *(loader.load_async("isolation_forest_network") for _ in range(4)),
+                asyncio.to_thread(loader.load_network_detector),
+            )
+
+        results = asyncio.run(run())
+        assert loads == ["isolation_forest_network"]
+        assert all(r is results[0] for r in results)
@@ -0,0 +1,155 @@
+"""
+Tests for online streaming anomaly scoring.
+"""
+
+import pytest
+
+from app.services.streaming_detector import StreamingAnomalyDetector, get_streaming_detector
+
+
+class TestStreamingDetector:
+    """Test suite for the streaming anomaly detector."""
+
+    def _feed(self, detector, values, entity_id="1"):
+        result = None
+        for value in values:
+            result = detector.score_point("device", entity_id, {"avg_value": value})
+        return result
+
+    def test_no_anomaly_before_warm_up(self):
+        """Entities cannot raise anomalies before min_points are seen."""
+        detector = StreamingAnomalyDetector(min_points=10)
+        result = self._feed(detector, [10.0, 10.5, 500.0])
+
+        assert result["warmed_up"] is False
+        assert result["anomaly_detected"] is False
+
+    def test_spike_detected_after_warm_up(self):
+        """A large spike on a stable series is flagged."""
+        detector = StreamingAnomalyDetector(min_points=10)
+        baseline = [10.0 + (i % 5) * 0.1 for i in range(50)]
+        result = self._feed(detector, baseline)
+        assert result["anomaly_detected"] is False
+
+        result = detector.score_point("device", "1", {"avg_value": 50.0})
+        assert result["anomaly_detected"] is True
+        assert result["affected_metrics"] == ["avg_value"]
+        assert result["anomaly_score"] > result["threshold"]
+
+    def test_entities_are_isolated(self):
+        """State is kept separately per entity."""
+        detector = StreamingAnomalyDetector(min_points=5)
+        self._feed(detector, [1.0, 1.1, 1.2, 1.1, 1.0, 1.1], entity_id="a")
+        self._feed(detector, [100.0, 101.0, 99.0, 100.0, 100.5, 99.5], entity_id="b")
+
+        stats_a = detector.get_entity_stats("device", "a")
+        stats_b = detector.get_entity_stats("device", "b")
+        assert stats_a["metrics"]["avg_value"]["mean"] < 2
+        assert stats_b["metrics"]["avg_value"]["mean"] > 98
+
+    def test_welford_matches_batch_statistics(self):
+        """Running mean/std match the batch computation."""
+        import statistics
+
+        detector = StreamingAnomalyDetector()
+        values = [3.0, 7.0, 1.0, 9.0, 4.0, 6.0]
+        self._feed(detector, values)
+
+        stats = detector.get_entity_stats("device", "1")["metrics"]["avg_value"]
+        assert stats["mean"] == pytest.approx(statistics.mean(values))
+        assert stats["std"] == pytest.approx(statistics.stdev(values))
+        assert stats["median"] == pytest.approx(statistics.median(values))
+
+    def test_state_is_bounded(self):
+        """Window and entity counts stay within their limits."""
+        detector = StreamingAnomalyDetector(window_size=8, max_entities=3)
+        for entity_id in range(5):
+            self._feed(detector, [float(i) for i in range(20)], entity_id=str(entity_id))
+
+        assert detector.get_stats()["tracked_entities"] == 3
+        assert detector.get_entity_stats("device", "0") is None
+        assert detector.get_entity_stats("device", "4")["metrics"]["avg_value"]["count"] == 20
+
+    def test_model_confirmation(self):
+        """Flagged points are passed to the registered confirmer."""
+        detector = StreamingAnomalyDetector(min_points=10, confirm_interval=20)
+        calls = []
+
+        def confirmer(rows):
+            calls.append(len(rows))
+            return [row["avg_value"] > 40 for row in rows]
+
+        detector.register_confirmer("device", confirmer)
+        self._feed(detector, [10.0 + (i % 3) * 0.1 for i in range(19)])
+        result = detector.score_point("device", "1", {"avg_value": 50.0})
+
+        assert result["model_confirmed"] is True
+        assert result["window_model_anomalies"] == 1
+        assert calls == [1, 20]
+
+    def test_confirmation_with_model_loader(self):
+        """Loader-backed confirmers score rows with the published pipeline and skip missing models."""
+        import numpy as np
+
+        class Pipeline:
+            def feature_matrix(self, rows):
+                return np.array([[row.get("avg_value", 0)] for row in rows])
+
+            def predict(self, X):
+                return np.where(X[:, 0] > 40, -1, 1)
+
+        class Loader:
+            load_device_detector = staticmethod(lambda: Pipeline())
+            load_link_detector = staticmethod(lambda: None)
+            load_network_detector = staticmethod(lambda: None)
+
+        detector = StreamingAnomalyDetector(min_points=10)
+        detector.configure(confirm_interval=20)
+        detector.register_model_confirmers(Loader())
+        self._feed(detector, [10.0 + (i % 3) * 0.1 for i in range(19)])
+        result = detector.score_point("device", "1", {"avg_value": 50.0})
+        assert (result["model_confirmed"], result["window_model_anomalies"]) == (True, 1)
+
+        for i in range(19):
+            detector.score_point("link", "1", {"avg_value": 10.0 + (i % 3) * 0.1})
+        result = detector.score_point("link", "1", {"avg_value": 50.0})
+        assert result["anomaly_detected"] is True
+        assert (result["model_confirmed"], result["window_model_anomalies"]) == (None, None)
+
+    def test_rolling_median_and_mad_match_batch(self):
+        """The sorted-window median/MAD match the batch computation after the window wraps."""
+        import random
+        import statistics
+
+        detector = StreamingAnomalyDetector(window_size=9)
+        rng = random.Random(0)
+        values = [rng.choice([rng.gauss(10, 2), 10.0]) for _ in range(40)]
+        self._feed(detector, values)
+
+        window = values[-9:]
+        center = statistics.median(window)
+        stats = detector.get_entity_stats("device", "1")["metrics"]["avg_value"]
+        assert stats["median"] == pytest.approx(center)
+        assert stats["mad"] == pytest.approx(statistics.median(abs(v - center) for v in window))
+
+    def test_invalid_input(self):
+        """Unknown entity types and non-numeric points are rejected."""
+        detector = StreamingAnomalyDetector()
+        with pytest.raises(ValueError):
+            detector.score_point("satellite", "1", {"grade": 5.0})
+        with pytest.raises(ValueError):
+            detector.score_point("link", "1", {"status": "up"})
+
+    def test_reset(self):
+        """Reset drops entity state."""
+        detector = StreamingAnomalyDetector()
+        self._feed(detector, [1.0, 2.0], entity_id="a")
+        self._feed(detector, [1.0, 2.0], entity_id="b")
+
+        assert detector.reset("device", "a") == 1
+        assert detector.reset() == 1
+        assert detector.get_stats()["tracked_entities"] == 0
+
+    def test_global_instance(self):
+        """Global streaming detector instance is shared."""
+        assert get_streaming_detector() is get_streaming_detector()